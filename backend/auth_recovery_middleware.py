@@ -3,214 +3,215 @@ Auth Recovery Middleware for Assessment Platform
 Automatically handles cases where users are authenticated but their database records are missing
 """
 
+import json
 import logging
-from typing import Dict, Any, Optional
-from fastapi import Request, HTTPException
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import parse_qs
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from user_management_service import UserManagementService
+from utils.batch_loader import BatchLoader
+from utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
-class AuthRecoveryMiddleware(BaseHTTPMiddleware):
-    """Middleware to automatically recover users with auth/database mismatches"""
-    
-    def __init__(self, app, user_management_service: UserManagementService):
-        super().__init__(app)
+USER_ID_PATTERN = r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+
+# Endpoints that should trigger auth recovery: path pattern -> methods
+RECOVERY_ENDPOINTS = {
+    '/api/users/{user_id}': ('GET', 'PUT'),
+    '/api/evaluations/user/{user_id}': ('GET',),
+    '/api/analytics/{user_id}': ('GET',),
+    '/api/badges/{user_id}': ('GET',),
+    '/api/badges/check/{user_id}': ('POST',),
+    '/api/debug/subscription-check/{user_id}': ('GET',),
+    '/api/test-plan-update/{user_id}': ('POST',)
+}
+
+# How long a user's existence is remembered; misses are re-checked sooner so
+# users created elsewhere are picked up quickly
+EXISTS_TTL_SECONDS = 300
+MISSING_TTL_SECONDS = 15
+EXISTENCE_CACHE_SIZE = 10000
+
+def _compile_endpoints(endpoints: Dict[str, Tuple[str, ...]]):
+    """One anchored regex over every endpoint; group e<i> captures endpoint i's user id."""
+    alternatives, methods = [], {}
+    for i, (pattern, allowed) in enumerate(endpoints.items()):
+        alternatives.append(re.escape(pattern).replace(re.escape('{user_id}'), f'(?P<e{i}>{USER_ID_PATTERN})'))
+        methods[f'e{i}'] = frozenset(allowed)
+    return re.compile('^(?:' + '|'.join(alternatives) + ')$'), methods
+
+RECOVERY_ROUTE_RE, RECOVERY_METHODS = _compile_endpoints(RECOVERY_ENDPOINTS)
+
+def match_recovery_route(path: str, method: str) -> Optional[str]:
+    """User id of a request that should trigger auth recovery, else None."""
+    match = RECOVERY_ROUTE_RE.match(path)
+    if not match or method not in RECOVERY_METHODS[match.lastgroup]:
+        return None
+    return match.group(match.lastgroup)
+
+class AuthRecoveryMiddleware:
+    """Pure ASGI middleware that recovers users with auth/database mismatches.
+
+    Requests outside the recovery endpoints pass straight through. For those
+    endpoints, user existence is answered from a TTL cache (kept current by
+    UserManagementService change notifications), so a recently seen user costs
+    no database call. A lookup that does reach the database goes through the
+    request's user loader, so the route reuses the row instead of fetching it
+    again. The request body is only read when a missing user has to be
+    recovered, and is then replayed to the route.
+    """
+
+    def __init__(self, app: ASGIApp, user_management_service: UserManagementService):
+        self.app = app
         self.user_management_service = user_management_service
-        
-        # Endpoints that should trigger auth recovery
-        self.recovery_endpoints = {
-            '/api/users/{user_id}': ['GET', 'PUT'],
-            '/api/evaluations/user/{user_id}': ['GET'],
-            '/api/analytics/{user_id}': ['GET'],
-            '/api/badges/{user_id}': ['GET'],
-            '/api/badges/check/{user_id}': ['POST'],
-            '/api/debug/subscription-check/{user_id}': ['GET'],
-            '/api/test-plan-update/{user_id}': ['POST']
-        }
-        
-        # Endpoints that should attempt user creation/restoration
-        self.creation_endpoints = {
-            '/api/users': ['POST']
-        }
-    
-    async def dispatch(self, request: Request, call_next):
-        """Process the request and handle auth recovery if needed"""
-        
-        # Skip middleware for non-API requests
-        if not request.url.path.startswith('/api/'):
-            return await call_next(request)
-        
-        # Check if this endpoint should trigger auth recovery
-        should_recover = self._should_trigger_recovery(request.url.path, request.method)
-        should_create = self._should_trigger_creation(request.url.path, request.method)
-        
-        if not should_recover and not should_create:
-            return await call_next(request)
-        
+        # uid -> (expires_at, exists)
+        self._existence: "OrderedDict[str, Tuple[float, bool]]" = OrderedDict()
+        self._lookups = SingleFlight()
+        UserManagementService.change_listeners.append(self.forget_user)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith('/api/'):
+            return await self.app(scope, receive, send)
+        user_id = match_recovery_route(scope["path"], scope["method"])
+        if not user_id or not self.user_management_service:
+            return await self.app(scope, receive, send)
+
+        # Only the lookup and the recovery are guarded; the route itself runs exactly once, below
+        response = None
         try:
-            # Extract user ID from path parameters
-            user_id = self._extract_user_id_from_path(request.url.path)
-            
-            if not user_id or user_id == "undefined":
-                return await call_next(request)
-            
-            # Check if user exists in database
-            user_exists = await self.user_management_service.get_user_by_id(user_id)
-            
-            if not user_exists and should_recover:
-                # User doesn't exist but should - attempt recovery
+            loader = self.user_management_service.request_user_loader(scope)
+            if not await self._user_exists(user_id, loader):
                 logger.warning(f"User not found, attempting auth recovery for: {user_id}")
-                
-                # Try to get user info from request headers or body
-                user_info = await self._extract_user_info_from_request(request)
-                
-                if user_info and user_info.get('email'):
-                    # Attempt to recover the user
-                    recovery_result = await self.user_management_service.handle_auth_database_mismatch(
-                        auth_user_id=user_id,
-                        email=user_info['email'],
-                        metadata=user_info.get('metadata', {})
-                    )
-                    
-                    if recovery_result['success']:
-                        logger.info(f"Successfully recovered user {user_id} via auth recovery middleware")
-                        # Continue with the request - user should now exist
-                    else:
-                        logger.error(f"Failed to recover user {user_id}: {recovery_result.get('error')}")
-                        # Return error response
-                        return JSONResponse(
-                            status_code=500,
-                            content={
-                                "error": "User recovery failed",
-                                "details": recovery_result.get('error'),
-                                "user_id": user_id,
-                                "recovery_method": recovery_result.get('recovery_method')
-                            }
-                        )
-                else:
-                    logger.error(f"Cannot recover user {user_id} - no email information available")
-                    return JSONResponse(
-                        status_code=400,
-                        content={
-                            "error": "Cannot recover user - missing email information",
-                            "user_id": user_id
-                        }
-                    )
-            
-            elif not user_exists and should_create:
-                # User doesn't exist and this is a creation endpoint
-                logger.info(f"User creation endpoint called for non-existent user: {user_id}")
-                # Let the endpoint handle user creation normally
-                pass
-            
-            # Continue with the request
-            return await call_next(request)
-            
+                # From here on the route must read the replayed body, even if recovery fails
+                body, receive = await self._buffer_body(scope, receive)
+                response = await self._recover(scope, body, user_id, loader)
         except Exception as e:
+            # Continue with the request even if recovery fails
             logger.error(f"Error in auth recovery middleware: {str(e)}")
-            # Continue with the request even if middleware fails
-            return await call_next(request)
-    
-    def _should_trigger_recovery(self, path: str, method: str) -> bool:
-        """Check if the endpoint should trigger auth recovery"""
-        for endpoint_pattern, methods in self.recovery_endpoints.items():
-            if method in methods and self._path_matches_pattern(path, endpoint_pattern):
-                return True
-        return False
-    
-    def _should_trigger_creation(self, path: str, method: str) -> bool:
-        """Check if the endpoint should trigger user creation"""
-        for endpoint_pattern, methods in self.creation_endpoints.items():
-            if method in methods and self._path_matches_pattern(path, endpoint_pattern):
-                return True
-        return False
-    
-    def _path_matches_pattern(self, path: str, pattern: str) -> bool:
-        """Check if a path matches a pattern with path parameters"""
-        # Simple pattern matching for path parameters
-        if '{user_id}' in pattern:
-            # Convert pattern to regex-like matching
-            pattern_parts = pattern.split('/')
-            path_parts = path.split('/')
-            
-            if len(pattern_parts) != len(path_parts):
-                return False
-            
-            for i, pattern_part in enumerate(pattern_parts):
-                if pattern_part == '{user_id}':
-                    # This part should be a valid user ID
-                    if not path_parts[i] or path_parts[i] == "undefined":
-                        return False
-                elif pattern_part != path_parts[i]:
-                    return False
-            
-            return True
-        
-        return path == pattern
-    
-    def _extract_user_id_from_path(self, path: str) -> Optional[str]:
-        """Extract user ID from path parameters"""
-        path_parts = path.split('/')
-        
-        # Look for user_id in common patterns
-        for i, part in enumerate(path_parts):
-            if part == 'user_id' and i + 1 < len(path_parts):
-                return path_parts[i + 1]
-            elif part == 'user' and i + 1 < len(path_parts):
-                return path_parts[i + 1]
-        
-        # Fallback: look for UUID-like patterns
-        import re
-        uuid_pattern = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
-        match = uuid_pattern.search(path)
-        if match:
-            return match.group(0)
-        
-        return None
-    
-    async def _extract_user_info_from_request(self, request: Request) -> Optional[Dict[str, Any]]:
-        """Extract user information from request headers or body"""
-        try:
-            # Try to get user info from request body
-            if request.method in ['POST', 'PUT', 'PATCH']:
-                try:
-                    body = await request.json()
-                    if isinstance(body, dict):
-                        return {
-                            'email': body.get('email'),
-                            'metadata': {
-                                'name': body.get('name'),
-                                'avatar_url': body.get('photo_url')
-                            }
-                        }
-                except:
-                    pass
-            
-            # Try to get user info from query parameters
-            email = request.query_params.get('email')
-            if email:
-                return {
-                    'email': email,
-                    'metadata': {}
+        if response is not None:
+            return await response(scope, receive, send)
+        return await self.app(scope, receive, send)
+
+    async def _recover(self, scope: Scope, body: bytes, user_id: str, loader: BatchLoader) -> Optional[JSONResponse]:
+        """Recreate a missing user's record; returns an error response to send instead of the route, or None."""
+        user_info = self._extract_user_info(scope, body)
+        if not user_info or not user_info.get('email'):
+            logger.error(f"Cannot recover user {user_id} - no email information available")
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "error": "Cannot recover user - missing email information",
+                    "user_id": user_id
                 }
-            
-            # Try to get user info from headers
-            email = request.headers.get('x-user-email')
-            if email:
-                return {
-                    'email': email,
-                    'metadata': {}
+            )
+
+        recovery_result = await self.user_management_service.handle_auth_database_mismatch(
+            auth_user_id=user_id,
+            email=user_info['email'],
+            metadata=user_info.get('metadata', {})
+        )
+        if not recovery_result['success']:
+            logger.error(f"Failed to recover user {user_id}: {recovery_result.get('error')}")
+            return JSONResponse(
+                status_code=500,
+                content={
+                    "error": "User recovery failed",
+                    "details": recovery_result.get('error'),
+                    "user_id": user_id,
+                    "recovery_method": recovery_result.get('recovery_method')
                 }
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error extracting user info from request: {str(e)}")
-            return None
+            )
+
+        logger.info(f"Successfully recovered user {user_id} via auth recovery middleware")
+        self._remember(user_id, True)
+        # The loader memoised the miss; let the route read the recovered row
+        loader.clear(user_id)
+        return None
+
+    # --- existence cache ---
+
+    def forget_user(self, user_id: str) -> None:
+        """Drop a cached existence answer (UserManagementService change listener)."""
+        self._existence.pop(user_id, None)
+
+    def _remember(self, user_id: str, exists: bool) -> None:
+        ttl = EXISTS_TTL_SECONDS if exists else MISSING_TTL_SECONDS
+        self._existence[user_id] = (time.monotonic() + ttl, exists)
+        self._existence.move_to_end(user_id)
+        while len(self._existence) > EXISTENCE_CACHE_SIZE:
+            self._existence.popitem(last=False)
+
+    async def _user_exists(self, user_id: str, loader: BatchLoader) -> bool:
+        entry = self._existence.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        async def lookup() -> bool:
+            exists = await loader.load(user_id) is not None
+            self._remember(user_id, exists)
+            return exists
+
+        # Concurrent first requests for the same user share one lookup
+        return await self._lookups.do(user_id, lookup)
+
+    # --- request inspection ---
+
+    @staticmethod
+    async def _buffer_body(scope: Scope, receive: Receive) -> Tuple[bytes, Receive]:
+        """Read the request body and return it with a receive callable that replays it."""
+        if scope["method"] not in ('POST', 'PUT', 'PATCH'):
+            return b'', receive
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b''.join(chunks)
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return body, replay
+
+    @staticmethod
+    def _extract_user_info(scope: Scope, body: bytes) -> Optional[Dict[str, Any]]:
+        """Extract user information from the request body, query string or headers"""
+        if body:
+            try:
+                payload = json.loads(body)
+                if isinstance(payload, dict):
+                    return {
+                        'email': payload.get('email'),
+                        'metadata': {
+                            'name': payload.get('name'),
+                            'avatar_url': payload.get('photo_url')
+                        }
+                    }
+            except ValueError:
+                pass
+
+        email = parse_qs(scope.get("query_string", b"").decode("latin-1")).get('email', [None])[0]
+        if email:
+            return {'email': email, 'metadata': {}}
+
+        for name, value in scope.get("headers", []):
+            if name == b'x-user-email' and value:
+                return {'email': value.decode("latin-1"), 'metadata': {}}
+        return None
 
 class AuthRecoveryDecorator:
     """Decorator for individual endpoints that need auth recovery"""
@@ -0,0 +1,144 @@
+"""
+Shared service instances, built on first use.
+
+Route modules used to build their own Supabase client and services when they
+were imported, so importing the app created the same client and services
+several times over before a single request was served. Every shared service
+is now registered here by name and built once per process, the first time
+something asks for it; its imports are deferred to that point too.
+
+Route modules bind `container.lazy(name)` at module level. The proxy forwards
+attribute access to the real instance (building it if needed) and is falsy
+when the service could not be built, so existing `if not service:` checks
+keep working.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class LazyService:
+    """Module-level stand-in for a container service."""
+
+    __slots__ = ('_container', '_name')
+
+    def __init__(self, container: 'ServiceContainer', name: str):
+        self._container = container
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._container.get(self._name), attr)
+
+    def __bool__(self) -> bool:
+        return self._container.get(self._name) is not None
+
+    def __repr__(self) -> str:
+        return f"<lazy {self._name}>"
+
+class ServiceContainer:
+    """Named factories whose results are built once and then shared."""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        # Re-entrant: factories ask the container for the services they depend on
+        self._lock = threading.RLock()
+
+    def provider(self, name: str) -> Callable:
+        """Register the decorated zero-argument factory under `name`."""
+        def register(factory: Callable[[], Any]) -> Callable[[], Any]:
+            self._factories[name] = factory
+            return factory
+        return register
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+                logger.debug(f"Built service {name}")
+            return self._instances[name]
+
+    def lazy(self, name: str) -> LazyService:
+        if name not in self._factories:
+            raise KeyError(f"No provider registered for {name!r}")
+        return LazyService(self, name)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def reset(self) -> None:
+        """Forget every built instance (they are rebuilt on next use)."""
+        with self._lock:
+            self._instances.clear()
+
+container = ServiceContainer()
+
+@container.provider('supabase')
+def _supabase():
+    from config.settings import create_supabase_client
+    return create_supabase_client()
+
+@container.provider('user_management_service')
+def _user_management_service():
+    from config.settings import get_user_management_service
+    return get_user_management_service(container.get('supabase'))
+
+@container.provider('evaluation_service')
+def _evaluation_service():
+    from services.evaluation_service import EvaluationService
+    return EvaluationService()
+
+@container.provider('audit_store')
+def _audit_store():
+    from services.audit_service import EvaluationAuditStore
+    return EvaluationAuditStore(container.get('supabase'))
+
+@container.provider('user_stats_service')
+def _user_stats_service():
+    from services.user_stats_service import UserStatsService
+    return UserStatsService(container.get('supabase'))
+
+@container.provider('badge_engine')
+def _badge_engine():
+    from services.badge_service import BadgeEngine
+    return BadgeEngine(container.get('supabase'))
+
+@container.provider('recommendation_service')
+def _recommendation_service():
+    from services.recommendation_service import RecommendationService
+    return RecommendationService(container.get('supabase'))
+
+@container.provider('grade_timeseries_service')
+def _grade_timeseries_service():
+    from services.grade_timeseries import GradeTimeseriesService
+    return GradeTimeseriesService(container.get('supabase'))
+
+@container.provider('rollup_service')
+def _rollup_service():
+    from services.rollup_service import DailyRollupService
+    return DailyRollupService(container.get('supabase'), container.get('user_management_service'))
+
+@container.provider('dashboard_aggregates')
+def _dashboard_aggregates():
+    from services.dashboard_aggregates import DashboardAggregates
+    return DashboardAggregates(container.get('supabase'))
+
+@container.provider('admin_search_index')
+def _admin_search_index():
+    from services.admin_search_index import get_admin_search_index
+    return get_admin_search_index(container.get('supabase'))
+
+@container.provider('admin_auth_service')
+def _admin_auth_service():
+    from services.admin_auth_service import AdminAuthService
+    return AdminAuthService()
+
+@container.provider('mcp_dodo_service')
+def _mcp_dodo_service():
+    from services.mcp_dodo_service import MCPDodoPaymentsService
+    return MCPDodoPaymentsService()
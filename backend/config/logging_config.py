@@ -1,30 +1,163 @@
 """
 Logging configuration for the application.
+
+Loggers hand records to a QueueHandler; a QueueListener thread formats them
+and writes them out, so neither the formatter nor stream I/O ever runs on the
+event loop. Only the %-merge of a record's arguments happens in the caller,
+and only for records that pass the level check, so hot paths log with
+`logger.debug("... %s", value)` rather than f-strings: nothing is formatted
+unless that level is enabled.
+
+Configured from config/settings.py:
+- LOG_LEVEL: level for everything not listed below (INFO).
+- LOG_LEVELS: per-subsystem overrides, e.g.
+  "routes.evaluations=DEBUG,user_management_service=WARNING".
+- LOG_FORMAT: 'text' (one line per record) or 'json' (one object per record,
+  including any `extra` fields).
+- LOG_DEBUG_SAMPLE_RATE: fraction of DEBUG records kept. A record can carry
+  its own rate with `extra={'sample_rate': 0.01}`.
 """
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from config.settings import LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Libraries that are too chatty below WARNING
+LIBRARY_LEVELS: Dict[str, str] = {
+    'httpcore': 'WARNING',
+    'httpx': 'WARNING',
+    'hpack': 'WARNING',
+    'urllib3': 'WARNING',
+    'requests': 'WARNING',
+    'PIL': 'WARNING',
+    'PyPDF2': 'WARNING',
+    'postgrest': 'WARNING',
+    'realtime': 'WARNING',
+    'storage3': 'WARNING',
+    'supabase': 'INFO',
+}
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, extra fields and any traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keeps a random `rate` fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, 'sample_rate', self.rate)
+        return rate >= 1 or random.random() < rate
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, while they still hold the values being logged;
+        # the formatter and any traceback rendering run in the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """'a.b=DEBUG,c=WARNING' -> {'a.b': 'DEBUG', 'c': 'WARNING'}; malformed entries are skipped."""
+    levels = {}
+    for entry in (spec or '').split(','):
+        name, _, level = entry.partition('=')
+        if name.strip() and level.strip().upper() in logging.getLevelNamesMapping():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def _output_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+    return handler
+
+def _start_listener() -> None:
+    """Give the queue handler a fresh queue and a listener thread writing it out."""
+    global _listener
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue_handler.queue, _output_handler(), respect_handler_level=False)
+    _listener.start()
+
+def _restart_after_fork() -> None:
+    # Threads do not survive fork: a preloaded app's workers need their own listener
+    if _queue_handler is not None:
+        _start_listener()
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 def configure_logging():
-    """Configure application logging."""
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    """Route all logging through the queue and apply the configured levels."""
+    global _queue_handler
+    first_call = _queue_handler is None
+    stop_logging()
+
+    _queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(SamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+    _start_listener()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    # The server's own access and error logs go through the queue too
+    for name in ('uvicorn.error', 'uvicorn.access'):
+        server_logger = logging.getLogger(name)
+        server_logger.handlers = []
+        server_logger.propagate = True
+
+    for name, level in {**LIBRARY_LEVELS, **parse_levels(LOG_LEVELS)}.items():
+        logging.getLogger(name).setLevel(level)
+
+    if first_call:
+        os.register_at_fork(after_in_child=_restart_after_fork)
+        atexit.register(stop_logging)
 
     # Get application logger
     logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
-
-    # Suppress verbose HTTP/2 and other library debug logs
-    logging.getLogger("httpcore").setLevel(logging.WARNING)
-    logging.getLogger("httpcore.http2").setLevel(logging.WARNING)
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("hpack").setLevel(logging.WARNING)
-    logging.getLogger("hpack.hpack").setLevel(logging.WARNING)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
-    logging.getLogger("requests").setLevel(logging.WARNING)
-    logging.getLogger("PIL").setLevel(logging.WARNING)
-    logging.getLogger("supabase").setLevel(logging.INFO)
-
+    logger.info("Logging configured: level=%s format=%s overrides=%s debug_sample_rate=%s",
+                LOG_LEVEL, LOG_FORMAT, LOG_LEVELS or 'none', LOG_DEBUG_SAMPLE_RATE)
     return logger
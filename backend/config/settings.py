@@ -4,10 +4,12 @@ Application configuration and environment variables.
 import os
 import logging
 from pathlib import Path
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from user_management_service import UserManagementService
-from auth_recovery_middleware import create_auth_recovery_middleware
+
+if TYPE_CHECKING:
+    from supabase import Client
+    from user_management_service import UserManagementService
 
 # Get root directory
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -28,6 +30,17 @@ DEEPSEEK_API_KEY = os.environ.get('DEEPSEEK_API_KEY')
 QWEN_API_KEY = os.environ.get('QWEN_API_KEY')
 DEEPSEEK_ENDPOINT = os.environ.get('DEEPSEEK_ENDPOINT', 'https://openrouter.ai/api/v1/chat/completions')
 QWEN_ENDPOINT = os.environ.get('QWEN_ENDPOINT', 'https://openrouter.ai/api/v1/chat/completions')
+# Seconds an evaluation LLM call may take; the production launcher's graceful shutdown waits longer than this
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', '60'))
+# 'openrouter' calls the configured endpoints; 'fake' answers with canned responses (load tests, local runs)
+LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'openrouter').lower()
+# Simulated model latency and response-processing CPU time per fake call
+FAKE_LLM_LATENCY_MS = int(os.environ.get('FAKE_LLM_LATENCY_MS', '1500'))
+FAKE_LLM_CPU_MS = int(os.environ.get('FAKE_LLM_CPU_MS', '0'))
+
+# Per-worker pooled HTTP client for outbound API calls
+HTTP_POOL_MAX_CONNECTIONS = int(os.environ.get('HTTP_POOL_MAX_CONNECTIONS', '100'))
+HTTP_POOL_MAX_KEEPALIVE = int(os.environ.get('HTTP_POOL_MAX_KEEPALIVE', '20'))
 
 # Recommendations AI (separate API key and model)
 RECOMMENDATIONS_API_KEY = os.environ.get('OPENROUTER_GPT_OSS_120B_KEY')
@@ -62,6 +75,40 @@ DODO_UNLIMITED_YEARLY_PRODUCT_ID = DODO_LIFETIME_PRODUCT_ID
 # Admin Configuration
 ADMIN_EMAILS = os.environ.get('ADMIN_EMAILS', '')
 
+# Seconds between in-process dashboard rollup runs (0 disables; use scripts/run_rollups.py from cron instead)
+ROLLUP_INTERVAL_SECONDS = int(os.environ.get('ROLLUP_INTERVAL_SECONDS', '300'))
+
+# Seconds before an admin analytics snapshot is recomputed in the background
+ADMIN_ANALYTICS_REFRESH_SECONDS = int(os.environ.get('ADMIN_ANALYTICS_REFRESH_SECONDS', '300'))
+
+# Admin search index (a SQLite FTS5 file shared by every worker on the host): reconciliation
+# interval (0 disables the index; search then queries the database)
+SEARCH_INDEX_REBUILD_SECONDS = int(os.environ.get('SEARCH_INDEX_REBUILD_SECONDS', '900'))
+SEARCH_INDEX_DB_PATH = os.environ.get('SEARCH_INDEX_DB_PATH', str(ROOT_DIR / 'admin_search.sqlite3'))
+
+# Periodic jobs (dashboard rollups, admin analytics refresh, search index reconciliation) run in one
+# worker per host: whichever holds a lock on the file below. 'off' disables them on this host,
+# e.g. on every replica but one
+BACKGROUND_JOBS = os.environ.get('BACKGROUND_JOBS', 'on').lower()
+BACKGROUND_JOBS_LOCK_PATH = os.environ.get('BACKGROUND_JOBS_LOCK_PATH', str(ROOT_DIR / 'background_jobs.lock'))
+
+# Parquet snapshot written by scripts/export_snapshots.py; when set, admin analytics read
+# evaluation history from it and only query evaluations newer than its watermark
+ANALYTICS_SNAPSHOT_DIR = os.environ.get('ANALYTICS_SNAPSHOT_DIR', '')
+
+# Admin session storage: 'memory' (per process) or 'sqlite' (shared by every worker on the host through the file below);
+# launcher.py switches the default to 'sqlite' when it starts more than one worker
+ADMIN_SESSION_STORE = os.environ.get('ADMIN_SESSION_STORE', 'memory')
+ADMIN_SESSION_DB_PATH = os.environ.get('ADMIN_SESSION_DB_PATH', str(ROOT_DIR / 'admin_sessions.sqlite3'))
+ADMIN_SESSION_MAX = int(os.environ.get('ADMIN_SESSION_MAX', '1000'))
+
+# Logging: default level, per-subsystem overrides ("routes.evaluations=DEBUG,user_management_service=WARNING"),
+# output format ('text' or 'json') and the fraction of DEBUG records kept
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+
 def is_admin_email(email: str) -> bool:
     """Check if an email is in the admin list."""
     if not email or not ADMIN_EMAILS:
@@ -87,69 +134,54 @@ CORS_ORIGINS = [
     "https://yourdomain.com"  # Update with your production domain
 ]
 
-# Initialize Supabase client
-def get_supabase_client() -> Client:
-    """Initialize and return Supabase client."""
-    print(f"🔍 DEBUG settings.py - get_supabase_client called")
-    print(f"🔍 DEBUG settings.py - SUPABASE_URL: {SUPABASE_URL}")
-    print(f"🔍 DEBUG settings.py - SUPABASE_KEY present: {bool(SUPABASE_KEY)}")
-    print(f"🔍 DEBUG settings.py - SUPABASE_KEY first 10 chars: {SUPABASE_KEY[:10] if SUPABASE_KEY else 'None'}")
-    
+# Supabase client and user management service (shared instances live in config/container.py)
+def create_supabase_client() -> 'Client':
+    """Build a new Supabase client, or None if it is not configured."""
     if not SUPABASE_KEY:
         logging.warning(
             "SUPABASE_SERVICE_ROLE_KEY is not set. Ensure backend/.env exists and python-dotenv loads it."
         )
-        print("❌ DEBUG settings.py - SUPABASE_KEY is None or empty")
         return None
     
     try:
-        print(f"🔍 DEBUG settings.py - Creating Supabase client with URL: {SUPABASE_URL}")
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        from supabase import create_client
+        logging.debug(f"Creating Supabase client with URL: {SUPABASE_URL}")
+        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
         logging.info("Supabase client initialized successfully")
-        print("✅ DEBUG settings.py - Supabase client created successfully")
         return supabase
     except Exception as e:
-        logging.error(f"Error initializing Supabase: {e}")
-        print(f"❌ DEBUG settings.py - Error creating Supabase client: {e}")
-        print(f"❌ DEBUG settings.py - Exception type: {type(e)}")
-        import traceback
-        print(f"❌ DEBUG settings.py - Traceback: {traceback.format_exc()}")
+        logging.error(f"Error initializing Supabase: {e}", exc_info=True)
         return None
 
-# Initialize user management service
-def get_user_management_service(supabase_client: Client) -> UserManagementService:
+def get_supabase_client() -> 'Client':
+    """The process-wide Supabase client, created on first use."""
+    from config.container import container
+    return container.get('supabase')
+
+def get_user_management_service(supabase_client: 'Client') -> 'UserManagementService':
     """Initialize and return user management service."""
-    print(f"🔍 DEBUG settings.py - get_user_management_service called")
-    print(f"🔍 DEBUG settings.py - supabase_client provided: {supabase_client is not None}")
-    print(f"🔍 DEBUG settings.py - supabase_client type: {type(supabase_client)}")
-    
     if not supabase_client:
         logging.warning("Cannot initialize user management service - Supabase client not available")
-        print("❌ DEBUG settings.py - Cannot initialize user management service - Supabase client not available")
         return None
     
     try:
-        print(f"🔍 DEBUG settings.py - Creating UserManagementService instance")
+        from user_management_service import UserManagementService
         user_management_service = UserManagementService(supabase_client)
         logging.info("User management service initialized successfully")
-        print("✅ DEBUG settings.py - UserManagementService created successfully")
         return user_management_service
     except Exception as e:
-        logging.error(f"Error initializing user management service: {e}")
-        print(f"❌ DEBUG settings.py - Error creating UserManagementService: {e}")
-        print(f"❌ DEBUG settings.py - Exception type: {type(e)}")
-        import traceback
-        print(f"❌ DEBUG settings.py - Traceback: {traceback.format_exc()}")
+        logging.error(f"Error initializing user management service: {e}", exc_info=True)
         return None
 
 # Initialize auth recovery middleware
-def get_auth_recovery_middleware(user_management_service: UserManagementService):
+def get_auth_recovery_middleware(user_management_service: 'UserManagementService'):
     """Initialize and return auth recovery middleware."""
     if not user_management_service:
         logging.warning("Auth recovery middleware not added - user management service not available")
         return None
     
     try:
+        from auth_recovery_middleware import create_auth_recovery_middleware
         auth_recovery_middleware = create_auth_recovery_middleware(user_management_service)
         logging.info("Auth recovery middleware added successfully")
         return auth_recovery_middleware
@@ -0,0 +1,132 @@
+"""
+Production entry point.
+
+Runs server:app under gunicorn with uvicorn workers when gunicorn is
+installed, and falls back to uvicorn's own process manager otherwise:
+
+    python launcher.py [--workers N] [--port 5000] [--no-preload]
+
+- Worker count comes from --workers or WEB_CONCURRENCY and defaults to one
+  worker per CPU (evaluations spend most of their time waiting on the model,
+  so more workers than cores only adds memory).
+- uvloop and httptools are used when they are installed.
+- On shutdown workers get longer than LLM_TIMEOUT_SECONDS to finish in-flight
+  evaluations before they are killed.
+- Each worker is replaced after MAX_REQUESTS requests (plus up to
+  MAX_REQUESTS_JITTER, so workers do not all recycle together).
+- The app is imported once before forking (preload) so workers share its
+  memory; connection pools are opened per worker by the startup hook.
+- With more than one worker, admin sessions default to the SQLite store so a
+  session created on one worker is valid on all of them; an explicit
+  ADMIN_SESSION_STORE=memory is refused.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+from config import settings
+from config.settings import LLM_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+APP = "server:app"
+# Seconds past the LLM timeout a stopping worker waits for in-flight requests
+SHUTDOWN_GRACE_SECONDS = 15
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def default_workers() -> int:
+    return int(os.environ.get('WEB_CONCURRENCY') or os.cpu_count() or 1)
+
+def configure_session_store(workers: int) -> None:
+    """Share admin sessions between workers; a per-process store would log admins out at random."""
+    if workers <= 1:
+        return
+    backend = os.environ.get('ADMIN_SESSION_STORE', '').lower()
+    if backend == 'memory':
+        raise SystemExit(f"ADMIN_SESSION_STORE=memory cannot be used with {workers} workers; "
+                         "use 'sqlite' or run a single worker")
+    if not backend:
+        # Settings are already imported here; the environment covers workers that import them afresh
+        os.environ['ADMIN_SESSION_STORE'] = settings.ADMIN_SESSION_STORE = 'sqlite'
+        logger.info(f"🔐 Using the SQLite admin session store at {settings.ADMIN_SESSION_DB_PATH} for {workers} workers")
+
+def _gunicorn_application(options: dict):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from config.container import container
+            from server import app
+            # Services are otherwise built per worker on first use; build this one before forking so
+            # preloaded workers share the admin key it generates when ADMIN_SECRET_KEY is unset
+            container.get('admin_auth_service')
+            return app
+
+    return Application()
+
+def run_gunicorn(args) -> None:
+    logger.info(f"🚀 Starting gunicorn with {args.workers} uvicorn workers on {args.host}:{args.port}")
+    _gunicorn_application({
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers,
+        'worker_class': 'uvicorn.workers.UvicornWorker',
+        'preload_app': args.preload,
+        'graceful_timeout': args.graceful_timeout,
+        # A worker silent for longer than this is presumed stuck and restarted
+        'timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests_jitter,
+        'keepalive': 5,
+        'accesslog': '-' if args.access_log else None,
+        'errorlog': '-',
+    }).run()
+
+def run_uvicorn(args) -> None:
+    import uvicorn
+
+    options = {
+        'host': args.host,
+        'port': args.port,
+        'workers': args.workers,
+        'loop': 'uvloop' if _installed('uvloop') else 'auto',
+        'http': 'httptools' if _installed('httptools') else 'auto',
+        'timeout_graceful_shutdown': args.graceful_timeout,
+        'access_log': args.access_log,
+    }
+    if args.workers == 1:
+        options['limit_max_requests'] = args.max_requests or None
+    elif args.max_requests:
+        # uvicorn's supervisor does not replace workers that exit, so recycling them would shrink the pool
+        logger.warning("gunicorn is not installed; worker recycling is disabled")
+    logger.info(f"🚀 Starting uvicorn with {args.workers} workers on {args.host}:{args.port}")
+    uvicorn.run(APP, **options)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with multiple workers")
+    parser.add_argument("--host", default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument("--port", type=int, default=int(os.environ.get('PORT', '5000')))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--graceful-timeout", type=int,
+                        default=int(os.environ.get('GRACEFUL_TIMEOUT', LLM_TIMEOUT_SECONDS + SHUTDOWN_GRACE_SECONDS)))
+    parser.add_argument("--max-requests", type=int, default=int(os.environ.get('MAX_REQUESTS', '5000')),
+                        help="Recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.environ.get('MAX_REQUESTS_JITTER', '500')))
+    parser.add_argument("--no-preload", dest="preload", action="store_false", help="Import the app in each worker instead of once")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+    configure_session_store(args.workers)
+
+    if _installed('gunicorn'):
+        run_gunicorn(args)
+    else:
+        run_uvicorn(args)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,18 @@
+-- Store improvement_suggestions, strengths and next_steps as JSON arrays.
+--
+-- Existing text values are carried over as JSON strings so the type change is
+-- a cheap, lossless rewrite; run `python -m scripts.backfill_evaluation_lists`
+-- afterwards to convert those legacy strings into real arrays.
+
+ALTER TABLE assessment_evaluations
+    ALTER COLUMN improvement_suggestions TYPE jsonb
+        USING CASE WHEN improvement_suggestions IS NULL THEN '[]'::jsonb ELSE to_jsonb(improvement_suggestions) END,
+    ALTER COLUMN strengths TYPE jsonb
+        USING CASE WHEN strengths IS NULL THEN '[]'::jsonb ELSE to_jsonb(strengths) END,
+    ALTER COLUMN next_steps TYPE jsonb
+        USING CASE WHEN next_steps IS NULL THEN '[]'::jsonb ELSE to_jsonb(next_steps) END;
+
+ALTER TABLE assessment_evaluations
+    ALTER COLUMN improvement_suggestions SET DEFAULT '[]'::jsonb,
+    ALTER COLUMN strengths SET DEFAULT '[]'::jsonb,
+    ALTER COLUMN next_steps SET DEFAULT '[]'::jsonb;
@@ -0,0 +1,41 @@
+-- Append-only audit store for evaluation prompts and raw AI responses.
+--
+-- The static part of each prompt (marking criteria) is stored once per
+-- sha256 hash in assessment_prompt_prefixes; assessment_evaluation_audit keeps
+-- the compressed per-submission remainder. Payloads are base64 text of zstd or
+-- gzip data, as named by the codec column.
+--
+-- After applying, run `python -m scripts.backfill_evaluation_audit` to move
+-- legacy assessment_evaluations.full_chat values into the store.
+
+CREATE TABLE IF NOT EXISTS assessment_prompt_prefixes (
+    hash text PRIMARY KEY,
+    codec text NOT NULL,
+    body text NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS assessment_evaluation_audit (
+    evaluation_id text PRIMARY KEY,
+    prefix_hash text REFERENCES assessment_prompt_prefixes (hash),
+    codec text NOT NULL,
+    payload text NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- Audit rows are written once and never modified
+CREATE OR REPLACE FUNCTION reject_audit_mutation() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION '% is append-only', TG_TABLE_NAME;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS assessment_evaluation_audit_append_only ON assessment_evaluation_audit;
+CREATE TRIGGER assessment_evaluation_audit_append_only
+    BEFORE UPDATE OR DELETE ON assessment_evaluation_audit
+    FOR EACH ROW EXECUTE FUNCTION reject_audit_mutation();
+
+DROP TRIGGER IF EXISTS assessment_prompt_prefixes_append_only ON assessment_prompt_prefixes;
+CREATE TRIGGER assessment_prompt_prefixes_append_only
+    BEFORE UPDATE OR DELETE ON assessment_prompt_prefixes
+    FOR EACH ROW EXECUTE FUNCTION reject_audit_mutation();
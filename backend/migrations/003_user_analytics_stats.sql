@@ -0,0 +1,22 @@
+-- Per-user analytics aggregate, folded forward as each evaluation is saved.
+--
+-- Rows are created lazily: the first analytics read or evaluation for a user
+-- rebuilds the aggregate from their history. `version` guards concurrent
+-- updates (compare-and-set from services/user_stats_service.py).
+
+CREATE TABLE IF NOT EXISTS assessment_user_stats (
+    user_id text PRIMARY KEY,
+    total_evaluations integer NOT NULL DEFAULT 0,
+    total_words bigint NOT NULL DEFAULT 0,
+    type_counts jsonb NOT NULL DEFAULT '{}'::jsonb,
+    type_score_sums jsonb NOT NULL DEFAULT '{}'::jsonb,
+    type_scored_counts jsonb NOT NULL DEFAULT '{}'::jsonb,
+    component_sums jsonb NOT NULL DEFAULT '{}'::jsonb,
+    recent_grades jsonb NOT NULL DEFAULT '[]'::jsonb,
+    activity_start integer,
+    activity_bits text,
+    first_evaluation_at timestamptz,
+    last_evaluation_at timestamptz,
+    version integer NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
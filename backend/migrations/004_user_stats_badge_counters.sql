@@ -0,0 +1,16 @@
+-- Counters used by the incremental badge engine (services/badge_service.py).
+-- Existing aggregates are dropped so they are rebuilt with the new counters.
+
+ALTER TABLE assessment_user_stats
+    ADD COLUMN IF NOT EXISTS grade_improvements integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS last_grade_value integer;
+
+DELETE FROM assessment_user_stats;
+
+-- One row per earned badge lets the engine bulk-insert without duplicates
+DELETE FROM assessment_badges a
+    USING assessment_badges b
+    WHERE a.user_id = b.user_id AND a.badge_name = b.badge_name AND a.ctid > b.ctid;
+
+CREATE UNIQUE INDEX IF NOT EXISTS assessment_badges_user_badge_idx
+    ON assessment_badges (user_id, badge_name);
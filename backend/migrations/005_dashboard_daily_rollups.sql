@@ -0,0 +1,35 @@
+-- Daily admin dashboard rollups, maintained by services/rollup_service.py.
+--
+-- One row per (day, question_type, plan) holds evaluation counts, grade sums,
+-- grade bucket counts and a HyperLogLog sketch of the distinct users in the
+-- cell. The job folds in evaluations newer than the watermark stored in
+-- assessment_rollup_state, so each run only reads new rows.
+
+CREATE TABLE IF NOT EXISTS assessment_daily_rollups (
+    day date NOT NULL,
+    question_type text NOT NULL,
+    plan text NOT NULL,
+    evaluations integer NOT NULL DEFAULT 0,
+    graded integer NOT NULL DEFAULT 0,
+    grade_sum double precision NOT NULL DEFAULT 0,
+    grade_buckets jsonb NOT NULL DEFAULT '[0,0,0,0,0]'::jsonb,
+    users_hll text,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (day, question_type, plan)
+);
+
+CREATE TABLE IF NOT EXISTS assessment_rollup_state (
+    name text PRIMARY KEY,
+    watermark_timestamp timestamptz,
+    watermark_id text,
+    -- All-time distinct users, so totals need not merge every cell's sketch
+    users_hll text,
+    -- Lease so only one worker or cron run folds rows at a time
+    lease_owner text,
+    lease_until timestamptz,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- The job pages new evaluations in (timestamp, id) order
+CREATE INDEX IF NOT EXISTS assessment_evaluations_timestamp_id_idx
+    ON assessment_evaluations (timestamp, id);
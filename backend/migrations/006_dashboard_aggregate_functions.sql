@@ -0,0 +1,58 @@
+-- Database-side aggregates for the admin dashboard (services/dashboard_aggregates.py).
+--
+-- Each function returns a handful of rows, so the API no longer pulls whole
+-- columns (grades, credits, plans, user ids) to sum or count them in Python.
+-- Only the service role may call them.
+
+-- 'achieved/total' grade text as a percentage; NULL when it has no such pair
+CREATE OR REPLACE FUNCTION assessment_grade_percent(grade text)
+RETURNS double precision
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE WHEN m[2]::numeric > 0 THEN (m[1]::numeric / m[2]::numeric * 100)::double precision END
+    FROM (SELECT regexp_match(grade, '(\d+)\s*/\s*(\d+)') AS m) parsed
+$$;
+
+CREATE OR REPLACE FUNCTION admin_user_totals()
+RETURNS TABLE (total_users bigint, total_credits bigint, active_today bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT count(*),
+           coalesce(sum(credits), 0)::bigint,
+           count(*) FILTER (WHERE updated_at >= current_date)
+    FROM assessment_users
+$$;
+
+CREATE OR REPLACE FUNCTION admin_plan_counts()
+RETURNS TABLE (plan text, count bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(current_plan, 'free'), count(*)
+    FROM assessment_users
+    GROUP BY 1
+    ORDER BY 2 DESC
+$$;
+
+CREATE OR REPLACE FUNCTION admin_evaluation_totals(since timestamptz DEFAULT NULL)
+RETURNS TABLE (evaluations bigint, distinct_users bigint, graded bigint, average_grade double precision)
+LANGUAGE sql STABLE AS $$
+    SELECT count(*),
+           count(DISTINCT user_id),
+           count(assessment_grade_percent(grade)),
+           coalesce(avg(assessment_grade_percent(grade)), 0)
+    FROM assessment_evaluations
+    WHERE since IS NULL OR timestamp::timestamptz >= since
+$$;
+
+-- bucket is a date_trunc unit: 'hour', 'day', 'week' or 'month'
+CREATE OR REPLACE FUNCTION admin_evaluation_buckets(bucket text, since timestamptz)
+RETURNS TABLE (bucket_start timestamptz, evaluations bigint, distinct_users bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT date_trunc(bucket, timestamp::timestamptz), count(*), count(DISTINCT user_id)
+    FROM assessment_evaluations
+    WHERE timestamp::timestamptz >= since
+    GROUP BY 1
+    ORDER BY 1
+$$;
+
+REVOKE EXECUTE ON FUNCTION admin_user_totals(), admin_plan_counts(),
+    admin_evaluation_totals(timestamptz), admin_evaluation_buckets(text, timestamptz) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION admin_user_totals(), admin_plan_counts(),
+    admin_evaluation_totals(timestamptz), admin_evaluation_buckets(text, timestamptz) TO service_role;
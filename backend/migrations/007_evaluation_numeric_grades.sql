@@ -0,0 +1,24 @@
+-- Numeric grade columns written by the evaluation pipeline (utils/grading.py
+-- numeric_grade_fields), so analytics filter and aggregate without parsing the
+-- grade text. Existing rows are filled by `python -m scripts.backfill_numeric_grades`.
+
+ALTER TABLE assessment_evaluations
+    ADD COLUMN IF NOT EXISTS score double precision,
+    ADD COLUMN IF NOT EXISTS max_score double precision,
+    ADD COLUMN IF NOT EXISTS percentage double precision,
+    ADD COLUMN IF NOT EXISTS component_marks jsonb;
+
+CREATE INDEX IF NOT EXISTS assessment_evaluations_type_percentage_idx
+    ON assessment_evaluations (question_type, percentage);
+
+-- Prefer the stored percentage; parse only rows not yet backfilled
+CREATE OR REPLACE FUNCTION admin_evaluation_totals(since timestamptz DEFAULT NULL)
+RETURNS TABLE (evaluations bigint, distinct_users bigint, graded bigint, average_grade double precision)
+LANGUAGE sql STABLE AS $$
+    SELECT count(*),
+           count(DISTINCT user_id),
+           count(coalesce(percentage, assessment_grade_percent(grade))),
+           coalesce(avg(coalesce(percentage, assessment_grade_percent(grade))), 0)
+    FROM assessment_evaluations
+    WHERE since IS NULL OR timestamp::timestamptz >= since
+$$;
@@ -0,0 +1,28 @@
+-- Latest evaluations for many users in one call (admin global search).
+-- A lateral join takes the top `per_user` rows per user from the
+-- (user_id, timestamp) index instead of one request per user. The ids are
+-- taken as uuid[] so the probe compares the column uncast and can use that
+-- index.
+
+CREATE INDEX IF NOT EXISTS assessment_evaluations_user_timestamp_idx
+    ON assessment_evaluations (user_id, timestamp DESC);
+
+-- Replaces the earlier text[] signature, whose cast of the column defeated the index
+DROP FUNCTION IF EXISTS admin_recent_evaluations(text[], integer);
+
+CREATE OR REPLACE FUNCTION admin_recent_evaluations(user_ids uuid[], per_user integer DEFAULT 3)
+RETURNS TABLE (id text, short_id text, user_id text, question_type text, grade text, "timestamp" timestamptz)
+LANGUAGE sql STABLE AS $$
+    SELECT recent.*
+    FROM unnest(user_ids) AS wanted(uid)
+    CROSS JOIN LATERAL (
+        SELECT e.id::text, e.short_id::text, e.user_id::text, e.question_type, e.grade, e.timestamp::timestamptz
+        FROM assessment_evaluations e
+        WHERE e.user_id = wanted.uid
+        ORDER BY e.timestamp DESC
+        LIMIT per_user
+    ) recent
+$$;
+
+REVOKE EXECUTE ON FUNCTION admin_recent_evaluations(uuid[], integer) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION admin_recent_evaluations(uuid[], integer) TO service_role;
@@ -0,0 +1,88 @@
+-- Atomic rollup batches and live breakdowns for the admin dashboard.
+--
+-- assessment_apply_rollup_batch writes a batch's merged rollup cells and the
+-- advanced watermark in one transaction (services/rollup_service.py), so a run
+-- that dies mid-batch leaves neither behind and the next run folds the same
+-- rows onto the same stored cells. Cells carry absolute values, not
+-- increments: re-applying a batch cannot double-count.
+--
+-- admin_grade_distribution and admin_question_type_stats answer the grade and
+-- question type breakdowns from assessment_evaluations until the first rollup
+-- run, like admin_evaluation_totals does for the headline stats.
+
+CREATE OR REPLACE FUNCTION assessment_apply_rollup_batch(
+    cells jsonb,
+    lease_holder text,
+    expected_watermark_id text,
+    new_watermark_timestamp timestamptz,
+    new_watermark_id text,
+    new_users_hll text
+)
+RETURNS boolean
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Only the lease holder may commit, and only on top of the watermark it read
+    PERFORM 1 FROM assessment_rollup_state
+    WHERE name = 'daily_rollups'
+      AND lease_owner = lease_holder
+      AND watermark_id IS NOT DISTINCT FROM expected_watermark_id
+    FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN false;
+    END IF;
+
+    INSERT INTO assessment_daily_rollups AS r
+        (day, question_type, plan, evaluations, graded, grade_sum, grade_buckets, users_hll, updated_at)
+    SELECT c.day, c.question_type, c.plan, c.evaluations, c.graded, c.grade_sum, c.grade_buckets, c.users_hll, now()
+    FROM jsonb_to_recordset(cells) AS c(
+        day date, question_type text, plan text, evaluations integer, graded integer,
+        grade_sum double precision, grade_buckets jsonb, users_hll text
+    )
+    ON CONFLICT (day, question_type, plan) DO UPDATE SET
+        evaluations = excluded.evaluations,
+        graded = excluded.graded,
+        grade_sum = excluded.grade_sum,
+        grade_buckets = excluded.grade_buckets,
+        users_hll = excluded.users_hll,
+        updated_at = excluded.updated_at;
+
+    UPDATE assessment_rollup_state
+    SET watermark_timestamp = new_watermark_timestamp,
+        watermark_id = new_watermark_id,
+        users_hll = new_users_hll,
+        updated_at = now()
+    WHERE name = 'daily_rollups';
+    RETURN true;
+END
+$$;
+
+-- Ranges match rollup_service.GRADE_BUCKETS; percentages outside 0-100 are not counted
+CREATE OR REPLACE FUNCTION admin_grade_distribution()
+RETURNS TABLE (grade_range text, count bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT b.grade_range, count(p.value)
+    FROM (VALUES (1, '0-20', 0, 20), (2, '21-40', 21, 40), (3, '41-60', 41, 60),
+                 (4, '61-80', 61, 80), (5, '81-100', 81, 100)) AS b(position, grade_range, low, high)
+    LEFT JOIN (
+        SELECT round(coalesce(percentage, assessment_grade_percent(grade))) AS value
+        FROM assessment_evaluations
+    ) p ON p.value BETWEEN b.low AND b.high
+    GROUP BY b.position, b.grade_range
+    ORDER BY b.position
+$$;
+
+CREATE OR REPLACE FUNCTION admin_question_type_stats()
+RETURNS TABLE (question_type text, count bigint, average_grade double precision)
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(question_type, 'unknown'),
+           count(*),
+           coalesce(avg(coalesce(percentage, assessment_grade_percent(grade))), 0)
+    FROM assessment_evaluations
+    GROUP BY 1
+    ORDER BY 2 DESC
+$$;
+
+REVOKE EXECUTE ON FUNCTION assessment_apply_rollup_batch(jsonb, text, text, timestamptz, text, text),
+    admin_grade_distribution(), admin_question_type_stats() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION assessment_apply_rollup_batch(jsonb, text, text, timestamptz, text, text),
+    admin_grade_distribution(), admin_question_type_stats() TO service_role;
@@ -0,0 +1,10 @@
+-- Per-component mark counts for the analytics aggregate
+-- (services/user_stats_service.py). Component averages divide each sum by the
+-- number of evaluations that carried that mark, not by the question type's
+-- evaluation count. Existing aggregates are dropped so they are rebuilt with
+-- the counts; their legacy sums also counted unparseable marks as 0.
+
+ALTER TABLE assessment_user_stats
+    ADD COLUMN IF NOT EXISTS component_counts jsonb NOT NULL DEFAULT '{}'::jsonb;
+
+DELETE FROM assessment_user_stats;
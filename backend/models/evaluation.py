@@ -2,7 +2,7 @@
 Evaluation and feedback related Pydantic models.
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 
@@ -29,6 +29,11 @@ class FeedbackResponse(BaseModel):
     ao3_marks: Optional[str] = None
     content_structure_marks: Optional[str] = None
     style_accuracy_marks: Optional[str] = None
+    # Numeric forms of grade and the mark columns, parsed once when saved
+    score: Optional[float] = None
+    max_score: Optional[float] = None
+    percentage: Optional[float] = None
+    component_marks: Dict[str, float] = Field(default_factory=dict)
     improvement_suggestions: List[str]
     strengths: List[str] = Field(default_factory=list)
     next_steps: List[str] = Field(default_factory=list)
@@ -56,12 +56,11 @@ async def get_admin_status(request: Request):
     try:
         session_token = request.headers.get('X-Admin-Session')
         
-        if admin_auth_service.verify_session(session_token):
-            # Get session details
-            session = admin_auth_service.admin_sessions.get(session_token, {})
+        session = admin_auth_service.get_session(session_token)
+        if session:
             return AdminStatusResponse(
                 authenticated=True,
-                expires_at=session.get('expires_at', '').isoformat() if session.get('expires_at') else None
+                expires_at=session['expires_at'].isoformat() if session.get('expires_at') else None
             )
         else:
             return AdminStatusResponse(authenticated=False)
@@ -91,7 +90,7 @@ async def get_key_info():
     """Get admin key information (for setup)"""
     try:
         # Only return key info if no sessions exist (initial setup)
-        if not admin_auth_service.admin_sessions:
+        if not admin_auth_service.has_sessions():
             return {
                 "admin_key": admin_auth_service.get_admin_key(),
                 "message": "Save this key securely! Set ADMIN_SECRET_KEY environment variable."
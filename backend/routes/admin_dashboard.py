@@ -3,20 +3,35 @@ Admin Dashboard API Routes
 Provides comprehensive admin dashboard data
 """
 
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from collections import defaultdict
 from datetime import date
 
-from config.settings import get_supabase_client
+from config.container import container
+from config.settings import get_supabase_client, ADMIN_ANALYTICS_REFRESH_SECONDS, ANALYTICS_SNAPSHOT_DIR
 from utils.admin_auth import require_admin_access
+from utils.pagination import apply_keyset, build_page, clamp_page_size, count_option
+from services.admin_search import global_search
+from services.admin_user_detail import load_user_detail
+from utils.snapshot_cache import SnapshotCache, etag_matches
+from utils.export import EXPORT_FORMATS, export_stream, iter_keyset_batches
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/admin", tags=["admin-dashboard"])
 
+# Services (built on first use)
+supabase = container.lazy('supabase')
+user_management_service = container.lazy('user_management_service')
+rollup_service = container.lazy('rollup_service')
+dashboard_aggregates = container.lazy('dashboard_aggregates')
+admin_search_index = container.lazy('admin_search_index')
+user_stats_service = container.lazy('user_stats_service')
+
 # Pydantic models
 class DashboardStats(BaseModel):
     total_users: int
@@ -55,44 +70,25 @@ async def get_dashboard_stats(request: Request):
     """Get main dashboard statistics"""
     try:
         require_admin_access(request)
-        supabase = get_supabase_client()
-        
-        # Get total users
-        users_result = supabase.table('assessment_users').select('uid', count='exact').execute()
-        total_users = users_result.count or 0
-        
-        # Get total evaluations
-        evaluations_result = supabase.table('assessment_evaluations').select('id', count='exact').execute()
-        total_evaluations = evaluations_result.count or 0
-        
-        # Get average grade
-        grade_result = supabase.table('assessment_evaluations').select('grade').execute()
-        if grade_result.data:
-            total_score = sum(eval.get('grade', 0) for eval in grade_result.data)
-            average_grade = total_score / len(grade_result.data) if grade_result.data else 0
-        else:
-            average_grade = 0
         
-        # Get total credits used
-        credits_result = supabase.table('assessment_users').select('credits').execute()
-        total_credits_used = sum(user.get('credits', 0) for user in credits_result.data) if credits_result.data else 0
+        users = dashboard_aggregates.user_totals()
         
-        # Get active users today
-        today = datetime.now().date()
-        active_users_result = supabase.table('assessment_users').select('uid').gte('updated_at', today.isoformat()).execute()
-        active_users_today = len(active_users_result.data) if active_users_result.data else 0
+        # Evaluation totals, average grade and evaluating users come from the daily
+        # rollups; until the first rollup run they are aggregated in the database
+        totals = rollup_service.totals()
+        if totals['as_of'] is None:
+            totals = dashboard_aggregates.evaluation_totals()
         
-        # Calculate completion rate (users who have completed at least one evaluation)
-        completed_users_result = supabase.table('assessment_evaluations').select('user_id').execute()
-        unique_users = len(set(eval.get('user_id') for eval in completed_users_result.data)) if completed_users_result.data else 0
-        completion_rate = (unique_users / total_users * 100) if total_users > 0 else 0
+        # Completion rate: users who have completed at least one evaluation
+        total_users = users['total_users']
+        completion_rate = min(totals['distinct_users'] / total_users * 100, 100.0) if total_users > 0 else 0
         
         return DashboardStats(
             total_users=total_users,
-            total_evaluations=total_evaluations,
-            average_grade=round(average_grade, 2),
-            total_credits_used=total_credits_used,
-            active_users_today=active_users_today,
+            total_evaluations=totals['evaluations'],
+            average_grade=round(totals['average_grade'], 2),
+            total_credits_used=users['total_credits'],
+            active_users_today=users['active_today'],
             completion_rate=round(completion_rate, 2)
         )
         
@@ -105,17 +101,15 @@ async def get_evaluations_trend(request: Request, days: int = 30):
     """Get evaluations trend over time"""
     try:
         require_admin_access(request)
-        supabase = get_supabase_client()
         
-        # Get evaluations from the last N days
+        # Daily counts for the last N days from the rollups, or from the
+        # database aggregate until the first rollup run
         start_date = (datetime.now() - timedelta(days=days)).date()
-        result = supabase.table('assessment_evaluations').select('timestamp').gte('timestamp', start_date.isoformat()).execute()
-        
-        # Group by date
-        trends = {}
-        for eval in result.data or []:
-            date = eval.get('timestamp', '')[:10]  # Get YYYY-MM-DD
-            trends[date] = trends.get(date, 0) + 1
+        if rollup_service.as_of() is not None:
+            trends = rollup_service.daily_counts(start_date)
+        else:
+            since = datetime.combine(start_date, datetime.min.time())
+            trends = {row['bucket_start'][:10]: row['evaluations'] for row in dashboard_aggregates.evaluation_buckets('day', since)}
         
         # Fill in missing dates with 0
         trend_data = []
@@ -132,29 +126,15 @@ async def get_evaluations_trend(request: Request, days: int = 30):
 
 @router.get("/dashboard/grade-distribution", response_model=List[GradeDistribution])
 async def get_grade_distribution(request: Request):
-    """Get grade distribution"""
+    """Get grade distribution (percentage ranges)"""
     try:
         require_admin_access(request)
-        supabase = get_supabase_client()
-        
-        result = supabase.table('assessment_evaluations').select('grade').execute()
-        
-        # Define grade ranges
-        ranges = [
-            ("0-20", 0, 20),
-            ("21-40", 21, 40),
-            ("41-60", 41, 60),
-            ("61-80", 61, 80),
-            ("81-100", 81, 100)
-        ]
-        
-        distribution = []
-        for range_name, min_score, max_score in ranges:
-            count = sum(1 for eval in result.data or [] 
-                       if min_score <= eval.get('grade', 0) <= max_score)
-            distribution.append(GradeDistribution(grade_range=range_name, count=count))
-        
-        return distribution
+        # From the rollups, or from the database aggregate until the first rollup run
+        if rollup_service.as_of() is not None:
+            distribution = rollup_service.grade_distribution()
+        else:
+            distribution = dashboard_aggregates.grade_distribution()
+        return [GradeDistribution(**entry) for entry in distribution]
         
     except Exception as e:
         logger.error(f"Error getting grade distribution: {str(e)}")
@@ -162,36 +142,18 @@ async def get_grade_distribution(request: Request):
 
 @router.get("/dashboard/question-types", response_model=List[QuestionTypeStats])
 async def get_question_type_stats(request: Request):
-    """Get question type statistics"""
+    """Get question type statistics (average grade as a percentage)"""
     try:
         require_admin_access(request)
-        supabase = get_supabase_client()
-        
-        result = supabase.table('assessment_evaluations').select('question_type', 'grade').execute()
-        
-        # Group by question type
-        type_stats = {}
-        for eval in result.data or []:
-            q_type = eval.get('question_type', 'Unknown')
-            score = eval.get('grade', 0)
-            
-            if q_type not in type_stats:
-                type_stats[q_type] = {'count': 0, 'total_score': 0}
-            
-            type_stats[q_type]['count'] += 1
-            type_stats[q_type]['total_score'] += score
-        
-        # Calculate averages
-        stats = []
-        for q_type, data in type_stats.items():
-            avg_grade = data['total_score'] / data['count'] if data['count'] > 0 else 0
-            stats.append(QuestionTypeStats(
-                question_type=q_type,
-                count=data['count'],
-                average_grade=round(avg_grade, 2)
-            ))
-        
-        return sorted(stats, key=lambda x: x.count, reverse=True)
+        # From the rollups, or from the database aggregate until the first rollup run
+        if rollup_service.as_of() is not None:
+            question_types = rollup_service.question_types()
+        else:
+            question_types = dashboard_aggregates.question_type_stats()
+        return [
+            QuestionTypeStats(question_type=entry['question_type'], count=entry['count'], average_grade=round(entry['average_grade'], 2))
+            for entry in question_types
+        ]
         
     except Exception as e:
         logger.error(f"Error getting question type stats: {str(e)}")
@@ -202,20 +164,7 @@ async def get_subscription_stats(request: Request):
     """Get subscription statistics"""
     try:
         require_admin_access(request)
-        supabase = get_supabase_client()
-        
-        result = supabase.table('assessment_users').select('current_plan').execute()
-        
-        # Count by plan
-        plan_counts = {}
-        for user in result.data or []:
-            plan = user.get('current_plan', 'free')
-            plan_counts[plan] = plan_counts.get(plan, 0) + 1
-        
-        stats = []
-        for plan, count in plan_counts.items():
-            stats.append(SubscriptionStats(plan=plan, count=count))
-        
+        stats = [SubscriptionStats(**entry) for entry in dashboard_aggregates.plan_counts()]
         return sorted(stats, key=lambda x: x.count, reverse=True)
         
     except Exception as e:
@@ -262,9 +211,66 @@ async def get_recent_activity(request: Request, limit: int = 20):
         logger.error(f"Error getting recent activity: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Recent activity error: {str(e)}")
 
+USER_SORT_FIELDS = {"created_at", "updated_at", "display_name", "email", "credits", "questions_marked", "current_plan"}
+# Sort columns that can be paged by (column, uid) keyset cursors
+USER_KEYSET_FIELDS = {"created_at", "updated_at"}
+
+def _apply_user_filters(query, search: str = "", subscription: str = "", academic_level: str = "", min_credits: Optional[int] = None, max_credits: Optional[int] = None, created_from: str = "", created_to: str = ""):
+    """Apply the admin user listing filters to an assessment_users query."""
+    if subscription:
+        query = query.eq('current_plan', subscription)
+    if academic_level:
+        query = query.eq('academic_level', academic_level)
+    if min_credits is not None:
+        query = query.gte('credits', min_credits)
+    if max_credits is not None:
+        query = query.lte('credits', max_credits)
+    if created_from:
+        query = query.gte('created_at', created_from)
+    if created_to:
+        query = query.lte('created_at', created_to)
+    if search:
+        search_value = search.replace('%', '').replace(' ', '%')
+        query = query.or_(f"email.ilike.%{search_value}%,display_name.ilike.%{search_value}%,uid.ilike.%{search_value}%")
+    return query
+
+def _paginate(query, sort_column: str, id_column: str, sort_desc: bool, limit: int, offset: int, cursor: str, keyset_fields):
+    """Order and page a listing query.
+
+    Keyset pagination is used whenever the sort column supports it and the
+    caller is not explicitly asking for an offset page; otherwise the legacy
+    range() pagination is kept. Returns (query, uses_keyset).
+    """
+    if sort_column in keyset_fields and (cursor or offset == 0):
+        return apply_keyset(query, sort_column, id_column, cursor or None, sort_desc, limit), True
+    if cursor:
+        raise HTTPException(status_code=400, detail=f"Cursor pagination is not supported when sorting by {sort_column}")
+    return query.order(sort_column, desc=sort_desc).range(offset, offset + limit - 1), False
+
+def _page_response(result, limit: int, offset: int, sort_column: str, id_column: str, uses_keyset: bool) -> Dict[str, Any]:
+    """Build the listing response body shared by the admin listing endpoints."""
+    if uses_keyset:
+        rows, next_cursor = build_page(result.data, limit, sort_column, id_column)
+    else:
+        rows = result.data or []
+        next_cursor = None
+    return {
+        "data": rows,
+        "count": result.count if result.count is not None else len(rows),
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None if uses_keyset else (offset + len(rows) < (result.count or 0)),
+    }
+
 @router.get("/dashboard/users")
-async def get_all_users_admin(request: Request, limit: int = 25, offset: int = 0, search: str = "", sort_by: str = "created_at", sort_dir: str = "desc", subscription: str = "", academic_level: str = "", min_credits: str = "", max_credits: str = "", created_from: str = "", created_to: str = ""):
-    """Get all users for admin view with server-side search/sort/pagination and filters"""
+async def get_all_users_admin(request: Request, limit: int = 25, offset: int = 0, search: str = "", sort_by: str = "created_at", sort_dir: str = "desc", subscription: str = "", academic_level: str = "", min_credits: str = "", max_credits: str = "", created_from: str = "", created_to: str = "", cursor: str = "", count: str = "estimated"):
+    """Get all users for admin view with server-side search/sort/pagination and filters.
+
+    Sorting by created_at/updated_at pages with an opaque `cursor` (returned as
+    next_cursor); other sort columns fall back to offset pagination. `count`
+    selects exact, estimated, planned or none.
+    """
     try:
         require_admin_access(request)
         supabase = get_supabase_client()
@@ -273,33 +279,19 @@ async def get_all_users_admin(request: Request, limit: int = 25, offset: int = 0
         min_credits_int = int(min_credits) if min_credits else None
         max_credits_int = int(max_credits) if max_credits else None
 
-        allowed_sort_fields = {"created_at", "updated_at", "display_name", "email", "credits", "questions_marked", "current_plan"}
-        sort_column = sort_by if sort_by in allowed_sort_fields else "created_at"
+        sort_column = sort_by if sort_by in USER_SORT_FIELDS else "created_at"
         sort_desc = (sort_dir.lower() != "asc")
+        limit = clamp_page_size(limit)
+        filters = dict(
+            search=search, subscription=subscription, academic_level=academic_level,
+            min_credits=min_credits_int, max_credits=max_credits_int,
+            created_from=created_from, created_to=created_to
+        )
 
-        logger.info(f"[ADMIN_USERS] start limit={limit} offset={offset} search='{search}' sort_by={sort_by} sort_dir={sort_dir} sub={subscription} level={academic_level} minC={min_credits_int} maxC={max_credits_int} from={created_from} to={created_to}")
-
-        query = supabase.table('assessment_users').select('*', count='exact')
-
-        if subscription:
-            query = query.eq('current_plan', subscription)
-        if academic_level:
-            query = query.eq('academic_level', academic_level)
-        if min_credits_int is not None:
-            query = query.gte('credits', min_credits_int)
-        if max_credits_int is not None:
-            query = query.lte('credits', max_credits_int)
-        if created_from:
-            query = query.gte('created_at', created_from)
-        if created_to:
-            query = query.lte('created_at', created_to)
-
-        if search:
-            search_value = search.replace('%', '').replace(' ', '%')
-            or_filter = f"email.ilike.%{search_value}%,display_name.ilike.%{search_value}%,uid.ilike.%{search_value}%"
-            query = query.or_(or_filter)
-
-        query = query.order(sort_column, desc=sort_desc).range(offset, offset + limit - 1)
+        logger.info(f"[ADMIN_USERS] start limit={limit} offset={offset} cursor={'yes' if cursor else 'no'} search='{search}' sort_by={sort_by} sort_dir={sort_dir} sub={subscription} level={academic_level} minC={min_credits_int} maxC={max_credits_int} from={created_from} to={created_to}")
+
+        query = _apply_user_filters(supabase.table('assessment_users').select('*', count=count_option(count)), **filters)
+        query, uses_keyset = _paginate(query, sort_column, 'uid', sort_desc, limit, offset, cursor, USER_KEYSET_FIELDS)
         try:
             result = query.execute()
             logger.info(f"[ADMIN_USERS] primary rows={len(result.data or [])} count={result.count}")
@@ -309,40 +301,54 @@ async def get_all_users_admin(request: Request, limit: int = 25, offset: int = 0
 
         if result.data is None:
             logger.warning("[ADMIN_USERS] primary data is None; returning empty structure")
-            return {"data": [], "count": result.count or 0, "limit": limit, "offset": offset}
+            return {"data": [], "count": result.count or 0, "limit": limit, "offset": offset, "next_cursor": None, "has_more": False}
 
         if not result.data:
             logger.info("[ADMIN_USERS] primary returned 0 rows; trying active_assessment_users")
-            alt_q = supabase.table('active_assessment_users').select('*', count='exact')
-            if subscription:
-                alt_q = alt_q.eq('current_plan', subscription)
-            if academic_level:
-                alt_q = alt_q.eq('academic_level', academic_level)
-            if min_credits_int is not None:
-                alt_q = alt_q.gte('credits', min_credits_int)
-            if max_credits_int is not None:
-                alt_q = alt_q.lte('credits', max_credits_int)
-            if created_from:
-                alt_q = alt_q.gte('created_at', created_from)
-            if created_to:
-                alt_q = alt_q.lte('created_at', created_to)
-            if search:
-                search_value = search.replace('%', '').replace(' ', '%')
-                alt_q = alt_q.or_(f"email.ilike.%{search_value}%,display_name.ilike.%{search_value}%,uid.ilike.%{search_value}%")
-            alt_q = alt_q.order(sort_column if sort_column in {"created_at","updated_at","display_name","email","credits","questions_marked","current_plan"} else 'created_at', desc=sort_desc).range(offset, offset + limit - 1)
+            alt_q = _apply_user_filters(supabase.table('active_assessment_users').select('*', count=count_option(count)), **filters)
+            alt_q, uses_keyset = _paginate(alt_q, sort_column, 'uid', sort_desc, limit, offset, cursor, USER_KEYSET_FIELDS)
             try:
                 alt_res = alt_q.execute()
                 logger.info(f"[ADMIN_USERS] fallback rows={len(alt_res.data or [])} count={alt_res.count}")
-                return {"data": alt_res.data or [], "count": alt_res.count or 0, "limit": limit, "offset": offset}
+                return _page_response(alt_res, limit, offset, sort_column, 'uid', uses_keyset)
             except Exception as e:
                 logger.error(f"[ADMIN_USERS] fallback query error: {e}")
                 raise
 
-        return {"data": result.data or [], "count": result.count or 0, "limit": limit, "offset": offset}
+        return _page_response(result, limit, offset, sort_column, 'uid', uses_keyset)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"[ADMIN_USERS] fatal error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Users error: {str(e)}")
 
+EVALUATION_SORT_FIELDS = {"timestamp", "grade", "question_type"}
+EVALUATION_KEYSET_FIELDS = {"timestamp"}
+EVALUATION_BASIC_FIELDS = "id, short_id, user_id, question_type, grade, reading_marks, writing_marks, ao1_marks, ao2_marks, ao3_marks, timestamp"
+EVALUATION_DETAIL_FIELDS = "id, short_id, user_id, question_type, grade, reading_marks, writing_marks, ao1_marks, ao2_marks, ao3_marks, content_structure_marks, style_accuracy_marks, student_response, improvement_suggestions, strengths, next_steps, feedback, timestamp"
+
+def _apply_evaluation_filters(query, search: str = "", question_types: str = "", user_id: str = "", date_from: str = "", date_to: str = "", grade_contains: str = ""):
+    """Apply the admin evaluation listing filters to an assessment_evaluations query."""
+    if question_types:
+        types_list = [t for t in (question_types.split(',') if question_types else []) if t]
+        if types_list:
+            query = query.in_('question_type', types_list)
+    if user_id:
+        query = query.eq('user_id', user_id)
+    if date_from:
+        query = query.gte('timestamp', date_from)
+    if date_to:
+        query = query.lte('timestamp', date_to)
+    if grade_contains:
+        try:
+            query = query.ilike('grade', f"%{grade_contains}%")
+        except Exception:
+            query = query.or_(f"grade.ilike.%{grade_contains}%")
+    if search:
+        search_value = search.replace('%', '').replace(' ', '%')
+        query = query.or_(f"short_id.ilike.%{search_value}%,question_type.ilike.%{search_value}%,user_id.ilike.%{search_value}%")
+    return query
+
 @router.get("/dashboard/evaluations")
 async def get_all_evaluations_admin(
     request: Request,
@@ -356,58 +362,125 @@ async def get_all_evaluations_admin(
     user_id: str = "",
     date_from: str = "",
     date_to: str = "",
-    grade_contains: str = ""
+    grade_contains: str = "",
+    cursor: str = "",
+    count: str = "estimated"
 ):
-    """Get all evaluations for admin view with server-side search/sort/pagination and filters."""
+    """Get all evaluations for admin view with server-side search/sort/pagination and filters.
+
+    Sorting by timestamp pages on (timestamp, id) with an opaque `cursor`.
+    """
     try:
         require_admin_access(request)
         supabase = get_supabase_client()
 
-        allowed_sort_fields = {"timestamp", "grade", "question_type"}
-        sort_column = sort_by if sort_by in allowed_sort_fields else "timestamp"
+        sort_column = sort_by if sort_by in EVALUATION_SORT_FIELDS else "timestamp"
         sort_desc = (sort_dir.lower() != "asc")
+        limit = clamp_page_size(limit)
 
-        if include == "details":
-            select_fields = "id, short_id, user_id, question_type, grade, reading_marks, writing_marks, ao1_marks, ao2_marks, ao3_marks, content_structure_marks, style_accuracy_marks, student_response, improvement_suggestions, strengths, next_steps, feedback, timestamp"
-        else:
-            select_fields = "id, short_id, user_id, question_type, grade, reading_marks, writing_marks, ao1_marks, ao2_marks, ao3_marks, timestamp"
-
-        query = supabase.table('assessment_evaluations').select(select_fields, count='exact')
-
-        if question_types:
-            types_list = [t for t in (question_types.split(',') if question_types else []) if t]
-            if types_list:
-                query = query.in_('question_type', types_list)
-        if user_id:
-            query = query.eq('user_id', user_id)
-        if date_from:
-            query = query.gte('timestamp', date_from)
-        if date_to:
-            query = query.lte('timestamp', date_to)
-        if grade_contains:
-            try:
-                query = query.ilike('grade', f"%{grade_contains}%")
-            except Exception:
-                query = query.or_(f"grade.ilike.%{grade_contains}%")
-
-        if search:
-            search_value = search.replace('%', '').replace(' ', '%')
-            or_filter = f"short_id.ilike.%{search_value}%,question_type.ilike.%{search_value}%,user_id.ilike.%{search_value}%"
-            query = query.or_(or_filter)
-
-        query = query.order(sort_column, desc=sort_desc).range(offset, offset + limit - 1)
+        select_fields = EVALUATION_DETAIL_FIELDS if include == "details" else EVALUATION_BASIC_FIELDS
+        query = supabase.table('assessment_evaluations').select(select_fields, count=count_option(count))
+        query = _apply_evaluation_filters(
+            query, search=search, question_types=question_types, user_id=user_id,
+            date_from=date_from, date_to=date_to, grade_contains=grade_contains
+        )
+        query, uses_keyset = _paginate(query, sort_column, 'id', sort_desc, limit, offset, cursor, EVALUATION_KEYSET_FIELDS)
         result = query.execute()
 
-        return {
-            "data": result.data or [],
-            "count": result.count or 0,
-            "limit": limit,
-            "offset": offset
-        }
+        return _page_response(result, limit, offset, sort_column, 'id', uses_keyset)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting evaluations: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Evaluations error: {str(e)}")
 
+def _export_response(batches, fmt: str, gzip: bool, name: str, columns: Optional[List[str]] = None) -> StreamingResponse:
+    """Stream batches as a csv/ndjson attachment, gzipped on the fly when asked."""
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{fmt}{'.gz' if gzip else ''}"
+    return StreamingResponse(
+        export_stream(batches, fmt, gzip=gzip, columns=columns, label=f"[ADMIN_EXPORT] {name}"),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def _export_format(fmt: str) -> str:
+    fmt = (fmt or "csv").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {fmt}")
+    return fmt
+
+@router.get("/dashboard/users/export")
+async def export_users_admin(request: Request, format: str = "csv", gzip: bool = False, search: str = "", sort_by: str = "created_at", sort_dir: str = "desc", subscription: str = "", academic_level: str = "", min_credits: str = "", max_credits: str = "", created_from: str = "", created_to: str = ""):
+    """Export every user matching the /dashboard/users filters as CSV or NDJSON.
+
+    Rows are streamed in keyset-paged batches (by created_at or updated_at), so
+    memory use does not grow with the size of the export.
+    """
+    try:
+        require_admin_access(request)
+        supabase = get_supabase_client()
+        fmt = _export_format(format)
+        filters = dict(
+            search=search, subscription=subscription, academic_level=academic_level,
+            min_credits=int(min_credits) if min_credits else None,
+            max_credits=int(max_credits) if max_credits else None,
+            created_from=created_from, created_to=created_to
+        )
+        sort_column = sort_by if sort_by in USER_KEYSET_FIELDS else "created_at"
+        logger.info(f"[ADMIN_EXPORT] users format={fmt} gzip={gzip} filters={filters}")
+
+        batches = iter_keyset_batches(
+            lambda: _apply_user_filters(supabase.table('assessment_users').select('*'), **filters),
+            sort_column, 'uid', sort_dir.lower() != "asc"
+        )
+        return _export_response(batches, fmt, gzip, "users")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"[ADMIN_EXPORT] users error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Users export error: {str(e)}")
+
+@router.get("/dashboard/evaluations/export")
+async def export_evaluations_admin(
+    request: Request,
+    format: str = "csv",
+    gzip: bool = False,
+    include: str = "basic",
+    search: str = "",
+    sort_dir: str = "desc",
+    question_types: str = "",  # comma-separated
+    user_id: str = "",
+    date_from: str = "",
+    date_to: str = "",
+    grade_contains: str = ""
+):
+    """Export every evaluation matching the /dashboard/evaluations filters as CSV or NDJSON.
+
+    Rows are streamed in (timestamp, id) keyset-paged batches.
+    """
+    try:
+        require_admin_access(request)
+        supabase = get_supabase_client()
+        fmt = _export_format(format)
+        select_fields = EVALUATION_DETAIL_FIELDS if include == "details" else EVALUATION_BASIC_FIELDS
+        logger.info(f"[ADMIN_EXPORT] evaluations format={fmt} gzip={gzip} include={include} types={question_types} user={user_id} from={date_from} to={date_to}")
+
+        def build_query():
+            return _apply_evaluation_filters(
+                supabase.table('assessment_evaluations').select(select_fields),
+                search=search, question_types=question_types, user_id=user_id,
+                date_from=date_from, date_to=date_to, grade_contains=grade_contains
+            )
+
+        batches = iter_keyset_batches(build_query, 'timestamp', 'id', sort_dir.lower() != "asc")
+        columns = [field.strip() for field in select_fields.split(',')]
+        return _export_response(batches, fmt, gzip, "evaluations", columns)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"[ADMIN_EXPORT] evaluations error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Evaluations export error: {str(e)}")
+
 @router.get("/search")
 async def admin_global_search(request: Request, q: str, limit: int = 10):
     """Global admin search across users, evaluations, and feedback with related data."""
@@ -418,449 +491,74 @@ async def admin_global_search(request: Request, q: str, limit: int = 10):
         if not query:
             return {"query": q, "users": [], "evaluations": [], "feedback": []}
 
-        # Users
-        users_q = supabase.table('assessment_users').select('uid, email, display_name, current_plan, credits, created_at') \
-            .or_(f"uid.ilike.%{query}%,email.ilike.%{query}%,display_name.ilike.%{query}%") \
-            .order('created_at', desc=True).limit(limit).execute()
-        users = users_q.data or []
-
-        # Evaluations - search by short_id, full id, user_id, question_type, and grade
-        evals_q = supabase.table('assessment_evaluations').select('id, short_id, user_id, question_type, grade, timestamp') \
-            .or_(f"short_id.ilike.%{query}%,id.ilike.%{query}%,user_id.ilike.%{query}%,question_type.ilike.%{query}%,grade.ilike.%{query}%") \
-            .order('timestamp', desc=True).limit(limit).execute()
-        evaluations = evals_q.data or []
-
-        # Feedback - search by comments, category, evaluation_id, and user_id
-        try:
-            fb_q = supabase.table('assessment_feedback').select('id, evaluation_id, user_id, category, accurate, comments, created_at') \
-                .or_(f"comments.ilike.%{query}%,category.ilike.%{query}%,evaluation_id.ilike.%{query}%,user_id.ilike.%{query}%") \
-                .order('created_at', desc=True).limit(limit).execute()
-            feedback = fb_q.data or []
-        except Exception:
-            feedback = []
-
-        # Related: users for evaluations
-        user_ids = list({e.get('user_id') for e in evaluations if e.get('user_id')})
-        users_map: Dict[str, Any] = {}
-        if user_ids:
-            users_rel_q = supabase.table('assessment_users').select('uid, email, display_name, current_plan') \
-                .in_('uid', user_ids).execute()
-            for u in users_rel_q.data or []:
-                users_map[u['uid']] = u
-        evaluations_with_users = [
-            {**e, 'user': users_map.get(e.get('user_id'))} for e in evaluations
-        ]
-
-        # Related: recent evaluations for users
-        users_with_recent: List[Dict[str, Any]] = []
-        for u in users[:limit]:
-            try:
-                recent = supabase.table('assessment_evaluations').select('id, short_id, question_type, grade, timestamp') \
-                    .eq('user_id', u['uid']).order('timestamp', desc=True).limit(3).execute()
-                users_with_recent.append({**u, 'recent_evaluations': recent.data or []})
-            except Exception:
-                users_with_recent.append({**u, 'recent_evaluations': []})
-
-        return {
-            "query": q,
-            "users": users_with_recent,
-            "evaluations": evaluations_with_users,
-            "feedback": feedback
-        }
+        # Served from the shared index once built; the database path covers the first build
+        if admin_search_index.ready:
+            results = await admin_search_index.search(query, limit)
+        else:
+            results = await global_search(supabase, user_management_service, query, limit)
+        return {"query": q, **results}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Admin global search error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
+def _read_all(supabase, table: str, columns: List[str], sort_column: str, id_column: str) -> List[Dict[str, Any]]:
+    """Every row of a table in keyset pages; one unpaged select stops at PostgREST's max-rows cap."""
+    batches = iter_keyset_batches(lambda: supabase.table(table).select(', '.join(columns)), sort_column, id_column, False)
+    return [row for batch in batches for row in batch]
+
+def _build_admin_analytics(days: int) -> Dict[str, Any]:
+    """Fetch the base datasets and compute the analytics payload (blocking)."""
+    # pandas and the snapshot reader are only needed here; keep them out of app startup
+    import pandas as pd
+    from services.admin_analytics import USER_COLUMNS, EVALUATION_COLUMNS, load_frames, prepare_frames, compute_admin_analytics
+    from services.analytics_snapshot import load_evaluation_history
+
+    supabase = get_supabase_client()
+    # Base datasets, loaded once into columnar frames
+    users_rows = _read_all(supabase, 'assessment_users', USER_COLUMNS, 'created_at', 'uid')
+    try:
+        history = load_evaluation_history(supabase, ANALYTICS_SNAPSHOT_DIR, EVALUATION_COLUMNS)
+    except Exception as e:
+        logger.error(f"Analytics snapshot unreadable, querying evaluations directly: {str(e)}")
+        history = None
+    if history is not None:
+        users, evals = prepare_frames(pd.DataFrame.from_records(users_rows, columns=USER_COLUMNS), history)
+        return compute_admin_analytics(users, evals, days)
+    evals_rows = _read_all(supabase, 'assessment_evaluations', EVALUATION_COLUMNS, 'timestamp', 'id')
+    users, evals = load_frames(users_rows, evals_rows)
+    return compute_admin_analytics(users, evals, days)
+
+async def _compute_admin_analytics(days: int) -> Dict[str, Any]:
+    # Off the event loop: the fetch and the frame work take seconds on large tables
+    return await asyncio.to_thread(_build_admin_analytics, days)
+
+# Snapshots per days value, served stale-while-revalidate
+admin_analytics_cache = SnapshotCache(_compute_admin_analytics, refresh_interval=ADMIN_ANALYTICS_REFRESH_SECONDS)
+
 @router.get("/analytics")
 async def get_admin_analytics(request: Request, days: int = 30):
-    """Ultra-comprehensive analytics for admin: totals, trends, distributions, time-based analysis, and much more."""
+    """Ultra-comprehensive analytics for admin: totals, trends, distributions, time-based analysis, and much more.
+
+    Served from a cached snapshot (see `as_of`); send If-None-Match with the
+    last ETag to get a 304 when nothing has changed.
+    """
     try:
-        logger.info("=== ANALYTICS ENDPOINT DEBUG START ===")
-        logger.info(f"Days parameter: {days}")
+        logger.info(f"Admin analytics requested for {days} days")
         
         require_admin_access(request)
-        logger.info("Admin access verified for analytics")
-        
-        supabase = get_supabase_client()
-        logger.info("Supabase client obtained for analytics")
-        from datetime import datetime, timedelta, date
-        from collections import Counter
-        import statistics
         
         # Ensure days is within reasonable bounds
         days = max(1, min(days, 365))
-        
-        start_dt = datetime.utcnow() - timedelta(days=days)
-        start_date = start_dt.date().isoformat()
-
-        # Helpers
-        def parse_grade_value(g):
-            try:
-                if g is None:
-                    return 0.0
-                if isinstance(g, (int, float)):
-                    return float(g)
-                s = str(g)
-                if '/' in s:
-                    num, den = s.split('/')[:2]
-                    num = float(num.strip() or 0)
-                    den = float(den.strip() or 1)
-                    return (num / den) * 100.0 if den else num
-                return float(s)
-            except Exception:
-                return 0.0
-
-        # Base datasets - get more comprehensive data
-        users_rows = supabase.table('assessment_users').select('uid, email, display_name, current_plan, credits, created_at, updated_at').execute().data or []
-        evals_rows = supabase.table('assessment_evaluations').select('id, user_id, question_type, grade, timestamp, short_id, reading_marks, writing_marks, ao1_marks, ao2_marks').execute().data or []
-
-        # Enhanced totals with growth trends
-        total_users = len(users_rows)
-        total_evaluations = len(evals_rows)
-        users_with_evals = {e.get('user_id') for e in evals_rows if e.get('user_id')}
-        unique_users_with_evals = len(users_with_evals)
-
-        # Growth trend calculations
-        prev_period_start = start_dt - timedelta(days=days)
-        prev_period_date = prev_period_start.date().isoformat()
-        
-        prev_users = sum(1 for u in users_rows if prev_period_date <= (u.get('created_at') or '')[:10] < start_date)
-        new_users = sum(1 for u in users_rows if (u.get('created_at') or '')[:10] >= start_date)
-        user_growth_rate = f"{((new_users - prev_users) / prev_users * 100) if prev_users else 0:.1f}%"
-        user_growth_trend = "up" if new_users > prev_users else "down" if new_users < prev_users else "flat"
-
-        prev_evals = sum(1 for e in evals_rows if prev_period_date <= (e.get('timestamp') or '')[:10] < start_date)
-        evals_last_n = sum(1 for e in evals_rows if (e.get('timestamp') or '')[:10] >= start_date)
-        eval_growth_rate = f"{((evals_last_n - prev_evals) / prev_evals * 100) if prev_evals else 0:.1f}%"
-        eval_growth_trend = "up" if evals_last_n > prev_evals else "down" if evals_last_n < prev_evals else "flat"
-
-        # Advanced user metrics
-        avg_evals_per_user = (total_evaluations / total_users) if total_users else 0
-
-        # Activity-based user counts with more granular periods
-        def get_active_users(period_days):
-            cutoff = (datetime.utcnow() - timedelta(days=period_days)).date().isoformat()
-            return len({e.get('user_id') for e in evals_rows if e.get('user_id') and (e.get('timestamp') or '')[:10] >= cutoff})
-
-        active_1d = get_active_users(1)
-        active_7d = get_active_users(7)
-        active_30d = get_active_users(30)
-
-        # Retention calculations
-        retention_7d = (active_7d / total_users * 100) if total_users else 0
-        retention_30d = (active_30d / total_users * 100) if total_users else 0
-        retention_rate = (unique_users_with_evals / total_users * 100) if total_users else 0
-
-        # Conversion rates
-        conversion_overall = (unique_users_with_evals / total_users * 100) if total_users else 0
-        recent_users = sum(1 for u in users_rows if (u.get('created_at') or '')[:10] >= start_date)
-        recent_converted = len({e.get('user_id') for e in evals_rows if e.get('user_id') and (e.get('timestamp') or '')[:10] >= start_date})
-        conversion_last_n = (recent_converted / recent_users * 100) if recent_users else 0
-
-        # Revenue estimation (basic calculation)
-        plan_revenue = {'free': 0, 'basic': 9.99, 'premium': 19.99, 'pro': 39.99}
-        estimated_revenue = sum(plan_revenue.get(u.get('current_plan', 'free'), 0) for u in users_rows)
-
-        # Enhanced daily breakdown with more metrics
-        daily = {}
-        for i in range(days):
-            day = (start_dt.date() + timedelta(days=i)).isoformat()
-            daily[day] = {
-                'date': day,
-                'evaluations': 0,
-                'new_users': 0,
-                'active_users': 0,
-                'grades': [],
-                'cumulative_users': 0,
-                'cumulative_evaluations': 0
-            }
-
-        # Populate daily data
-        for u in users_rows:
-            day = (u.get('created_at') or '')[:10]
-            if day in daily:
-                daily[day]['new_users'] += 1
-
-        for e in evals_rows:
-            day = (e.get('timestamp') or '')[:10]
-            if day in daily:
-                daily[day]['evaluations'] += 1
-                grade = parse_grade_value(e.get('grade'))
-                if grade > 0:
-                    daily[day]['grades'].append(grade)
-
-        # Calculate cumulative and derived metrics
-        cumulative_users = sum(1 for u in users_rows if (u.get('created_at') or '')[:10] < start_date)
-        cumulative_evals = sum(1 for e in evals_rows if (e.get('timestamp') or '')[:10] < start_date)
-
-        for day in sorted(daily.keys()):
-            cumulative_users += daily[day]['new_users']
-            cumulative_evals += daily[day]['evaluations']
-            daily[day]['cumulative_users'] = cumulative_users
-            daily[day]['cumulative_evaluations'] = cumulative_evals
-            daily[day]['avg_grade'] = sum(daily[day]['grades']) / len(daily[day]['grades']) if daily[day]['grades'] else 0
-            daily[day]['retention_rate'] = (daily[day]['evaluations'] / max(daily[day]['new_users'], 1)) * 100
-
-        # Hourly distribution analysis
-        hourly_dist = defaultdict(lambda: {'count': 0, 'grades': []})
-        for e in evals_rows:
-            if e.get('timestamp'):
-                try:
-                    hour = datetime.fromisoformat(e['timestamp'].replace('Z', '+00:00')).hour
-                    hourly_dist[hour]['count'] += 1
-                    grade = parse_grade_value(e.get('grade'))
-                    if grade > 0:
-                        hourly_dist[hour]['grades'].append(grade)
-                except:
-                    pass
-
-        hourly_distribution = [
-            {
-                'hour': h,
-                'count': hourly_dist[h]['count'],
-                'avg_grade': sum(hourly_dist[h]['grades']) / len(hourly_dist[h]['grades']) if hourly_dist[h]['grades'] else 0
-            }
-            for h in range(24)
-        ]
-
-        # Weekly distribution analysis
-        weekly_dist = defaultdict(lambda: {'count': 0, 'grades': []})
-        for e in evals_rows:
-            if e.get('timestamp'):
-                try:
-                    weekday = datetime.fromisoformat(e['timestamp'].replace('Z', '+00:00')).weekday()
-                    weekly_dist[weekday]['count'] += 1
-                    grade = parse_grade_value(e.get('grade'))
-                    if grade > 0:
-                        weekly_dist[weekday]['grades'].append(grade)
-                except:
-                    pass
-
-        weekly_distribution = [
-            {
-                'day_of_week': d,
-                'count': weekly_dist[d]['count'],
-                'avg_grade': sum(weekly_dist[d]['grades']) / len(weekly_dist[d]['grades']) if weekly_dist[d]['grades'] else 0
-            }
-            for d in range(7)
-        ]
-
-        # Enhanced question type analysis
-        qtype = defaultdict(lambda: {'count': 0, 'grades': [], 'users': set(), 'recent': 0})
-        qt_recent = defaultdict(int)
-        
-        for e in evals_rows:
-            qt = e.get('question_type') or 'Unknown'
-            qtype[qt]['count'] += 1
-            qtype[qt]['users'].add(e.get('user_id'))
-            
-            if (e.get('timestamp') or '')[:10] >= start_date:
-                qt_recent[qt] += 1
-                qtype[qt]['recent'] += 1
-            
-            grade = parse_grade_value(e.get('grade'))
-            if grade > 0:
-                qtype[qt]['grades'].append(grade)
-
-        # Convert to final format with additional metrics
-        for qt in qtype:
-            grades = qtype[qt]['grades']
-            qtype[qt]['avg_grade'] = sum(grades) / len(grades) if grades else 0
-            qtype[qt]['unique_users'] = len(qtype[qt]['users'])
-            qtype[qt]['completion_rate'] = (qtype[qt]['count'] / qtype[qt]['unique_users']) if qtype[qt]['unique_users'] else 0
-            qtype[qt]['avg_time_spent'] = 0  # Placeholder for future time tracking
-            del qtype[qt]['users']  # Remove set for JSON serialization
-            del qtype[qt]['grades']  # Remove list for cleaner output
-
-        # Grade distribution analysis
-        all_grades = [parse_grade_value(e.get('grade')) for e in evals_rows if parse_grade_value(e.get('grade')) > 0]
-        
-        grade_ranges = [
-            ('0-20', 0, 20), ('21-40', 21, 40), ('41-60', 41, 60),
-            ('61-80', 61, 80), ('81-100', 81, 100)
-        ]
-        
-        grade_distribution = []
-        for range_name, min_grade, max_grade in grade_ranges:
-            count = sum(1 for g in all_grades if min_grade <= g <= max_grade)
-            percentage = (count / len(all_grades) * 100) if all_grades else 0
-            grade_distribution.append({
-                'range': range_name,
-                'count': count,
-                'percentage': percentage
-            })
-
-        # Enhanced grade statistics
-        grade_stats = {}
-        if all_grades:
-            grade_stats = {
-                'avg': round(sum(all_grades) / len(all_grades), 2),
-                'p25': round(statistics.quantiles(all_grades, n=4)[0], 2),
-                'p50': round(statistics.median(all_grades), 2),
-                'p75': round(statistics.quantiles(all_grades, n=4)[2], 2),
-                'p90': round(statistics.quantiles(all_grades, n=10)[8], 2),
-                'std_dev': round(statistics.stdev(all_grades), 2),
-                'total_graded': len(all_grades),
-                'min': round(min(all_grades), 2),
-                'max': round(max(all_grades), 2)
-            }
-
-        # Plan distribution with enhanced metrics
-        plan_counts = Counter(u.get('current_plan', 'free') for u in users_rows)
-        plan_data = []
-        for plan, count in plan_counts.items():
-            plan_users = [u for u in users_rows if u.get('current_plan') == plan]
-            plan_evals = [e for e in evals_rows if e.get('user_id') in {u.get('uid') for u in plan_users}]
-            
-            plan_data.append({
-                'plan': plan,
-                'count': count,
-                'revenue': count * plan_revenue.get(plan, 0),
-                'avg_evaluations': len(plan_evals) / count if count else 0,
-                'churn_rate': 0  # Placeholder for churn calculation
-            })
-
-        # Enhanced user distribution
-        user_eval_counts = Counter()
-        for e in evals_rows:
-            if e.get('user_id'):
-                user_eval_counts[e['user_id']] += 1
-
-        eval_buckets = ['0', '1', '2-5', '6-10', '11-20', '21+']
-        distribution = []
-        for bucket in eval_buckets:
-            if bucket == '0':
-                count = total_users - len(user_eval_counts)
-            elif bucket == '1':
-                count = sum(1 for c in user_eval_counts.values() if c == 1)
-            elif bucket == '2-5':
-                count = sum(1 for c in user_eval_counts.values() if 2 <= c <= 5)
-            elif bucket == '6-10':
-                count = sum(1 for c in user_eval_counts.values() if 6 <= c <= 10)
-            elif bucket == '11-20':
-                count = sum(1 for c in user_eval_counts.values() if 11 <= c <= 20)
-            elif bucket == '21+':
-                count = sum(1 for c in user_eval_counts.values() if c >= 21)
-            else:
-                count = 0
-            
-            distribution.append({'bucket': bucket, 'users': count})
-
-        # Enhanced top users with more metrics
-        user_stats = defaultdict(lambda: {'count': 0, 'grades': [], 'days': set(), 'streak': 0})
-        
-        for e in evals_rows:
-            if (e.get('timestamp') or '')[:10] >= start_date and e.get('user_id'):
-                user_id = e['user_id']
-                user_stats[user_id]['count'] += 1
-                user_stats[user_id]['days'].add((e.get('timestamp') or '')[:10])
-                grade = parse_grade_value(e.get('grade'))
-                if grade > 0:
-                    user_stats[user_id]['grades'].append(grade)
-
-        # Get user display names
-        user_names = {u.get('uid'): u.get('display_name') or u.get('email', '').split('@')[0] for u in users_rows}
-        
-        top_users_last_n = []
-        for user_id, stats in sorted(user_stats.items(), key=lambda x: x[1]['count'], reverse=True)[:20]:
-            top_users_last_n.append({
-                'user_id': user_id,
-                'display_name': user_names.get(user_id, 'Unknown'),
-                'count': stats['count'],
-                'avg_grade': sum(stats['grades']) / len(stats['grades']) if stats['grades'] else 0,
-                'active_days': len(stats['days']),
-                'streak': stats['streak'],  # Placeholder for streak calculation
-                'total_time': 0  # Placeholder for time tracking
-            })
 
-        # Time to first evaluation analysis
-        user_first_eval = {}
-        for e in evals_rows:
-            user_id = e.get('user_id')
-            if user_id:
-                eval_date = e.get('timestamp', '')[:10]
-                if user_id not in user_first_eval or eval_date < user_first_eval[user_id]:
-                    user_first_eval[user_id] = eval_date
-
-        time_to_first = []
-        for u in users_rows:
-            user_id = u.get('uid')
-            created = u.get('created_at', '')[:10]
-            if user_id in user_first_eval and created:
-                try:
-                    created_date = datetime.fromisoformat(created).date()
-                    first_eval_date = datetime.fromisoformat(user_first_eval[user_id]).date()
-                    days_diff = (first_eval_date - created_date).days
-                    if days_diff >= 0:
-                        time_to_first.append(days_diff)
-                except:
-                    pass
-
-        tffe = {}
-        if time_to_first:
-            tffe = {
-                'avg_days': round(sum(time_to_first) / len(time_to_first), 2),
-                'median_days': round(statistics.median(time_to_first), 2),
-                'count': len(time_to_first)
-            }
-
-        # Top question types analysis
-        top_qtypes_recent = sorted([
-            {"question_type": k, "count": v} 
-            for k, v in qt_recent.items()
-        ], key=lambda x: x['count'], reverse=True)[:15]
-
-        qt_grade_sum = defaultdict(float)
-        qt_grade_count = defaultdict(int)
-        for e in evals_rows:
-            qt = e.get('question_type') or 'Unknown'
-            val = parse_grade_value(e.get('grade'))
-            qt_grade_sum[qt] += val
-            qt_grade_count[qt] += 1
-
-        top_qtypes_by_avg = sorted([
-            {
-                "question_type": k, 
-                "avg_grade": round((qt_grade_sum[k]/qt_grade_count[k]), 2) if qt_grade_count[k] else 0.0
-            }
-            for k in qt_grade_sum
-        ], key=lambda x: x['avg_grade'], reverse=True)[:15]
-
-        return {
-            "totals": {
-                "total_users": total_users,
-                "total_evaluations": total_evaluations,
-                "unique_users_with_evaluations": unique_users_with_evals,
-                "new_users_last_n_days": new_users,
-                "evaluations_last_n_days": evals_last_n,
-                "avg_evaluations_per_user": round(avg_evals_per_user, 2),
-                "active_users_1d": active_1d,
-                "active_users_7d": active_7d,
-                "active_users_30d": active_30d,
-                "retention_rate": round(retention_rate, 2),
-                "retention_7d": round(retention_7d, 2),
-                "retention_30d": round(retention_30d, 2),
-                "conversion_overall_pct": round(conversion_overall, 2),
-                "conversion_last_n_days_pct": round(conversion_last_n, 2),
-                "estimated_revenue": round(estimated_revenue, 2),
-                "user_growth_trend": user_growth_trend,
-                "user_growth_rate": user_growth_rate,
-                "evaluation_growth_trend": eval_growth_trend,
-                "evaluation_growth_rate": eval_growth_rate,
-            },
-            "daily": [daily[day] for day in sorted(daily.keys())],
-            "hourly_distribution": hourly_distribution,
-            "weekly_distribution": weekly_distribution,
-            "by_question_type": [{"question_type": k, **v} for k, v in qtype.items()],
-            "by_plan": plan_data,
-            "evaluations_per_user_distribution": distribution,
-            "grade_stats": grade_stats,
-            "grade_distribution": grade_distribution,
-            "time_to_first_evaluation": tffe,
-            "top_users_last_n_days": top_users_last_n,
-            "top_question_types_recent": top_qtypes_recent,
-            "top_question_types_by_avg": top_qtypes_by_avg,
-        }
+        snapshot = await admin_analytics_cache.get(days)
+        headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get('If-None-Match'), snapshot.etag):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse({**snapshot.value, "as_of": snapshot.as_of}, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Admin analytics error: {str(e)}")
         import traceback
@@ -871,168 +569,17 @@ async def get_admin_analytics(request: Request, days: int = 30):
 async def get_user_detail_admin(request: Request, user_id: str):
     """Get comprehensive user details for admin view including evaluations, activity, and subscription history."""
     try:
-        logger.info("=== USER DETAIL ENDPOINT DEBUG START ===")
-        logger.info(f"User ID: {user_id}")
-        
         require_admin_access(request)
-        logger.info("Admin access verified for user detail")
-        
         supabase = get_supabase_client()
-        logger.info("Supabase client obtained for user detail")
-        from datetime import datetime, timedelta
-        
-        logger.info(f"Fetching user details for user_id: {user_id}")
-        
-        # Get user basic info
-        user_response = supabase.table('assessment_users').select('*').eq('uid', user_id).execute()
-        if not user_response.data:
+
+        enhanced_user = await load_user_detail(supabase, user_stats_service, user_id)
+        if enhanced_user is None:
             logger.warning(f"User not found: {user_id}")
             raise HTTPException(status_code=404, detail="User not found")
-        
-        user = user_response.data[0]
-        logger.info(f"Found user: {user.get('email', 'unknown')} with {user.get('questions_marked', 0)} marked questions")
-        
-        # Get user's evaluations with detailed info (limit to recent 100 for performance)
-        logger.info(f"Fetching evaluations for user: {user_id}")
-        evaluations_response = supabase.table('assessment_evaluations').select(
-            'id, short_id, user_id, question_type, grade, reading_marks, writing_marks, ao1_marks, ao2_marks, ao3_marks, '
-            'content_structure_marks, style_accuracy_marks, student_response, improvement_suggestions, strengths, '
-            'next_steps, feedback, timestamp'
-        ).eq('user_id', user_id).order('timestamp', desc=True).limit(100).execute()
-        
-        evaluations = evaluations_response.data or []
-        logger.info(f"Fetched {len(evaluations)} evaluations")
-        
-        # Get total count of evaluations for this user (for stats)
-        total_evaluations_response = supabase.table('assessment_evaluations').select(
-            'id', count='exact'
-        ).eq('user_id', user_id).execute()
-        
-        total_evaluations = total_evaluations_response.count or len(evaluations)
-        logger.info(f"Total evaluations count: {total_evaluations}")
-        # Parse grades safely
-        grades = []
-        for e in evaluations:
-            grade = e.get('grade')
-            if grade is not None:
-                try:
-                    # Handle different grade formats
-                    if isinstance(grade, (int, float)):
-                        grades.append(float(grade))
-                    elif isinstance(grade, str):
-                        # Handle string grades like "85/100" or "85%"
-                        if '/' in grade:
-                            num, den = grade.split('/')[:2]
-                            num = float(num.strip() or 0)
-                            den = float(den.strip() or 1)
-                            grades.append((num / den) * 100.0 if den else num)
-                        elif grade.endswith('%'):
-                            grades.append(float(grade[:-1]))
-                        else:
-                            grades.append(float(grade))
-                except (ValueError, TypeError):
-                    logger.warning(f"Could not parse grade: {grade}")
-                    continue
-        
-        avg_grade = sum(grades) / len(grades) if grades else 0
-        best_grade = max(grades) if grades else 0
-        worst_grade = min(grades) if grades else 0
-        
-        # Create activity timeline (last 30 days) - only from the limited evaluations
-        activity_timeline = []
-        cutoff_date = (datetime.now() - timedelta(days=30)).isoformat()
-        
-        # Add evaluation activities (limited to prevent performance issues)
-        for eval in evaluations[:50]:  # Further limit activity timeline to 50 most recent
-            if eval.get('timestamp'):
-                try:
-                    # Ensure timestamp is in the right format for comparison
-                    eval_timestamp = eval['timestamp']
-                    if eval_timestamp >= cutoff_date:
-                        # Format grade safely for display
-                        grade_display = eval.get("grade", 0)
-                        if isinstance(grade_display, str) and '/' in grade_display:
-                            # Keep fraction format for display
-                            grade_display = grade_display
-                        elif isinstance(grade_display, (int, float)):
-                            grade_display = f"{grade_display}%"
-                        
-                        activity_timeline.append({
-                            'type': 'evaluation',
-                            'action': f'Completed {eval.get("question_type", "Unknown")} evaluation',
-                            'details': f'Grade: {grade_display} • ID: {eval.get("short_id", eval.get("id", "")[:8])}',
-                            'timestamp': eval_timestamp
-                        })
-                except Exception as e:
-                    logger.warning(f"Could not process evaluation timestamp: {e}")
-                    continue
-        
-        # Add user registration as activity
-        if user.get('created_at'):
-            activity_timeline.append({
-                'type': 'registration',
-                'action': 'Account created',
-                'details': f'Joined with {user.get("current_plan", "free")} plan',
-                'timestamp': user['created_at']
-            })
-        
-        # Sort activity timeline by timestamp (most recent first)
-        activity_timeline.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        # Create subscription history (mock data for now - can be expanded)
-        subscription_history = []
-        if user.get('current_plan') and user.get('current_plan') != 'free':
-            try:
-                subscription_history.append({
-                    'plan': user['current_plan'],
-                    'status': 'active',
-                    'start_date': user.get('created_at', datetime.now().isoformat()),
-                    'end_date': None,
-                    'price': {
-                        'unlimited': 4.99,  # Updated to match actual pricing
-                        'basic': 9.99,
-                        'premium': 19.99,
-                        'pro': 39.99
-                    }.get(user['current_plan'], 0),
-                    'duration_months': 1
-                })
-            except Exception as e:
-                logger.warning(f"Could not create subscription history: {e}")
-                subscription_history = []
-        
-        # Calculate account age
-        account_age_days = 0
-        if user.get('created_at'):
-            try:
-                created_at = user['created_at']
-                # Handle different timestamp formats
-                if created_at.endswith('Z'):
-                    created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                else:
-                    created_date = datetime.fromisoformat(created_at)
-                account_age_days = (datetime.now() - created_date.replace(tzinfo=None)).days
-            except Exception as e:
-                logger.warning(f"Could not calculate account age: {e}")
-                account_age_days = 0
-        
-        # Enhance user object with calculated fields
-        enhanced_user = {
-            **user,
-            'evaluations': evaluations,
-            'total_evaluations': total_evaluations,
-            'avg_grade': avg_grade,
-            'best_grade': best_grade,
-            'worst_grade': worst_grade,
-            'activity_timeline': activity_timeline,
-            'subscription_history': subscription_history,
-            'account_age_days': account_age_days,
-            'last_login': user.get('updated_at'),  # Use updated_at as proxy for last activity
-            'account_status': 'active' if total_evaluations > 0 else 'inactive'
-        }
-        
-        logger.info(f"Successfully prepared user details for {user_id}")
+
+        logger.info(f"Prepared user details for {user_id}: {len(enhanced_user['evaluations'])} of {enhanced_user['total_evaluations']} evaluations")
         return {"user": enhanced_user}
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -1041,6 +588,26 @@ async def get_user_detail_admin(request: Request, user_id: str):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"User detail error: {str(e)}")
 
+FEEDBACK_KEYSET_FIELDS = {"created_at"}
+
+def _apply_feedback_filters(query, search: str = "", category: str = "", accurate: str = "", user_id: str = "", evaluation_id: str = "", date_from: str = "", date_to: str = ""):
+    """Apply the admin feedback listing filters to an assessment_feedback query."""
+    if search:
+        query = query.ilike('comments', f'%{search}%')
+    if category:
+        query = query.eq('category', category)
+    if accurate:
+        query = query.eq('accurate', accurate.lower() == 'true')
+    if user_id:
+        query = query.eq('user_id', user_id)
+    if evaluation_id:
+        query = query.eq('evaluation_id', evaluation_id)
+    if date_from:
+        query = query.gte('created_at', date_from)
+    if date_to:
+        query = query.lte('created_at', date_to)
+    return query
+
 @router.get("/dashboard/feedback")
 async def get_feedback_admin(
     request: Request,
@@ -1054,9 +621,14 @@ async def get_feedback_admin(
     date_from: str = "",
     date_to: str = "",
     sort_by: str = "created_at",
-    sort_dir: str = "desc"
+    sort_dir: str = "desc",
+    cursor: str = "",
+    count: str = "estimated"
 ):
-    """Get feedback data for admin dashboard with filtering, sorting, and pagination."""
+    """Get feedback data for admin dashboard with filtering, sorting, and pagination.
+
+    Sorting by created_at pages on (created_at, id) with an opaque `cursor`.
+    """
     try:
         logger.info("=== FEEDBACK ENDPOINT DEBUG START ===")
         logger.info(f"Request parameters: limit={limit}, offset={offset}, search='{search}', category='{category}', accurate='{accurate}', user_id='{user_id}', evaluation_id='{evaluation_id}', date_from='{date_from}', date_to='{date_to}', sort_by='{sort_by}', sort_dir='{sort_dir}'")
@@ -1074,31 +646,21 @@ async def get_feedback_admin(
         query = supabase.table('assessment_feedback').select(
             'id, evaluation_id, user_id, category, accurate, comments, created_at, '
             'assessment_users!inner(uid, display_name, email)',
-            count='exact'
+            count=count_option(count)
         )
         logger.info(f"Query built: {query}")
         
         # Apply filters
-        if search:
-            query = query.ilike('comments', f'%{search}%')
-        if category:
-            query = query.eq('category', category)
-        if accurate:
-            query = query.eq('accurate', accurate.lower() == 'true')
-        if user_id:
-            query = query.eq('user_id', user_id)
-        if evaluation_id:
-            query = query.eq('evaluation_id', evaluation_id)
-        if date_from:
-            query = query.gte('created_at', date_from)
-        if date_to:
-            query = query.lte('created_at', date_to)
+        query = _apply_feedback_filters(
+            query, search=search, category=category, accurate=accurate, user_id=user_id,
+            evaluation_id=evaluation_id, date_from=date_from, date_to=date_to
+        )
         
         # Apply sorting and pagination
+        limit = clamp_page_size(limit)
         logger.info(f"Applying sort: {sort_by} {sort_dir}")
-        query = query.order(sort_by, desc=(sort_dir == 'desc'))
-        logger.info(f"Applying pagination: offset={offset}, limit={limit}")
-        query = query.range(offset, offset + limit - 1)
+        logger.info(f"Applying pagination: offset={offset}, limit={limit}, cursor={'yes' if cursor else 'no'}")
+        query, uses_keyset = _paginate(query, sort_by, 'id', sort_dir == 'desc', limit, offset, cursor, FEEDBACK_KEYSET_FIELDS)
         
         logger.info("Executing feedback query...")
         response = query.execute()
@@ -1114,11 +676,16 @@ async def get_feedback_admin(
         # Check if response.data exists
         if not hasattr(response, 'data') or not response.data:
             logger.warning("No data in response or response.data is None")
-            return {"data": [], "count": 0}
+            return {"data": [], "count": 0, "next_cursor": None, "has_more": False}
+        
+        if uses_keyset:
+            rows, next_cursor = build_page(response.data, limit, sort_by, 'id')
+        else:
+            rows, next_cursor = response.data, None
         
         # Transform the data to match expected format
         feedback_data = []
-        for item in response.data:
+        for item in rows:
             feedback_data.append({
                 'id': item['id'],
                 'evaluation_id': item['evaluation_id'],
@@ -1140,12 +707,14 @@ async def get_feedback_admin(
                 }
             })
         
-        count = getattr(response, 'count', len(feedback_data))
+        count = response.count if getattr(response, 'count', None) is not None else len(feedback_data)
         logger.info(f"Retrieved {len(feedback_data)} feedback items, total count: {count}")
         
         return {
             "data": feedback_data,
-            "count": count
+            "count": count,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None if uses_keyset else (offset + len(feedback_data) < count)
         }
         
     except HTTPException:
@@ -1,66 +1,32 @@
 """
 Analytics and badges routes.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 import logging
-import re
-import json
-import httpx
-from datetime import datetime, timedelta
-from collections import defaultdict
-from config.settings import get_user_management_service, get_supabase_client, RECOMMENDATIONS_API_KEY, RECOMMENDATIONS_MODEL
+from datetime import datetime
+from typing import Optional
+from config.container import container
+from services.user_stats_service import summarize_stats
+from services.grade_timeseries import DEFAULT_POINTS, DEFAULT_WINDOW
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Get services
-supabase = get_supabase_client()
-user_management_service = get_user_management_service(supabase)  # Pass supabase client
-
-def calculate_streak(dates):
-    """Calculate current streak from sorted dates"""
-    if not dates:
-        return 0
-    
-    # Group by date (ignore time)
-    date_strings = list(set(date.strftime("%Y-%m-%d") for date in dates))
-    date_strings.sort()
-    
-    if not date_strings:
-        return 0
-    
-    # Check if today or yesterday is in the list
-    today = datetime.now().strftime("%Y-%m-%d")
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-    
-    if today not in date_strings and yesterday not in date_strings:
-        return 0
-    
-    # Count consecutive days backwards from today/yesterday
-    current_streak = 0
-    check_date = datetime.now().date()
-    
-    for _ in range(len(date_strings)):
-        if check_date.strftime("%Y-%m-%d") in date_strings:
-            current_streak += 1
-            check_date -= timedelta(days=1)
-        else:
-            break
-    
-    return current_streak
-
-def extract_numeric_grade(grade_str):
-    """Extract numeric value from grade string"""
-    match = re.search(r'(\d+)', grade_str)
-    return int(match.group(1)) if match else 0
+# Get services (built on first use)
+supabase = container.lazy('supabase')
+user_management_service = container.lazy('user_management_service')
+user_stats_service = container.lazy('user_stats_service')
+badge_engine = container.lazy('badge_engine')
+recommendation_service = container.lazy('recommendation_service')
+grade_timeseries_service = container.lazy('grade_timeseries_service')
 
 @router.post("/badges/check/{user_id}")
-async def check_and_award_badges(user_id: str):
+async def check_and_award_badges(user_id: str, request: Request):
     """Check user activity and award badges"""
     try:
         logger.info(f"🏆 Badge check request for user: {user_id}")
         
-        # Get user and evaluations using the user management service
+        # Get user using the user management service
         if not user_management_service:
             logger.error("❌ User management service not available")
             raise HTTPException(status_code=500, detail="User management service not available")
@@ -69,107 +35,14 @@ async def check_and_award_badges(user_id: str):
             logger.error("❌ Supabase client not available")
             raise HTTPException(status_code=500, detail="Database connection not available")
         
-        user_data = await user_management_service.get_user_by_id(user_id)
+        user_data = await user_management_service.request_user_loader(request.scope).load(user_id)
         if not user_data:
             logger.warning(f"⚠️ User not found: {user_id}")
             raise HTTPException(status_code=404, detail="User not found")
         
-        evaluations_response = supabase.table('assessment_evaluations').select('*').eq('user_id', user_id).execute()
-        evaluations = evaluations_response.data
-        
-        # Badge definitions
-        badges_to_check = [
-            # Streak badges
-            {"type": "streak", "name": "3-Day Streak", "description": "Submit for 3 consecutive days", "icon": "🔥", "requirement": 3},
-            {"type": "streak", "name": "7-Day Streak", "description": "Submit for 7 consecutive days", "icon": "🏆", "requirement": 7},
-            {"type": "streak", "name": "30-Day Streak", "description": "Submit for 30 consecutive days", "icon": "💎", "requirement": 30},
-            
-            # Volume badges
-            {"type": "volume", "name": "10 Essay Milestone", "description": "Submit 10 essays", "icon": "📝", "requirement": 10},
-            {"type": "volume", "name": "25 Essay Milestone", "description": "Submit 25 essays", "icon": "📚", "requirement": 25},
-            {"type": "volume", "name": "50 Essay Milestone", "description": "Submit 50 essays", "icon": "🎯", "requirement": 50},
-            
-            # Word count badges
-            {"type": "words", "name": "10K Word Club", "description": "Write 10,000 words total", "icon": "✍️", "requirement": 10000},
-            {"type": "words", "name": "25K Word Club", "description": "Write 25,000 words total", "icon": "📖", "requirement": 25000},
-            
-            # Improvement badges
-            {"type": "improvement", "name": "Band Booster", "description": "Improve by 2 bands", "icon": "⬆️", "requirement": 2},
-            {"type": "improvement", "name": "Perseverance Award", "description": "Submit 5 times on same question type", "icon": "💪", "requirement": 5},
-            
-            # Exploration badges
-            {"type": "exploration", "name": "Paper Explorer", "description": "Try 5 different question types", "icon": "🗺️", "requirement": 5},
-            {"type": "exploration", "name": "IGCSE Specialist", "description": "Complete 10 IGCSE questions", "icon": "🎓", "requirement": 10},
-            {"type": "exploration", "name": "A-Level Expert", "description": "Complete 10 A-Level questions", "icon": "🏅", "requirement": 10}
-        ]
-        
-        awarded_badges = []
-        
-        for badge_def in badges_to_check:
-            # Check if user already has this badge
-            existing_badges_response = supabase.table('assessment_badges').select('*').eq('user_id', user_id).eq('badge_name', badge_def["name"]).execute()
-            if existing_badges_response.data:
-                continue
-            
-            progress = 0
-            earned = False
-            
-            if badge_def["type"] == "streak":
-                # Calculate current streak
-                dates = [datetime.fromisoformat(e["timestamp"].replace("Z", "+00:00")) for e in evaluations]
-                dates.sort()
-                current_streak = calculate_streak(dates)
-                progress = current_streak
-                earned = progress >= badge_def["requirement"]
-                
-            elif badge_def["type"] == "volume":
-                progress = len(evaluations)
-                earned = progress >= badge_def["requirement"]
-                
-            elif badge_def["type"] == "words":
-                total_words = sum(len(e["student_response"].split()) for e in evaluations)
-                progress = total_words
-                earned = progress >= badge_def["requirement"]
-                
-            elif badge_def["type"] == "improvement":
-                # Check for grade improvements
-                improvements = 0
-                for i in range(1, len(evaluations)):
-                    prev_grade = extract_numeric_grade(evaluations[i-1]["grade"])
-                    curr_grade = extract_numeric_grade(evaluations[i]["grade"])
-                    if curr_grade > prev_grade:
-                        improvements += 1
-                progress = improvements
-                earned = progress >= badge_def["requirement"]
-                
-            elif badge_def["type"] == "exploration":
-                if badge_def["name"] == "Paper Explorer":
-                    unique_types = set(e["question_type"] for e in evaluations)
-                    progress = len(unique_types)
-                    earned = progress >= badge_def["requirement"]
-                elif badge_def["name"] == "IGCSE Specialist":
-                    igcse_count = sum(1 for e in evaluations if e["question_type"].startswith("igcse"))
-                    progress = igcse_count
-                    earned = progress >= badge_def["requirement"]
-                elif badge_def["name"] == "A-Level Expert":
-                    alevel_count = sum(1 for e in evaluations if e["question_type"].startswith("alevel"))
-                    progress = alevel_count
-                    earned = progress >= badge_def["requirement"]
-            
-            if earned:
-                # Award badge
-                badge_data = {
-                    "user_id": user_id,
-                    "badge_type": badge_def["type"],
-                    "badge_name": badge_def["name"],
-                    "badge_description": badge_def["description"],
-                    "badge_icon": badge_def["icon"],
-                    "progress": progress,
-                    "requirement": badge_def["requirement"],
-                    "earned_at": datetime.utcnow().isoformat()
-                }
-                supabase.table('assessment_badges').insert(badge_data).execute()
-                awarded_badges.append(badge_data)
+        # Progress comes from the user's aggregate; earned badges are preloaded in one query
+        stats = user_stats_service.get_stats(user_id)
+        awarded_badges = badge_engine.award(user_id, stats)
         
         logger.info(f"✅ Badge check completed for user: {user_id}, awarded: {len(awarded_badges)}")
         return {"awarded_badges": awarded_badges}
@@ -206,8 +79,12 @@ async def get_user_badges(user_id: str):
         raise HTTPException(status_code=500, detail=f"Badge retrieval error: {str(e)}")
 
 @router.get("/analytics/{user_id}")
-async def get_user_analytics(user_id: str):
-    """Get analytics data for a specific user"""
+async def get_user_analytics(user_id: str, request: Request, recommendations: bool = True):
+    """Get analytics data for a specific user
+
+    recommendations=false skips the recommendation lookup, so pages that only
+    need the aggregate (history totals, insight gating) never wait on the LLM.
+    """
     overall_start = datetime.utcnow()
     try:
         logger.info(f"📊 ═══════════════════════════════════════════")
@@ -225,7 +102,7 @@ async def get_user_analytics(user_id: str):
             raise HTTPException(status_code=500, detail="Database connection not available")
         
         logger.info(f"🔍 Fetching user data for: {user_id}")
-        user_data = await user_management_service.get_user_by_id(user_id)
+        user_data = await user_management_service.request_user_loader(request.scope).load(user_id)
         if not user_data:
             logger.warning(f"⚠️ User not found: {user_id}")
             raise HTTPException(status_code=404, detail="User not found")
@@ -237,209 +114,41 @@ async def get_user_analytics(user_id: str):
             logger.warning(f"⚠️ User {user_id} does not have unlimited plan, denying analytics access")
             raise HTTPException(status_code=403, detail="Analytics access requires Unlimited plan")
         
-        # Get user's evaluations
-        logger.info(f"🔍 Fetching evaluations from Supabase for user: {user_id}")
-        eval_start = datetime.utcnow()
-        evaluations_response = supabase.table('assessment_evaluations').select('*').eq('user_id', user_id).execute()
-        eval_duration = (datetime.utcnow() - eval_start).total_seconds()
-        evaluations = evaluations_response.data
+        # Get the user's aggregate (one row, maintained as evaluations are saved)
+        logger.info(f"🔍 Fetching analytics aggregate for user: {user_id}")
+        stats_start = datetime.utcnow()
+        stats = user_stats_service.get_stats(user_id)
+        stats_duration = (datetime.utcnow() - stats_start).total_seconds()
+        total_evaluations = stats.get('total_evaluations') or 0
         
-        logger.info(f"✅ Retrieved {len(evaluations)} evaluations in {eval_duration:.2f}s")
+        logger.info(f"✅ Retrieved aggregate of {total_evaluations} evaluations in {stats_duration:.2f}s")
         
         # Calculate analytics data
         analytics_data = {
-            "total_responses": len(evaluations),
-            "evaluations": evaluations,
+            "total_responses": total_evaluations,
+            "stats": summarize_stats(stats),
             "user_plan": user_data.get('current_plan'),
             "questions_marked": user_data.get('questions_marked', 0),
             "credits_remaining": user_data.get('credits', 0)
         }
 
-        # Recommendations: only after first 5 submissions and update every 5
-        recommendations = None
-        logger.info(f"🧠 Recommendations check: {len(evaluations)} evaluations")
-        
-        if len(evaluations) >= 5:
+        # Recommendations: cached per evaluation watermark, refreshed in the background
+        user_recommendations = None
+        if recommendations:
             try:
-                logger.info(f"✅ User has {len(evaluations)} evaluations, checking for recommendations...")
-                
-                # Fetch last cached recommendations if present
-                rec_key = f"recos_{user_id}"
-                logger.info(f"🔍 Looking for cached recommendations with key: {rec_key}")
-                
-                cache_start = datetime.utcnow()
-                try:
-                    rec_resp = supabase.table('assessment_meta').select('*').eq('key', rec_key).execute()
-                    cache_duration = (datetime.utcnow() - cache_start).total_seconds()
-                    cached = rec_resp.data[0] if rec_resp.data else None
-                    
-                    logger.info(f"📦 Cache lookup completed in {cache_duration:.2f}s, found: {bool(cached)}")
-                    if cached:
-                        logger.info(f"📦 Cached data: {cached.get('value', {}).keys() if cached.get('value') else 'No value'}")
-                except Exception as e:
-                    logger.error(f"❌ Cache lookup failed: {e}")
-                    cached = None
-                    cache_duration = (datetime.utcnow() - cache_start).total_seconds()
-                
-                # Determine if we need to refresh
-                # Generate if: 1) No cache exists, OR 2) Cache exists but evaluations % 5 == 0
-                refresh_needed = (len(evaluations) % 5 == 0)
-                logger.info(f"🔄 Refresh needed? {refresh_needed} (evaluations % 5 == 0)")
-                logger.info(f"💡 Will generate: {not cached or refresh_needed} (no cache OR refresh needed)")
-
-                if not cached or refresh_needed:
-                    logger.info(f"🚀 Generating new AI recommendations...")
-                    ai_start = datetime.utcnow()
-                    
-                    # Limit evaluations to last 10 for performance (most recent and relevant)
-                    recent_evaluations = evaluations[-10:] if len(evaluations) > 10 else evaluations
-                    logger.info(f"📊 Processing {len(recent_evaluations)} recent evaluations (out of {len(evaluations)} total)")
-                    
-                    # Aggregate per question type: average score and improvement suggestions
-                    type_to_scores = defaultdict(list)
-                    type_to_improvements = defaultdict(list)
-                    for ev in recent_evaluations:
-                        qtype = ev.get('question_type')
-                        grade_str = ev.get('grade', '')
-                        # Extract achieved and total
-                        nums = re.findall(r"(\d+)\/(\d+)", str(grade_str))
-                        if nums:
-                            achieved = int(nums[0][0])
-                            total = int(nums[0][1]) if int(nums[0][1]) > 0 else 1
-                            pct = achieved / total
-                            type_to_scores[qtype].append(pct)
-                        for imp in ev.get('improvement_suggestions', []) or []:
-                            if isinstance(imp, str) and imp:
-                                type_to_improvements[qtype].append(imp)
-
-                    summaries = []
-                    for qtype, scores in type_to_scores.items():
-                        avg_pct = sum(scores) / max(len(scores), 1)
-                        avg_score_pct = round(avg_pct * 100)
-                        improvements_sample = type_to_improvements.get(qtype, [])[:10]
-                        summaries.append({
-                            "questionType": qtype,
-                            "averageScorePercent": avg_score_pct,
-                            "improvementSuggestions": improvements_sample,
-                        })
-
-                    # Compose enhanced prompt aligned with KimiK2 evaluation style
-                    guide = (
-                        "CRITICAL FOCUS AREAS:\n"
-                        "1. Vocabulary Enhancement: Focus on advanced vocabulary that demonstrates sophistication\n"
-                        "2. Structure & Organization: Clear progression of ideas with effective paragraphing\n"
-                        "3. Evidence & Analysis: Use specific textual evidence and detailed analysis\n"
-                        "4. Writing Techniques: Employ varied sentence structures and literary devices\n"
-                        "5. Time Management: Practice completing responses within allocated time\n"
-                        "6. Marking Criteria Mastery: Understand exactly what examiners look for\n"
-                        "7. Comparative Analysis: For comparative essays, balance discussion between texts\n"
-                        "8. Critical Thinking: Develop original insights and interpretations\n"
-                    )
-                    
-                    user_prompt = f"""Student performance: {json.dumps(summaries, indent=1)}
-
-Provide study plan:
-1. **Top 3 Priorities** - Critical improvements
-2. **Vocabulary Focus** - Specific areas  
-3. **Study Plan** - Daily/weekly goals
-4. **Success Tracking** - Progress indicators
-
-Keep under 200 words. Be encouraging. Student has {len(evaluations)} assessments."""
-
-                    # Call OpenRouter API for recommendations using OPENROUTER_GPT_OSS_120B_KEY
-                    async def call_recommendations(prompt: str) -> str:
-                        logger.info(f"🤖 Starting AI recommendations API call...")
-                        api_call_start = datetime.utcnow()
-                        
-                        if not RECOMMENDATIONS_API_KEY:
-                            logger.error("❌ OPENROUTER_GPT_OSS_120B_KEY not configured")
-                            raise Exception("OPENROUTER_GPT_OSS_120B_KEY not configured for recommendations")
-                        
-                        async with httpx.AsyncClient(timeout=15.0) as client:
-                            headers = {
-                                "Authorization": f"Bearer {RECOMMENDATIONS_API_KEY}",
-                                "Content-Type": "application/json",
-                                "HTTP-Referer": "https://englishgpt.everythingenglish.xyz",
-                                "X-Title": "EnglishGPT Recommendations"
-                            }
-                            
-                            # Concise system prompt for faster processing
-                            system_prompt = """You are an expert English tutor. Generate practical, encouraging study recommendations. 
-                            Focus on vocabulary improvement and be specific about what to improve and how."""
-                            
-                            payload = {
-                                "model": RECOMMENDATIONS_MODEL,
-                                "messages": [
-                                    {"role": "system", "content": system_prompt},
-                                    {"role": "user", "content": prompt}
-                                ],
-                                "max_tokens": 400,
-                                "temperature": 0.5
-                            }
-                            
-                            logger.info(f"📡 Calling OpenRouter API with model: {RECOMMENDATIONS_MODEL}")
-                            r = await client.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload, timeout=10.0)
-                            
-                            api_call_duration = (datetime.utcnow() - api_call_start).total_seconds()
-                            logger.info(f"✅ OpenRouter API responded in {api_call_duration:.2f}s, status: {r.status_code}")
-                            
-                            r.raise_for_status()
-                            res = r.json()
-                            
-                            response_content = res['choices'][0]['message']['content']
-                            logger.info(f"📝 AI response length: {len(response_content)} characters")
-                            return response_content
-
-                    logger.info(f"🎯 Calling AI recommendations with {len(summaries)} question type summaries")
-                    rec_text = await call_recommendations(user_prompt)
-                    
-                    ai_duration = (datetime.utcnow() - ai_start).total_seconds()
-                    logger.info(f"✅ AI recommendations generated in {ai_duration:.2f}s")
-
-                    # Cache recommendations
-                    logger.info(f"💾 Caching AI recommendations...")
-                    cache_save_start = datetime.utcnow()
-                    
-                    record = {
-                        "key": rec_key,
-                        "value": rec_text,
-                        "user_id": user_id,
-                        "updated_at": datetime.utcnow().isoformat()
-                    }
-                    try:
-                        if cached:
-                            logger.info(f"🔄 Updating existing cache entry")
-                            supabase.table('assessment_meta').update(record).eq('key', rec_key).execute()
-                        else:
-                            logger.info(f"➕ Creating new cache entry")
-                            supabase.table('assessment_meta').insert(record).execute()
-                        
-                        cache_save_duration = (datetime.utcnow() - cache_save_start).total_seconds()
-                        logger.info(f"✅ Cache saved in {cache_save_duration:.2f}s")
-                    except Exception as e:
-                        logger.error(f"❌ Failed to save cache: {e}")
-                        cache_save_duration = (datetime.utcnow() - cache_save_start).total_seconds()
-                        logger.info(f"⚠️ Cache save failed after {cache_save_duration:.2f}s, but recommendations generated successfully")
-                    
-                    recommendations = rec_text
-                    logger.info(f"✅ Using newly generated recommendations ({len(rec_text)} chars)")
-                else:
-                    recommendations = cached.get('value')
-                    logger.info(f"♻️ Using cached recommendations ({len(recommendations)} chars)")
+                user_recommendations = await recommendation_service.get_recommendations(user_id, stats)
             except Exception as e:
                 logger.error(f"❌ Recommendations error: {str(e)}")
                 logger.exception("Full traceback:")
-                recommendations = None
-        else:
-            logger.info(f"ℹ️ User has only {len(evaluations)} evaluations, need 5+ for recommendations")
+                user_recommendations = None
 
-        analytics_data["recommendations"] = recommendations
+        analytics_data["recommendations"] = user_recommendations
 
         overall_duration = (datetime.utcnow() - overall_start).total_seconds()
         logger.info(f"📊 ═══════════════════════════════════════════")
         logger.info(f"✅ Analytics request COMPLETE for user: {user_id}")
         logger.info(f"⏱️ Total duration: {overall_duration:.2f}s")
-        logger.info(f"📦 Returning {len(evaluations)} evaluations + {len(recommendations) if recommendations else 0} chars of recommendations")
+        logger.info(f"📦 Returning aggregate of {total_evaluations} evaluations + {len(user_recommendations) if user_recommendations else 0} chars of recommendations")
         logger.info(f"📊 ═══════════════════════════════════════════")
         
         return {"analytics": analytics_data}
@@ -452,3 +161,38 @@ Keep under 200 words. Be encouraging. Student has {len(evaluations)} assessments
         logger.error(f"❌ Analytics error for user {user_id}: {str(e)}")
         logger.exception("Full traceback:")
         raise HTTPException(status_code=500, detail=f"Analytics error: {str(e)}")
+
+@router.get("/analytics/{user_id}/timeseries")
+async def get_user_grade_timeseries(user_id: str, points: int = DEFAULT_POINTS, window: int = DEFAULT_WINDOW, question_type: Optional[str] = None, since: Optional[str] = None):
+    """Grade percentage series per question type, downsampled to `points` with a `window` moving average"""
+    try:
+        logger.info(f"📈 Grade timeseries request for user: {user_id} (points={points}, window={window})")
+        
+        if not user_management_service:
+            logger.error("❌ User management service not available")
+            raise HTTPException(status_code=500, detail="User management service not available")
+        
+        if not supabase:
+            logger.error("❌ Supabase client not available")
+            raise HTTPException(status_code=500, detail="Database connection not available")
+        
+        user_data = await user_management_service.get_user_by_id(user_id)
+        if not user_data:
+            logger.warning(f"⚠️ User not found: {user_id}")
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        if user_data.get('current_plan') != 'unlimited':
+            logger.warning(f"⚠️ User {user_id} does not have unlimited plan, denying analytics access")
+            raise HTTPException(status_code=403, detail="Analytics access requires Unlimited plan")
+        
+        timeseries = grade_timeseries_service.get_series(user_id, points=points, window=window, question_type=question_type, since=since)
+        logger.info(f"✅ Built {len(timeseries['series'])} series from {timeseries['total_evaluations']} evaluations")
+        return {"timeseries": timeseries}
+        
+    except HTTPException as he:
+        logger.error(f"❌ HTTP Exception in grade timeseries: {he.status_code} - {he.detail}")
+        raise he
+    except Exception as e:
+        logger.error(f"❌ Grade timeseries error for user {user_id}: {str(e)}")
+        logger.exception("Full traceback:")
+        raise HTTPException(status_code=500, detail=f"Grade timeseries error: {str(e)}")
@@ -1,45 +1,49 @@
 """
 Evaluation and feedback routes.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 import logging
 import secrets
 import re
 from datetime import datetime, timedelta
 from models.evaluation import SubmissionRequest, FeedbackResponse
 from services.ai_service import call_deepseek_api
-from services.evaluation_service import EvaluationService
-from utils.grading import compute_overall_grade
-from config.settings import get_user_management_service, get_supabase_client
+from utils.grading import compute_overall_grade, numeric_grade_fields, MARK_COLUMNS
+from utils.evaluation_rows import (
+    EVALUATION_SUMMARY_FIELDS,
+    EVALUATION_DETAIL_FIELDS,
+    evaluation_fields_for_view,
+    decode_evaluation_row,
+    decode_evaluation_rows,
+)
+from utils.pagination import apply_keyset, build_page, clamp_page_size, count_option
+from config.container import container
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Get services
-supabase = get_supabase_client()
-user_management_service = get_user_management_service(supabase)
-evaluation_service = EvaluationService()
+# Get services (built on first use)
+supabase = container.lazy('supabase')
+user_management_service = container.lazy('user_management_service')
+evaluation_service = container.lazy('evaluation_service')
+audit_store = container.lazy('audit_store')
+user_stats_service = container.lazy('user_stats_service')
+badge_engine = container.lazy('badge_engine')
+admin_search_index = container.lazy('admin_search_index')
 
 @router.post("/evaluate", response_model=FeedbackResponse)
-async def evaluate_submission(submission: SubmissionRequest):
+async def evaluate_submission(submission: SubmissionRequest, background_tasks: BackgroundTasks):
     """Evaluate student submission using AI"""
     import time
     total_start_time = time.time()
-    logger.info("🚀 PERFORMANCE: Starting total evaluation process...")
     
     try:
-        # Enhanced debugging for 422 errors
-        logger.info("🚨 EVALUATION REQUEST RECEIVED - Detailed Debug Info:")
-        logger.info(f"📊 Request Details: {submission}")
-        logger.info(f"📝 Request Data Analysis:")
-        logger.info(f"  - user_id: {submission.user_id} (type: {type(submission.user_id)})")
-        logger.info(f"  - question_type: {submission.question_type} (type: {type(submission.question_type)})")
-        logger.info(f"  - student_response length: {len(submission.student_response) if submission.student_response else 0}")
-        logger.info(f"  - student_response type: {type(submission.student_response)}")
-        logger.info(f"  - marking_scheme: {'PROVIDED' if submission.marking_scheme else 'NOT_PROVIDED'} (type: {type(submission.marking_scheme)})")
-        logger.info(f"  - command_word: {getattr(submission, 'command_word', 'NOT_PROVIDED')}")
-        logger.info(f"  - text_type: {getattr(submission, 'text_type', 'NOT_PROVIDED')}")
-        logger.info(f"  🎯 IGCSE DIRECTED CHECK: Is igcse_directed? {submission.question_type == 'igcse_directed'}, Has text_type? {bool(getattr(submission, 'text_type', None))}")
+        # Request details for debugging 422 errors. Lazy %-formatting: the essay is only
+        # rendered when DEBUG is enabled for this logger
+        logger.debug("📊 Evaluation request: %s", submission)
+        logger.debug("📝 user_id=%s question_type=%s response_chars=%d marking_scheme=%s command_word=%s text_type=%s",
+                     submission.user_id, submission.question_type, len(submission.student_response or ''),
+                     'PROVIDED' if submission.marking_scheme else 'NOT_PROVIDED', submission.command_word, submission.text_type)
         
         # Validate required fields
         if not submission.user_id:
@@ -54,62 +58,50 @@ async def evaluate_submission(submission: SubmissionRequest):
             logger.error("❌ VALIDATION ERROR: student_response is missing or empty")
             raise HTTPException(status_code=422, detail="student_response is required and cannot be empty")
         
-        logger.info(f"✅ All required fields validated successfully")
-        logger.info(f"Starting evaluation for user {submission.user_id}, question type: {submission.question_type}")
+        logger.info("Starting evaluation for user %s, question type: %s", submission.user_id, submission.question_type)
         
         # Get user data using the user management service
         if not user_management_service:
             logger.error("❌ SERVICE ERROR: User management service not available")
             raise HTTPException(status_code=500, detail="User management service not available")
         
-        logger.info(f"🔍 Fetching user data for user_id: {submission.user_id}")
         user_data = await user_management_service.get_user_by_id(submission.user_id)
         if not user_data:
-            logger.error(f"❌ USER ERROR: User not found for user_id: {submission.user_id}")
+            logger.error("❌ USER ERROR: User not found for user_id: %s", submission.user_id)
             raise HTTPException(status_code=404, detail="User not found")
         
         current_plan = user_data.get('current_plan', 'free')
         credits = user_data.get('credits', 3)
         questions_marked = user_data.get('questions_marked', 0)
         
-        logger.info(f"✅ User data retrieved successfully - plan: {current_plan}, credits: {credits}, questions_marked: {questions_marked}")
+        logger.debug("✅ User data retrieved - plan: %s, credits: %s, questions_marked: %s", current_plan, credits, questions_marked)
         
         # Check if user has credits for free plan users
         if current_plan == 'free' and credits <= 0:
-            logger.warning(f"❌ CREDIT ERROR: User {submission.user_id} has no credits remaining (current: {credits})")
+            logger.warning("❌ CREDIT ERROR: User %s has no credits remaining (current: %s)", submission.user_id, credits)
             raise HTTPException(status_code=402, detail="No credits remaining. Please upgrade to unlimited for unlimited marking.")
         
-        logger.info(f"✅ Credit check passed - user has {credits} credits remaining")
         
         # Check if question type requires marking scheme
         requires_marking_scheme = submission.question_type in ['igcse_summary', 'alevel_comparative', 'alevel_text_analysis', 'alevel_language_change']
         has_optional_marking_scheme = submission.question_type in ['igcse_writers_effect']
         
-        logger.info(f"🔍 Marking scheme validation:")
-        logger.info(f"  - question_type: {submission.question_type}")
-        logger.info(f"  - requires_marking_scheme: {requires_marking_scheme}")
-        logger.info(f"  - has_optional_marking_scheme: {has_optional_marking_scheme}")
-        logger.info(f"  - marking_scheme provided: {bool(submission.marking_scheme)}")
-        logger.info(f"  - marking_scheme value: {submission.marking_scheme}")
+        logger.debug("🔍 Marking scheme validation: requires=%s optional=%s provided=%s",
+                     requires_marking_scheme, has_optional_marking_scheme, bool(submission.marking_scheme))
         
         if requires_marking_scheme and not submission.marking_scheme:
-            logger.error(f"❌ MARKING SCHEME ERROR: Question type {submission.question_type} requires a marking scheme but none was provided")
+            logger.error("❌ MARKING SCHEME ERROR: Question type %s requires a marking scheme but none was provided", submission.question_type)
             raise HTTPException(status_code=422, detail="This question type requires a marking scheme")
         
         # Build evaluation prompt using the evaluation service
         try:
-            logger.info("🔧 Building evaluation prompt...")
-            logger.info(f"🔧 Evaluation service input: {submission}")
             full_prompt = evaluation_service.build_evaluation_prompt(submission)
-            logger.info(f"✅ Prompt built successfully, length: {len(full_prompt)}")
-            logger.info(f"🔧 Prompt preview (first 200 chars): {full_prompt[:200]}...")
+            logger.debug("✅ Prompt built, length: %d", len(full_prompt))
         except ValueError as e:
             logger.error(f"❌ PROMPT BUILDING ERROR: {str(e)}")
             raise HTTPException(status_code=422, detail=f"Error building evaluation prompt: {str(e)}")
         except Exception as e:
-            logger.error(f"❌ UNEXPECTED PROMPT BUILDING ERROR: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("❌ UNEXPECTED PROMPT BUILDING ERROR: %s", e, exc_info=True)
             raise HTTPException(status_code=422, detail=f"Unexpected error building evaluation prompt: {str(e)}")
         
         # Sanitize input to prevent prompt injection
@@ -153,21 +145,17 @@ async def evaluate_submission(submission: SubmissionRequest):
         # IMPORTANT: Do NOT sanitize the full_prompt as it contains the official marking guidelines
         # The full_prompt should be used as-is to ensure correct evaluation
         
-        logger.info("Calling AI API for evaluation...")
-        
         # Call AI API with performance timing
         ai_start_time = time.time()
         try:
-            logger.info("🚀 PERFORMANCE: Starting AI API call...")
             ai_response, _ = await call_deepseek_api(full_prompt)
             ai_end_time = time.time()
             ai_duration = ai_end_time - ai_start_time
-            logger.info(f"🚀 PERFORMANCE: AI API call completed in {ai_duration:.2f}s")
-            logger.info(f"🚀 PERFORMANCE: AI response length: {len(ai_response)} characters")
+            logger.debug("🚀 PERFORMANCE: AI API call completed in %.2fs, response length: %d characters", ai_duration, len(ai_response))
         except Exception as e:
             ai_end_time = time.time()
             ai_duration = ai_end_time - ai_start_time
-            logger.error(f"🚀 PERFORMANCE: AI API call failed after {ai_duration:.2f}s: {str(e)}")
+            logger.error("🚀 PERFORMANCE: AI API call failed after %.2fs: %s", ai_duration, e)
             raise HTTPException(status_code=500, detail=f"AI evaluation failed: {str(e)}")
         
         # Remove any bolding from the response
@@ -175,7 +163,6 @@ async def evaluate_submission(submission: SubmissionRequest):
         
         # Start result processing timing
         processing_start_time = time.time()
-        logger.info("🚀 PERFORMANCE: Starting result processing...")
         
         feedback_parts = ai_response.split("FEEDBACK:")
         if len(feedback_parts) > 1:
@@ -410,7 +397,7 @@ async def evaluate_submission(submission: SubmissionRequest):
                 if "NEXT STEPS:" in strengths_part:
                     strengths_part = strengths_part.split("NEXT STEPS:")[0].strip()
                 
-                logger.debug(f"DEBUG: Raw strengths part: {strengths_part}")
+                logger.debug("DEBUG: Raw strengths part: %s", strengths_part)
                 
                 # Try multiple parsing methods
                 if "|" in strengths_part:
@@ -423,7 +410,7 @@ async def evaluate_submission(submission: SubmissionRequest):
                     # Use as single strength
                     strengths = [strengths_part] if strengths_part else []
                 
-                logger.debug(f"DEBUG: Parsed strengths: {strengths}")
+                logger.debug("DEBUG: Parsed strengths: %s", strengths)
             else:
                 strengths = []
             
@@ -431,7 +418,7 @@ async def evaluate_submission(submission: SubmissionRequest):
             next_steps = []
             if "NEXT STEPS:" in ai_response:
                 next_steps_part = ai_response.split("NEXT STEPS:")[1].strip()
-                logger.debug(f"DEBUG: Raw next steps part: {next_steps_part}")
+                logger.debug("DEBUG: Raw next steps part: %s", next_steps_part)
                 
                 # Try multiple parsing methods
                 if "|" in next_steps_part:
@@ -444,7 +431,7 @@ async def evaluate_submission(submission: SubmissionRequest):
                     # Use as single next step
                     next_steps = [next_steps_part] if next_steps_part else []
                 
-                logger.debug(f"DEBUG: Parsed next steps: {next_steps}")
+                logger.debug("DEBUG: Parsed next steps: %s", next_steps)
             else:
                 next_steps = []
         else:
@@ -473,15 +460,6 @@ async def evaluate_submission(submission: SubmissionRequest):
         if dynamic_grade:
             grade = dynamic_grade
 
-        # Create full_chat data for admin view
-        import json
-        from datetime import datetime
-        full_chat_data = {
-            "prompt": full_prompt,
-            "response": ai_response,
-            "timestamp": datetime.now().isoformat()
-        }
-        
         # Create feedback response
         feedback_response = FeedbackResponse(
             user_id=submission.user_id,
@@ -498,11 +476,13 @@ async def evaluate_submission(submission: SubmissionRequest):
             style_accuracy_marks=style_accuracy_marks if submission.question_type in ['igcse_narrative', 'igcse_descriptive'] else None,
             improvement_suggestions=improvements,
             strengths=strengths,
-            next_steps=next_steps,
-            full_chat=json.dumps(full_chat_data)
+            next_steps=next_steps
         )
         
-        logger.info("Processing evaluation response and saving to database...")
+        # Numeric grade columns so analytics never re-parse the grade text
+        marks = feedback_response.dict(include=set(MARK_COLUMNS.values()))
+        for field, value in numeric_grade_fields(feedback_response.grade, marks).items():
+            setattr(feedback_response, field, value)
         
         # Update user stats and decrement credits for free plan users
         new_questions_marked = questions_marked + 1
@@ -514,7 +494,7 @@ async def evaluate_submission(submission: SubmissionRequest):
         if current_plan == 'free':
             new_credits = max(0, credits - 1)  # Ensure credits don't go below 0
             update_data["credits"] = new_credits
-            logger.info(f"✅ Credits decremented for free plan user: {credits} -> {new_credits}")
+            logger.debug("✅ Credits decremented for free plan user: %s -> %s", credits, new_credits)
         
         await user_management_service.update_user(submission.user_id, update_data)
         
@@ -523,46 +503,52 @@ async def evaluate_submission(submission: SubmissionRequest):
         short_id = secrets.token_urlsafe(4)[:5]
         feedback_response.short_id = short_id
 
-        evaluation_data = feedback_response.dict()
+        # full_chat lives in the audit store, not in the evaluations table
+        evaluation_data = feedback_response.dict(exclude={'full_chat'})
         evaluation_data['timestamp'] = evaluation_data['timestamp'].isoformat()
         # Also persist short_id alongside the evaluation record (requires DB column)
         try:
             supabase.table('assessment_evaluations').insert(evaluation_data).execute()
-            logger.info("Evaluation saved to database successfully")
         except Exception as e:
-            logger.error(f"Database save failed: {str(e)}")
+            logger.error("Database save failed: %s", e)
             # Fallback: if the DB doesn't have short_id column yet, strip it and insert
             eval_copy = {k: v for k, v in evaluation_data.items() if k != 'short_id'}
             supabase.table('assessment_evaluations').insert(eval_copy).execute()
+
+        # Keep the prompt/response pair for the admin view (deduplicated and compressed).
+        # The Supabase writes run after the response is sent; record() logs its own failures.
+        background_tasks.add_task(audit_store.record, feedback_response.id, full_prompt, ai_response)
+
+        # Fold the new evaluation into the user's analytics aggregate, then award any new badges
+        user_stats = user_stats_service.apply_evaluation(evaluation_data)
+        if user_stats:
+            badge_engine.process_evaluation(user_stats)
+        await admin_search_index.add_evaluation(evaluation_data)
         
         # Final timing - total evaluation process
         total_end_time = time.time()
         total_duration = total_end_time - total_start_time
-        logger.info(f"🚀 PERFORMANCE: Total evaluation process finished in {total_duration:.2f}s")
-        
-        logger.info("Evaluation completed successfully")
+        logger.info("🚀 PERFORMANCE: Evaluation for user %s finished in %.2fs (AI: %.2fs)", submission.user_id, total_duration, ai_duration)
         return feedback_response
         
     except HTTPException as http_exc:
         # Preserve intended HTTP error codes (e.g., 400, 404)
         total_end_time = time.time()
         total_duration = total_end_time - total_start_time
-        logger.error(f"🚀 PERFORMANCE: Total evaluation process failed after {total_duration:.2f}s with HTTP error: {http_exc.detail}")
+        logger.error("🚀 PERFORMANCE: Total evaluation process failed after %.2fs with HTTP error: %s", total_duration, http_exc.detail)
         raise http_exc
     except Exception as e:
         total_end_time = time.time()
         total_duration = total_end_time - total_start_time
-        logger.error(f"🚀 PERFORMANCE: Total evaluation process failed after {total_duration:.2f}s with unexpected error: {str(e)}")
-        logger.error("ERROR in evaluate_submission", extra={"error": str(e)})
-        import traceback
-        traceback.print_exc()
+        logger.error("🚀 PERFORMANCE: Total evaluation process failed after %.2fs with unexpected error: %s", total_duration, e,
+                     extra={"error": str(e)}, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Evaluation error: {str(e)}")
 
 @router.get("/test-history/{user_id}")
 async def test_history(user_id: str):
     """Test endpoint to check evaluation history"""
     try:
-        evaluations_response = supabase.table('assessment_evaluations').select('*').eq('user_id', user_id).order('timestamp', desc=True).limit(10).execute()
+        evaluations_response = supabase.table('assessment_evaluations').select(EVALUATION_SUMMARY_FIELDS).eq('user_id', user_id).order('timestamp', desc=True).limit(10).execute()
         evaluations = evaluations_response.data
         
         return {
@@ -574,85 +560,55 @@ async def test_history(user_id: str):
         raise HTTPException(status_code=500, detail=f"History test error: {str(e)}")
 
 @router.get("/history/{user_id}")
-async def get_evaluation_history(user_id: str):
-    """Get evaluation history for a user"""
+async def get_evaluation_history(user_id: str, view: str = "full"):
+    """Get evaluation history for a user (view=full by default, which the history pages render; view=summary for list rows only)"""
     try:
-        evaluations_response = supabase.table('assessment_evaluations').select('*').eq('user_id', user_id).order('timestamp', desc=True).limit(100).execute()
+        select_fields = evaluation_fields_for_view(view)
+        evaluations_response = supabase.table('assessment_evaluations').select(select_fields).eq('user_id', user_id).order('timestamp', desc=True).limit(100).execute()
         evaluations = evaluations_response.data
         
-        # Parse improvement_suggestions, strengths, and next_steps for each evaluation
-        for evaluation in evaluations:
-            # Parse improvement_suggestions if it's a string
-            if evaluation.get('improvement_suggestions') and isinstance(evaluation['improvement_suggestions'], str):
-                improvements_str = evaluation['improvement_suggestions']
-                if '|' in improvements_str:
-                    evaluation['improvement_suggestions'] = [s.strip() for s in improvements_str.split('|') if s.strip()]
-                else:
-                    evaluation['improvement_suggestions'] = [improvements_str] if improvements_str.strip() else []
-            
-            # Parse strengths if it's a string
-            if evaluation.get('strengths') and isinstance(evaluation['strengths'], str):
-                strengths_str = evaluation['strengths']
-                if '|' in strengths_str:
-                    evaluation['strengths'] = [s.strip() for s in strengths_str.split('|') if s.strip()]
-                else:
-                    evaluation['strengths'] = [strengths_str] if strengths_str.strip() else []
-            
-            # Parse next_steps if it's a string
-            if evaluation.get('next_steps') and isinstance(evaluation['next_steps'], str):
-                next_steps_str = evaluation['next_steps']
-                if '|' in next_steps_str:
-                    evaluation['next_steps'] = [s.strip() for s in next_steps_str.split('|') if s.strip()]
-                else:
-                    evaluation['next_steps'] = [next_steps_str] if next_steps_str.strip() else []
+        decode_evaluation_rows(evaluations)
         
         return {"evaluations": evaluations}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"History retrieval error: {str(e)}")
 
 @router.get("/evaluations/user/{user_id}")
-async def get_user_evaluations(user_id: str):
-    """Get all evaluations for a specific user"""
+async def get_user_evaluations(user_id: str, view: str = "full", limit: int = 100, cursor: str = "", count: str = "exact"):
+    """Get a page of evaluations for a specific user, newest first.
+
+    Pass the returned next_cursor back as `cursor` to fetch the following page;
+    the first page also carries `total`, the user's evaluation count (count=none skips it).
+    The default full view includes the essay and feedback the history pages
+    render; view=summary returns only the list columns.
+    """
     try:
-        logger.info(f"📊 Fetching evaluations for user: {user_id}")
+        logger.debug("📊 Fetching evaluations for user: %s", user_id)
         
         if not supabase:
             logger.error("❌ Supabase client not available")
             raise HTTPException(status_code=500, detail="Database connection not available")
         
-        evaluations_response = supabase.table('assessment_evaluations').select('*').eq('user_id', user_id).order('timestamp', desc=True).execute()
-        evaluations = evaluations_response.data
+        select_fields = evaluation_fields_for_view(view)
+        page_size = clamp_page_size(limit)
+        # Later pages reuse the total from the first one
+        count_mode = None if cursor else count_option(count)
+        query = supabase.table('assessment_evaluations').select(select_fields, count=count_mode).eq('user_id', user_id)
+        query = apply_keyset(query, 'timestamp', 'id', cursor or None, desc=True, limit=page_size)
+        evaluations_response = query.execute()
+        evaluations, next_cursor = build_page(evaluations_response.data, page_size, 'timestamp', 'id')
         
-        logger.info(f"✅ Retrieved {len(evaluations)} evaluations for user: {user_id}")
+        logger.debug("✅ Retrieved %d evaluations for user: %s", len(evaluations), user_id)
         
-        # Parse improvement_suggestions, strengths, and next_steps for each evaluation
-        for evaluation in evaluations:
-            # Parse improvement_suggestions if it's a string
-            if evaluation.get('improvement_suggestions') and isinstance(evaluation['improvement_suggestions'], str):
-                improvements_str = evaluation['improvement_suggestions']
-                if '|' in improvements_str:
-                    evaluation['improvement_suggestions'] = [s.strip() for s in improvements_str.split('|') if s.strip()]
-                else:
-                    evaluation['improvement_suggestions'] = [improvements_str] if improvements_str.strip() else []
-            
-            # Parse strengths if it's a string
-            if evaluation.get('strengths') and isinstance(evaluation['strengths'], str):
-                strengths_str = evaluation['strengths']
-                if '|' in strengths_str:
-                    evaluation['strengths'] = [s.strip() for s in strengths_str.split('|') if s.strip()]
-                else:
-                    evaluation['strengths'] = [strengths_str] if strengths_str.strip() else []
-            
-            # Parse next_steps if it's a string
-            if evaluation.get('next_steps') and isinstance(evaluation['next_steps'], str):
-                next_steps_str = evaluation['next_steps']
-                if '|' in next_steps_str:
-                    evaluation['next_steps'] = [s.strip() for s in next_steps_str.split('|') if s.strip()]
-                else:
-                    evaluation['next_steps'] = [next_steps_str] if next_steps_str.strip() else []
+        decode_evaluation_rows(evaluations)
         
-        logger.info(f"📦 Returning {len(evaluations)} evaluations for user: {user_id}")
-        return {"evaluations": evaluations}
+        logger.debug("📦 Returning %d evaluations for user: %s", len(evaluations), user_id)
+        return {
+            "evaluations": evaluations,
+            "total": evaluations_response.count,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }
     except HTTPException as he:
         logger.error(f"❌ HTTP Exception in user evaluations: {he.status_code} - {he.detail}")
         raise he
@@ -665,60 +621,36 @@ async def get_user_evaluations(user_id: str):
 async def get_evaluation_by_id(evaluation_id: str):
     """Get a specific evaluation by ID (supports both UUID and short_id)"""
     try:
-        print(f"[EVAL_DEBUG] Looking for evaluation_id: {evaluation_id}")
-        print(f"[EVAL_DEBUG] evaluation_id length: {len(evaluation_id)}")
+        logger.debug("[EVAL_DEBUG] Looking for evaluation_id: %s", evaluation_id)
+        logger.debug("[EVAL_DEBUG] evaluation_id length: %s", len(evaluation_id))
         
         # Check if it's a UUID format (36 chars with hyphens) or short ID (5 chars)
         is_uuid = len(evaluation_id) == 36 and evaluation_id.count('-') == 4
-        print(f"[EVAL_DEBUG] is_uuid: {is_uuid}")
+        logger.debug("[EVAL_DEBUG] is_uuid: %s", is_uuid)
         
         if is_uuid:
             # Search by UUID
-            print(f"[EVAL_DEBUG] Searching by UUID: {evaluation_id}")
-            evaluation_response = supabase.table('assessment_evaluations').select('*').eq('id', evaluation_id).execute()
+            logger.debug("[EVAL_DEBUG] Searching by UUID: %s", evaluation_id)
+            evaluation_response = supabase.table('assessment_evaluations').select(EVALUATION_DETAIL_FIELDS).eq('id', evaluation_id).execute()
         else:
             # Search by short_id
-            print(f"[EVAL_DEBUG] Searching by short_id: {evaluation_id}")
-            evaluation_response = supabase.table('assessment_evaluations').select('*').eq('short_id', evaluation_id).execute()
+            logger.debug("[EVAL_DEBUG] Searching by short_id: %s", evaluation_id)
+            evaluation_response = supabase.table('assessment_evaluations').select(EVALUATION_DETAIL_FIELDS).eq('short_id', evaluation_id).execute()
         
-        print(f"[EVAL_DEBUG] Query result: {evaluation_response}")
+        logger.debug("[EVAL_DEBUG] Query result: %s", evaluation_response)
         evaluation = evaluation_response.data[0] if evaluation_response.data else None
-        print(f"[EVAL_DEBUG] Found evaluation: {evaluation is not None}")
+        logger.debug("[EVAL_DEBUG] Found evaluation: %s", evaluation is not None)
         
         if not evaluation:
             raise HTTPException(status_code=404, detail="Evaluation not found")
         
-        # Parse improvement_suggestions if it's a string
-        if evaluation.get('improvement_suggestions') and isinstance(evaluation['improvement_suggestions'], str):
-            # Split by pipe separator and clean up
-            improvements_str = evaluation['improvement_suggestions']
-            if '|' in improvements_str:
-                evaluation['improvement_suggestions'] = [s.strip() for s in improvements_str.split('|') if s.strip()]
-            else:
-                # If no pipe separator, treat as single improvement
-                evaluation['improvement_suggestions'] = [improvements_str] if improvements_str.strip() else []
-        
-        # Parse strengths if it's a string
-        if evaluation.get('strengths') and isinstance(evaluation['strengths'], str):
-            strengths_str = evaluation['strengths']
-            if '|' in strengths_str:
-                evaluation['strengths'] = [s.strip() for s in strengths_str.split('|') if s.strip()]
-            else:
-                evaluation['strengths'] = [strengths_str] if strengths_str.strip() else []
-        
-        # Parse next_steps if it's a string
-        if evaluation.get('next_steps') and isinstance(evaluation['next_steps'], str):
-            next_steps_str = evaluation['next_steps']
-            if '|' in next_steps_str:
-                evaluation['next_steps'] = [s.strip() for s in next_steps_str.split('|') if s.strip()]
-            else:
-                evaluation['next_steps'] = [next_steps_str] if next_steps_str.strip() else []
+        decode_evaluation_row(evaluation)
         
         return {"evaluation": evaluation}
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[EVAL_DEBUG] Exception: {e}")
+        logger.error("Evaluation retrieval error for %s: %s", evaluation_id, e)
         raise HTTPException(status_code=500, detail=f"Evaluation retrieval error: {str(e)}")
 
 @router.get("/evaluations/{evaluation_id}/admin")
@@ -730,50 +662,36 @@ async def get_evaluation_admin_view(evaluation_id: str):
         
         if is_uuid:
             # Search by UUID
-            evaluation_response = supabase.table('assessment_evaluations').select('*').eq('id', evaluation_id).execute()
+            evaluation_response = supabase.table('assessment_evaluations').select(EVALUATION_DETAIL_FIELDS).eq('id', evaluation_id).execute()
         else:
             # Search by short_id
-            evaluation_response = supabase.table('assessment_evaluations').select('*').eq('short_id', evaluation_id).execute()
+            evaluation_response = supabase.table('assessment_evaluations').select(EVALUATION_DETAIL_FIELDS).eq('short_id', evaluation_id).execute()
         
         evaluation = evaluation_response.data[0] if evaluation_response.data else None
         
         if not evaluation:
             raise HTTPException(status_code=404, detail="Evaluation not found")
         
-        # Parse improvement_suggestions if it's a string
-        if evaluation.get('improvement_suggestions') and isinstance(evaluation['improvement_suggestions'], str):
-            improvements_str = evaluation['improvement_suggestions']
-            if '|' in improvements_str:
-                evaluation['improvement_suggestions'] = [s.strip() for s in improvements_str.split('|') if s.strip()]
-            else:
-                evaluation['improvement_suggestions'] = [improvements_str] if improvements_str.strip() else []
+        decode_evaluation_row(evaluation)
         
-        # Parse strengths if it's a string
-        if evaluation.get('strengths') and isinstance(evaluation['strengths'], str):
-            strengths_str = evaluation['strengths']
-            if '|' in strengths_str:
-                evaluation['strengths'] = [s.strip() for s in strengths_str.split('|') if s.strip()]
-            else:
-                evaluation['strengths'] = [strengths_str] if strengths_str.strip() else []
-        
-        # Parse next_steps if it's a string
-        if evaluation.get('next_steps') and isinstance(evaluation['next_steps'], str):
-            next_steps_str = evaluation['next_steps']
-            if '|' in next_steps_str:
-                evaluation['next_steps'] = [s.strip() for s in next_steps_str.split('|') if s.strip()]
-            else:
-                evaluation['next_steps'] = [next_steps_str] if next_steps_str.strip() else []
-        
-        # Parse full_chat data if it exists
+        # Load full_chat lazily: audit store first, then the legacy column for older rows
         full_chat_data = None
-        if evaluation.get('full_chat'):
-            try:
-                import json
-                full_chat_data = json.loads(evaluation['full_chat'])
-            except (json.JSONDecodeError, TypeError):
-                full_chat_data = {"error": "Failed to parse full_chat data"}
-        else:
-            full_chat_data = {"error": "No full_chat data available - this evaluation was created before admin logging was implemented"}
+        try:
+            full_chat_data = audit_store.load(evaluation['id'])
+        except Exception as e:
+            logger.error(f"Failed to load evaluation audit for {evaluation['id']}: {str(e)}")
+        
+        if full_chat_data is None:
+            legacy_response = supabase.table('assessment_evaluations').select('full_chat').eq('id', evaluation['id']).execute()
+            legacy_chat = legacy_response.data[0].get('full_chat') if legacy_response.data else None
+            if legacy_chat:
+                try:
+                    import json
+                    full_chat_data = json.loads(legacy_chat)
+                except (json.JSONDecodeError, TypeError):
+                    full_chat_data = {"error": "Failed to parse full_chat data"}
+            else:
+                full_chat_data = {"error": "No full_chat data available - this evaluation was created before admin logging was implemented"}
         
         return {
             "evaluation": evaluation,
@@ -796,7 +714,9 @@ async def submit_feedback(feedback: dict):
             "comments": feedback.get("comments")
         }
         
-        supabase.table('assessment_feedback').insert(feedback_data).execute()
+        result = supabase.table('assessment_feedback').insert(feedback_data).execute()
+        if result.data:
+            await admin_search_index.add_feedback(result.data[0])
         
         return {"message": "Feedback submitted successfully"}
     except Exception as e:
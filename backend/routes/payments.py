@@ -11,7 +11,7 @@ from datetime import datetime
 
 # Import services for Dodo Payments integration
 from services.dodo_service import dodo_service
-from services.mcp_dodo_service import MCPDodoPaymentsService
+from config.container import container
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -21,8 +21,8 @@ router = APIRouter(prefix="", tags=["payments"])
 # Separate router for webhooks (no prefix conflict)
 webhook_router = APIRouter(prefix="", tags=["webhooks"])
 
-# Initialize MCP Dodo Payments service
-mcp_dodo_service = MCPDodoPaymentsService()
+# MCP Dodo Payments service (built on first use)
+mcp_dodo_service = container.lazy('mcp_dodo_service')
 
 # Payment endpoints
 @router.post("/payments")
@@ -0,0 +1,60 @@
+"""
+One-time backfill: move legacy full_chat values into the evaluation audit store.
+
+Run from the backend directory after applying
+migrations/002_evaluation_audit_store.sql:
+
+    python -m scripts.backfill_evaluation_audit [--batch-size 200] [--dry-run]
+
+Each migrated row has its full_chat column cleared so the evaluations table
+no longer carries the prompt text.
+"""
+import argparse
+import json
+import logging
+from config.settings import get_supabase_client
+from services.audit_service import EvaluationAuditStore
+from utils.pagination import apply_keyset, build_page
+
+logger = logging.getLogger(__name__)
+
+def backfill(batch_size: int = 200, dry_run: bool = False) -> int:
+    """Move every non-empty full_chat into the audit store. Returns rows migrated."""
+    supabase = get_supabase_client()
+    if not supabase:
+        raise SystemExit("Supabase client not available - check SUPABASE_SERVICE_ROLE_KEY")
+
+    store = EvaluationAuditStore(supabase)
+    cursor = None
+    migrated = 0
+    while True:
+        query = supabase.table('assessment_evaluations').select('id, timestamp, full_chat').not_.is_('full_chat', 'null')
+        query = apply_keyset(query, 'timestamp', 'id', cursor, desc=False, limit=batch_size)
+        rows, cursor = build_page(query.execute().data, batch_size, 'timestamp', 'id')
+        for row in rows:
+            try:
+                chat = json.loads(row['full_chat'])
+            except (json.JSONDecodeError, TypeError):
+                logger.warning(f"Skipping evaluation {row['id']}: full_chat is not valid JSON")
+                continue
+            migrated += 1
+            if dry_run:
+                continue
+            if store.record(row['id'], chat.get('prompt') or "", chat.get('response'), chat.get('timestamp')):
+                supabase.table('assessment_evaluations').update({'full_chat': None}).eq('id', row['id']).execute()
+        logger.info(f"Audit backfill progress: migrated={migrated}")
+        if not cursor:
+            break
+    return migrated
+
+def main():
+    parser = argparse.ArgumentParser(description="Move legacy evaluation full_chat payloads into the audit store")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="Report rows that would move without writing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    migrated = backfill(batch_size=args.batch_size, dry_run=args.dry_run)
+    logger.info(f"Audit backfill complete: {migrated} evaluations {'would be ' if args.dry_run else ''}migrated")
+
+if __name__ == "__main__":
+    main()
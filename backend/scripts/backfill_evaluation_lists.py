@@ -0,0 +1,57 @@
+"""
+One-time backfill: convert legacy pipe-joined list columns to JSON arrays.
+
+Run from the backend directory after applying
+migrations/001_evaluation_list_columns.sql:
+
+    python -m scripts.backfill_evaluation_lists [--batch-size 500] [--dry-run]
+"""
+import argparse
+import logging
+from config.settings import get_supabase_client
+from utils.evaluation_rows import LIST_FIELDS, decode_list_field
+from utils.pagination import apply_keyset, build_page
+
+logger = logging.getLogger(__name__)
+
+def backfill(batch_size: int = 500, dry_run: bool = False) -> int:
+    """Rewrite every evaluation whose list columns are still strings. Returns rows updated."""
+    supabase = get_supabase_client()
+    if not supabase:
+        raise SystemExit("Supabase client not available - check SUPABASE_SERVICE_ROLE_KEY")
+
+    select_fields = "id, timestamp, " + ", ".join(LIST_FIELDS)
+    cursor = None
+    scanned = 0
+    updated = 0
+    while True:
+        query = apply_keyset(supabase.table('assessment_evaluations').select(select_fields), 'timestamp', 'id', cursor, desc=False, limit=batch_size)
+        rows, cursor = build_page(query.execute().data, batch_size, 'timestamp', 'id')
+        for row in rows:
+            changes = {
+                field: decode_list_field(row.get(field))
+                for field in LIST_FIELDS
+                if isinstance(row.get(field), str)
+            }
+            if not changes:
+                continue
+            updated += 1
+            if not dry_run:
+                supabase.table('assessment_evaluations').update(changes).eq('id', row['id']).execute()
+        scanned += len(rows)
+        logger.info(f"Backfill progress: scanned={scanned} updated={updated}")
+        if not cursor:
+            break
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert pipe-joined evaluation list columns to JSON arrays")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report rows that would change without writing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    updated = backfill(batch_size=args.batch_size, dry_run=args.dry_run)
+    logger.info(f"Backfill complete: {updated} evaluations {'would be ' if args.dry_run else ''}updated")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+One-time backfill: fill the numeric grade columns on existing evaluations.
+
+Run from the backend directory after applying
+migrations/007_evaluation_numeric_grades.sql:
+
+    python -m scripts.backfill_numeric_grades [--batch-size 500] [--dry-run]
+
+Rows are parsed with the same numeric_grade_fields used when evaluations are
+saved. Only rows whose component_marks is still NULL are visited, so the
+script can be stopped and re-run.
+"""
+import argparse
+import logging
+from config.settings import get_supabase_client
+from utils.grading import MARK_COLUMNS, numeric_grade_fields
+from utils.pagination import apply_keyset, build_page
+
+logger = logging.getLogger(__name__)
+
+def backfill(batch_size: int = 500, dry_run: bool = False) -> int:
+    """Write score, max_score, percentage and component_marks. Returns rows updated."""
+    supabase = get_supabase_client()
+    if not supabase:
+        raise SystemExit("Supabase client not available - check SUPABASE_SERVICE_ROLE_KEY")
+
+    columns = ', '.join(['id', 'timestamp', 'grade'] + list(MARK_COLUMNS.values()))
+    cursor = None
+    updated = 0
+    while True:
+        query = supabase.table('assessment_evaluations').select(columns).is_('component_marks', 'null')
+        query = apply_keyset(query, 'timestamp', 'id', cursor, desc=False, limit=batch_size)
+        rows, cursor = build_page(query.execute().data, batch_size, 'timestamp', 'id')
+        for row in rows:
+            fields = numeric_grade_fields(row.get('grade'), row)
+            updated += 1
+            if not dry_run:
+                supabase.table('assessment_evaluations').update(fields).eq('id', row['id']).execute()
+        logger.info(f"Numeric grade backfill progress: updated={updated}")
+        if not cursor:
+            break
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill numeric grade columns on existing evaluations")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Count rows that would be updated without writing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    updated = backfill(batch_size=args.batch_size, dry_run=args.dry_run)
+    logger.info(f"Numeric grade backfill complete: {updated} evaluations {'would be ' if args.dry_run else ''}updated")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark the admin analytics engine on synthetic data.
+
+Run from the backend directory:
+
+    python -m scripts.bench_admin_analytics [--evaluations 100000 1000000] [--days 30]
+
+Reports the time to build the frames from row dicts (what the endpoint does
+after fetching from Supabase) and the time to compute the full payload.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from services.admin_analytics import load_frames, compute_admin_analytics
+
+QUESTION_TYPES = ['igcse_summary', 'igcse_narrative', 'igcse_descriptive', 'igcse_writers_effect', 'alevel_directed', 'alevel_comparative', 'gp_essay']
+PLANS = ['free', 'basic', 'premium', 'pro', 'unlimited']
+
+def synthetic_rows(evaluation_count: int, seed: int = 7):
+    """Users (1 per 10 evaluations) and evaluations spread over the last 400 days."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    user_count = max(1, evaluation_count // 10)
+    users = [
+        {
+            'uid': f'user-{i}',
+            'email': f'user{i}@example.com',
+            'display_name': f'User {i}' if i % 3 else None,
+            'current_plan': rng.choice(PLANS),
+            'credits': rng.randint(0, 10),
+            'created_at': (now - timedelta(days=rng.randint(0, 400))).isoformat() + '+00:00',
+            'updated_at': None,
+        }
+        for i in range(user_count)
+    ]
+    evaluations = []
+    for i in range(evaluation_count):
+        total = rng.choice([25, 40, 50])
+        evaluations.append({
+            'id': f'eval-{i}',
+            'user_id': f'user-{rng.randrange(user_count)}',
+            'question_type': rng.choice(QUESTION_TYPES),
+            'grade': f'{rng.randint(0, total)}/{total}',
+            'timestamp': (now - timedelta(seconds=rng.randint(0, 400 * 86400))).isoformat() + '+00:00',
+            'short_id': None,
+            'reading_marks': None,
+            'writing_marks': None,
+            'ao1_marks': None,
+            'ao2_marks': None,
+        })
+    return users, evaluations
+
+def run(evaluation_count: int, days: int) -> None:
+    users_rows, evals_rows = synthetic_rows(evaluation_count)
+
+    started = time.perf_counter()
+    users, evals = load_frames(users_rows, evals_rows)
+    loaded = time.perf_counter()
+    result = compute_admin_analytics(users, evals, days)
+    finished = time.perf_counter()
+
+    print(
+        f"{evaluation_count:>9,} evaluations / {len(users_rows):>7,} users: "
+        f"load {loaded - started:6.2f}s  compute {finished - loaded:6.2f}s  "
+        f"total {finished - started:6.2f}s  ({result['totals']['evaluations_last_n_days']:,} in window)"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the admin analytics engine")
+    parser.add_argument("--evaluations", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+    for evaluation_count in args.evaluations:
+        run(evaluation_count, args.days)
+
+if __name__ == "__main__":
+    main()
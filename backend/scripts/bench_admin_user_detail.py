@@ -0,0 +1,111 @@
+"""
+Latency budget check for the admin user detail page.
+
+Starts a local PostgREST stand-in that answers every request after a fixed
+delay, points a real Supabase client at it and times
+services.admin_user_detail.load_user_detail. The user row, the latest
+evaluations and the analytics aggregate are fetched concurrently, so a detail
+load should take about one round trip. Run from the backend directory:
+
+    python -m scripts.bench_admin_user_detail [--latency-ms 50] [--evaluations 100] [--runs 20] [--budget-round-trips 1.5]
+
+Exits non-zero when the p95 latency exceeds the budget.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from supabase import create_client
+from scripts.bench_admin_search import STAND_IN_KEY
+from services.admin_user_detail import load_user_detail
+from services.user_stats_service import UserStatsService, empty_stats
+
+USER_ID = 'bench-user'
+
+def _evaluation(i: int) -> dict:
+    return {
+        'id': f'eval-{i}', 'short_id': f'S{i}', 'user_id': USER_ID, 'question_type': 'igcse_summary',
+        'grade': f'{20 + i % 20}/40', 'percentage': (20 + i % 20) * 2.5, 'reading_marks': '10/15',
+        'student_response': 'word ' * 300, 'feedback': 'Solid answer. ' * 40,
+        'timestamp': f'2025-01-{i % 28 + 1:02d}T{i % 24:02d}:00:00'
+    }
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Minimal PostgREST stand-in for the tables the detail page reads."""
+
+    latency = 0.05
+    evaluations = 100
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, rows, count=None):
+        time.sleep(self.latency)
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if count is not None:
+            self.send_header('Content-Range', f'0-{max(0, len(rows) - 1)}/{count}')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        type(self).requests += 1
+        url = urlparse(self.path)
+        table = url.path.rsplit('/', 1)[-1]
+        limit = int(parse_qs(url.query).get('limit', ['1'])[0])
+        if table == 'assessment_users':
+            return self._reply([{'uid': USER_ID, 'email': 'bench@example.com', 'current_plan': 'unlimited',
+                                 'created_at': '2024-06-01T00:00:00', 'updated_at': '2025-01-28T00:00:00'}])
+        if table == 'assessment_evaluations':
+            return self._reply([_evaluation(i) for i in range(min(limit, self.evaluations))], count=self.evaluations)
+        if table == 'assessment_user_stats':
+            return self._reply([{**empty_stats(USER_ID), 'total_evaluations': 5000, 'version': 1}])
+        return self._reply([])
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the admin user detail load against a local PostgREST stand-in")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--evaluations", type=int, default=100, help="Evaluations returned for the user")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-round-trips", type=float, default=1.5, help="Allowed p95 latency in multiples of the stand-in latency")
+    args = parser.parse_args()
+
+    StandInHandler.latency = args.latency_ms / 1000
+    StandInHandler.evaluations = args.evaluations
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    supabase = create_client(f"http://127.0.0.1:{server.server_port}", STAND_IN_KEY)
+    stats_service = UserStatsService(supabase)
+
+    async def run():
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            user = await load_user_detail(supabase, stats_service, USER_ID)
+            timings.append(time.perf_counter() - started)
+        return timings, user
+
+    timings, user = asyncio.run(run())
+    server.shutdown()
+
+    p50 = statistics.median(timings) * 1000
+    p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)] * 1000
+    budget = args.budget_round_trips * args.latency_ms
+    print(f"evaluations={len(user['evaluations'])} total={user['total_evaluations']} "
+          f"timeline={len(user['activity_timeline'])} requests/load={StandInHandler.requests / args.runs:.1f}")
+    print(f"p50={p50:.1f}ms p95={p95:.1f}ms budget={budget:.0f}ms")
+    if p95 > budget:
+        print("❌ Admin user detail exceeded its latency budget")
+        sys.exit(1)
+    print("✅ Admin user detail within latency budget")
+
+if __name__ == "__main__":
+    main()
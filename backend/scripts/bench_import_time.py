@@ -0,0 +1,95 @@
+"""
+Startup budget check: how long `import server` takes.
+
+Runs `python -X importtime -c "import server"` in fresh interpreters, reports
+the median cumulative import time and the modules that cost the most, and
+checks that heavy dependencies which only some requests need (pandas, the
+Supabase client, PDF parsing, the marking criteria) are not imported at
+startup. Services are built on first use (config/container.py), so importing
+the app should not touch the network. Run from the backend directory:
+
+    python -m scripts.bench_import_time [--runs 5] [--budget-ms 1200] [--top 15]
+
+Exits non-zero when the median exceeds the budget or a deferred module was
+imported.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+from scripts.bench_admin_search import STAND_IN_KEY
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported on first use by the requests that need them, never at startup
+DEFERRED_MODULES = ('pandas', 'numpy', 'pyarrow', 'supabase', 'PyPDF2', 'schemas.marking_criteria')
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, nesting depth) for each `-X importtime` line."""
+    rows = []
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return rows
+
+def measure_once() -> List[Tuple[str, int, int, int]]:
+    env = {
+        **os.environ,
+        # Any configured backend would do; nothing may connect to it during import
+        'SUPABASE_URL': 'http://127.0.0.1:9',
+        'SUPABASE_SERVICE_ROLE_KEY': STAND_IN_KEY,
+    }
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import server'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import server failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app's import time against a startup budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1200)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules (by self time) to list")
+    args = parser.parse_args()
+
+    # The first run compiles bytecode; leave it out of the timings
+    measure_once()
+    totals, self_times = [], {}
+    imported = set()
+    for _ in range(args.runs):
+        rows = measure_once()
+        totals.append(next(cumulative for module, _, cumulative, depth in rows if module == 'server' and depth == 0))
+        for module, self_us, _, _ in rows:
+            self_times.setdefault(module, []).append(self_us)
+            imported.add(module)
+
+    slowest: Dict[str, float] = {module: statistics.median(times) for module, times in self_times.items()}
+    print(f"Slowest modules by self time (median of {args.runs} runs):")
+    for module, self_us in sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f}ms  {module}")
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"import server: median={median_ms:.0f}ms min={min(totals) / 1000:.0f}ms budget={args.budget_ms:.0f}ms")
+
+    failed = False
+    eager = [module for module in DEFERRED_MODULES if module in imported]
+    if eager:
+        print(f"❌ Imported at startup but should be deferred: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print("❌ App import exceeded its startup budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ App import within startup budget")
+
+if __name__ == "__main__":
+    main()
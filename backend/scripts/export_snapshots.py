@@ -0,0 +1,52 @@
+"""
+Snapshot the assessment tables into partitioned Parquet files for offline analysis.
+
+Requires pyarrow (pinned in requirements.txt). Run from the backend directory:
+
+    python -m scripts.export_snapshots [--dir PATH] [--tables evaluations,feedback,users] [--prune]
+
+Evaluations and feedback are exported incrementally from the watermark in the
+snapshot manifest, so scheduled runs only read rows added since the previous
+one; users are re-exported in full each run. --dir defaults to
+ANALYTICS_SNAPSHOT_DIR. Point the API's ANALYTICS_SNAPSHOT_DIR at the same
+directory to have admin analytics read evaluation history from the snapshot.
+"""
+import argparse
+import logging
+import time
+from config.settings import get_supabase_client, ANALYTICS_SNAPSHOT_DIR
+from services.analytics_snapshot import SNAPSHOT_TABLES, AnalyticsSnapshot, parquet_available
+
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export assessment tables to partitioned Parquet")
+    parser.add_argument("--dir", default=ANALYTICS_SNAPSHOT_DIR, help="Snapshot directory (default: ANALYTICS_SNAPSHOT_DIR)")
+    parser.add_argument("--tables", default=",".join(SNAPSHOT_TABLES), help="Comma-separated subset of: " + ", ".join(SNAPSHOT_TABLES))
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--prune", action="store_true", help="Delete part files left behind by interrupted runs")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if not args.dir:
+        raise SystemExit("No snapshot directory - pass --dir or set ANALYTICS_SNAPSHOT_DIR")
+    if not parquet_available():
+        raise SystemExit("pyarrow is not installed - pip install pyarrow")
+    tables = [name.strip() for name in args.tables.split(",") if name.strip()]
+    unknown = [name for name in tables if name not in SNAPSHOT_TABLES]
+    if unknown:
+        raise SystemExit(f"Unknown tables: {', '.join(unknown)}")
+
+    supabase = get_supabase_client()
+    if not supabase:
+        raise SystemExit("Supabase client not available - check SUPABASE_SERVICE_ROLE_KEY")
+    snapshot = AnalyticsSnapshot(args.dir)
+    for name in tables:
+        started = time.monotonic()
+        rows = snapshot.export_table(supabase, name, page_size=args.page_size)
+        logger.info(f"{name}: {rows} rows exported in {time.monotonic() - started:.1f}s (watermark {snapshot.watermark(name)})")
+    if args.prune:
+        logger.info(f"Pruned {snapshot.prune_unlisted()} unlisted part files")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Throughput of POST /api/evaluate as the worker count grows.
+
+Starts a local PostgREST stand-in, then for each worker count launches the app
+through launcher.py with LLM_PROVIDER=fake, fires concurrent evaluations at it
+and reports requests/second and latency. The fake model waits
+--llm-latency-ms without blocking and then spends --llm-cpu-ms of CPU, so
+with a non-zero CPU cost a single worker is bound by one core and throughput
+should rise with the number of workers (up to the number of cores). Run from
+the backend directory:
+
+    python -m scripts.load_test [--workers 1 2 4] [--requests 400] [--concurrency 64] [--llm-cpu-ms 20] [--min-speedup 1.5]
+
+Exits non-zero when the largest worker count is not at least --min-speedup
+times faster than the smallest.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from scripts.bench_admin_search import STAND_IN_KEY
+
+USER_ID = 'load-test-user'
+USER = {'uid': USER_ID, 'email': 'load@example.com', 'current_plan': 'unlimited', 'credits': 999999,
+        'questions_marked': 0, 'created_at': '2025-01-01T00:00:00', 'updated_at': '2025-01-01T00:00:00'}
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """PostgREST stand-in: reads return the load test user, writes echo what was written."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, rows):
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'null') if length else None
+        return payload if isinstance(payload, list) else [payload or {}]
+
+    def do_GET(self):
+        self._reply([] if '/rpc/' in self.path else [USER])
+
+    def do_POST(self):
+        body = self._read_body()
+        self._reply([] if '/rpc/' in self.path else body)
+
+    def do_PATCH(self):
+        self._reply([{**USER, **self._read_body()[0]}])
+
+    def do_HEAD(self):
+        self._reply([])
+
+def _start_app(workers: int, port: int, stand_in_url: str, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        'SUPABASE_URL': stand_in_url,
+        'SUPABASE_SERVICE_ROLE_KEY': STAND_IN_KEY,
+        'LLM_PROVIDER': 'fake',
+        'FAKE_LLM_LATENCY_MS': str(args.llm_latency_ms),
+        'FAKE_LLM_CPU_MS': str(args.llm_cpu_ms),
+        'ROLLUP_INTERVAL_SECONDS': '0',
+        'SEARCH_INDEX_REBUILD_SECONDS': '0',
+        'MAX_REQUESTS': '0',
+    }
+    return subprocess.Popen(
+        [sys.executable, 'launcher.py', '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+async def _wait_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/api/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"App at {base_url} did not become healthy within {timeout}s")
+
+async def _fire(base_url: str, total: int, concurrency: int):
+    submission = {'user_id': USER_ID, 'question_type': 'igcse_narrative', 'student_response': 'The storm rolled in. ' * 150}
+    semaphore = asyncio.Semaphore(concurrency)
+    timings, failures = [], 0
+    # A fresh connection per request: a worker whose loop is busy for longer than the keep-alive
+    # timeout may close a reused connection just as the next request is written to it
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def one():
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post('/api/evaluate', json=submission)
+                    if response.status_code >= 300:
+                        failures += 1
+                except httpx.HTTPError:
+                    failures += 1
+                timings.append(time.perf_counter() - started)
+
+        # Warm every worker's connections and lazy imports before timing
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+        timings.clear()
+        failures = 0
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+    return elapsed, timings, failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure evaluation throughput for several worker counts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--llm-latency-ms", type=int, default=200)
+    parser.add_argument("--llm-cpu-ms", type=int, default=20)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--min-speedup", type=float, default=0, help="Required throughput ratio between the largest and smallest worker count")
+    args = parser.parse_args()
+
+    stand_in = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=stand_in.serve_forever, daemon=True).start()
+    stand_in_url = f"http://127.0.0.1:{stand_in.server_port}"
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    results = {}
+    for workers in args.workers:
+        process = _start_app(workers, args.port, stand_in_url, args)
+        try:
+            asyncio.run(_wait_ready(base_url))
+            elapsed, timings, failures = asyncio.run(_fire(base_url, args.requests, args.concurrency))
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+        ordered = sorted(timings)
+        results[workers] = args.requests / elapsed
+        print(f"workers={workers} rps={results[workers]:.1f} p50={statistics.median(ordered) * 1000:.0f}ms "
+              f"p95={ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000:.0f}ms failures={failures}")
+    stand_in.shutdown()
+
+    smallest, largest = min(results), max(results)
+    speedup = results[largest] / results[smallest]
+    print(f"speedup {smallest}→{largest} workers: {speedup:.2f}x")
+    if args.min_speedup and speedup < args.min_speedup:
+        print(f"❌ Throughput did not scale (needed {args.min_speedup:.2f}x)")
+        sys.exit(1)
+    print("✅ Load test finished")
+
+if __name__ == "__main__":
+    main()
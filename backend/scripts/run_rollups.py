@@ -0,0 +1,37 @@
+"""
+Fold new evaluations into the admin dashboard daily rollups.
+
+Run from the backend directory after applying
+migrations/005_dashboard_daily_rollups.sql:
+
+    python -m scripts.run_rollups [--batch-size 1000] [--max-batches N]
+
+The first run processes the whole evaluations table; later runs only read
+evaluations newer than the stored watermark. The API process also runs the job
+every ROLLUP_INTERVAL_SECONDS, so this is mainly for the initial backfill and
+for cron setups that disable the in-process job.
+"""
+import argparse
+import asyncio
+import logging
+from config.settings import get_supabase_client, get_user_management_service
+from services.rollup_service import DailyRollupService
+
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the admin dashboard daily rollups")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches (default: until caught up)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    supabase = get_supabase_client()
+    if not supabase:
+        raise SystemExit("Supabase client not available - check SUPABASE_SERVICE_ROLE_KEY")
+    service = DailyRollupService(supabase, get_user_management_service(supabase))
+    processed = asyncio.run(service.run(batch_size=args.batch_size, max_batches=args.max_batches))
+    logger.info(f"Rollups complete: {processed} evaluations processed")
+
+if __name__ == "__main__":
+    main()
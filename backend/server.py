@@ -4,18 +4,25 @@ Main FastAPI application - refactored and simplified.
 from fastapi import FastAPI, APIRouter
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+import asyncio
 import logging
 
 # Import configuration
 from config.logging_config import configure_logging
+from config.container import container
 from config.settings import (
-    get_supabase_client, 
-    get_user_management_service, 
-    get_auth_recovery_middleware
+    SUPABASE_KEY,
+    ROLLUP_INTERVAL_SECONDS,
+    SEARCH_INDEX_REBUILD_SECONDS,
+    BACKGROUND_JOBS,
+    BACKGROUND_JOBS_LOCK_PATH
 )
 
 # Import middleware
 from middleware.cors import setup_cors_middleware
+from auth_recovery_middleware import AuthRecoveryMiddleware
+from utils.http_client import start_http_client, close_http_client
+from utils.host_lease import HostLease
 
 # Import routes
 from routes.health import router as health_router
@@ -27,15 +34,14 @@ from routes.payments import router as payments_router, webhook_router as payment
 from routes.question_types import router as question_types_router
 from routes.license_keys import router as license_keys_router
 from routes.admin_auth import router as admin_auth_router
-from routes.admin_dashboard import router as admin_dashboard_router
+from routes.admin_dashboard import router as admin_dashboard_router, rollup_service, admin_analytics_cache, admin_search_index
 
 # Configure logging
 logger = configure_logging()
 
-# Initialize services
-supabase_client = get_supabase_client()
-user_management_service = get_user_management_service(supabase_client)
-auth_recovery_middleware = get_auth_recovery_middleware(user_management_service)
+# Services are built on first use, in the worker that uses them (config/container.py)
+supabase_client = container.lazy('supabase')
+user_management_service = container.lazy('user_management_service')
 
 # Create the main app
 app = FastAPI(title="Universal Service API", version="1.0.0")
@@ -43,9 +49,11 @@ app = FastAPI(title="Universal Service API", version="1.0.0")
 # Setup middleware
 setup_cors_middleware(app)
 
-# Add auth recovery middleware if available
-if auth_recovery_middleware:
-    app.add_middleware(type(auth_recovery_middleware), user_management_service=user_management_service)
+# Add auth recovery middleware if user management can be available
+if SUPABASE_KEY:
+    app.add_middleware(AuthRecoveryMiddleware, user_management_service=user_management_service)
+else:
+    logger.warning("Auth recovery middleware not added - Supabase is not configured")
 
 # Create API router
 api_router = APIRouter(prefix="/api")
@@ -71,11 +79,44 @@ frontend_build_path = Path(__file__).parent / ".." / "frontend" / "build"
 if frontend_build_path.exists():
     app.mount("/", StaticFiles(directory=str(frontend_build_path), html=True), name="frontend")
 
+# Background jobs started with the app
+background_tasks = []
+# Workers without the job lease retry this often, so a recycled holder is replaced
+BACKGROUND_JOBS_POLL_SECONDS = 30
+job_lease = HostLease(BACKGROUND_JOBS_LOCK_PATH)
+
+async def run_background_jobs():
+    """Wait for this host's job lease, then run the periodic jobs until shutdown.
+
+    Only the lease holder refreshes admin analytics ahead of time. Snapshots stay
+    per worker: a worker that serves /admin/analytics recomputes its own copy,
+    in the background, when a read finds it older than
+    ADMIN_ANALYTICS_REFRESH_SECONDS.
+    """
+    await job_lease.wait(BACKGROUND_JOBS_POLL_SECONDS)
+    jobs = [admin_analytics_cache.run_periodically()]
+    if ROLLUP_INTERVAL_SECONDS > 0:
+        jobs.append(rollup_service.run_periodically(ROLLUP_INTERVAL_SECONDS))
+        logger.info(f"Dashboard rollups scheduled every {ROLLUP_INTERVAL_SECONDS}s")
+    if SEARCH_INDEX_REBUILD_SECONDS > 0:
+        jobs.append(admin_search_index.run_periodically(SEARCH_INDEX_REBUILD_SECONDS))
+    await asyncio.gather(*jobs)
+
+@app.on_event("startup")
+async def start_background_jobs():
+    """Open this worker's HTTP client pool and, unless disabled, compete for the periodic job lease."""
+    await start_http_client()
+    if supabase_client and BACKGROUND_JOBS != 'off':
+        background_tasks.append(asyncio.create_task(run_background_jobs()))
+
 # Shutdown handler
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Clean up resources on shutdown."""
     logger.info("Shutting down application...")
+    for task in background_tasks:
+        task.cancel()
+    await close_http_client()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,390 @@
+"""
+Columnar engine behind the admin analytics dashboard (GET /admin/analytics).
+
+User and evaluation rows are loaded into pandas frames once; grades, days,
+hours and weekdays are parsed into arrays a single time and every aggregate is
+computed with vectorised groupby/bincount operations.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.activity import ActivityBitmap
+
+USER_COLUMNS = ['uid', 'email', 'display_name', 'current_plan', 'credits', 'created_at', 'updated_at']
+EVALUATION_COLUMNS = ['id', 'user_id', 'question_type', 'grade', 'percentage', 'timestamp', 'short_id', 'reading_marks', 'writing_marks', 'ao1_marks', 'ao2_marks']
+
+# Rough monthly price per plan used for the revenue estimate
+PLAN_REVENUE = {'free': 0, 'basic': 9.99, 'premium': 19.99, 'pro': 39.99}
+
+GRADE_RANGES = [
+    ('0-20', 0, 20), ('21-40', 21, 40), ('41-60', 41, 60),
+    ('61-80', 61, 80), ('81-100', 81, 100)
+]
+
+EVAL_COUNT_BUCKETS = [('0', None, None), ('1', 1, 1), ('2-5', 2, 5), ('6-10', 6, 10), ('11-20', 11, 20), ('21+', 21, None)]
+
+# Stand-in group key for users without a plan
+NO_PLAN = '__none__'
+
+# Day ordinal used for missing or unparseable dates; sorts before every real day
+MISSING_DAY = -1
+
+def parse_grade_value(g) -> float:
+    """Grade as a number: 'a/b' -> a/b*100, plain numbers as-is, anything else 0."""
+    try:
+        if g is None:
+            return 0.0
+        if isinstance(g, (int, float)):
+            return float(g)
+        s = str(g)
+        if '/' in s:
+            num, den = s.split('/')[:2]
+            num = float(num.strip() or 0)
+            den = float(den.strip() or 1)
+            return (num / den) * 100.0 if den else num
+        return float(s)
+    except Exception:
+        return 0.0
+
+def parse_grade_values(grades: pd.Series) -> np.ndarray:
+    """Vectorised parse_grade_value. Grades repeat heavily, so each distinct value is parsed once."""
+    codes, uniques = pd.factorize(grades, use_na_sentinel=True)
+    parsed = np.array([parse_grade_value(g) for g in uniques] + [0.0], dtype=np.float64)
+    # Missing grades have code -1, which indexes the trailing 0.0
+    return np.nan_to_num(parsed[codes], nan=0.0)
+
+def day_ordinals(timestamps: pd.Series) -> np.ndarray:
+    """Calendar-day ordinals (date.toordinal()) of ISO strings; MISSING_DAY when absent."""
+    codes, uniques = pd.factorize(timestamps.astype('string').str[:10], use_na_sentinel=True)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype='string'), format='%Y-%m-%d', errors='coerce')
+    # 719163 is date(1970, 1, 1).toordinal()
+    ordinals = parsed.to_numpy(dtype='datetime64[D]').astype(np.int64) + 719163
+    ordinals = np.append(np.where(parsed.isna().to_numpy(), MISSING_DAY, ordinals), MISSING_DAY)
+    return ordinals[codes]
+
+def load_frames(users_rows: List[Dict[str, Any]], evals_rows: List[Dict[str, Any]]):
+    """Build the user and evaluation frames with every derived column parsed once."""
+    users = pd.DataFrame.from_records(users_rows, columns=USER_COLUMNS)
+    evals = pd.DataFrame.from_records(evals_rows, columns=EVALUATION_COLUMNS)
+    return prepare_frames(users, evals)
+
+def prepare_frames(users: pd.DataFrame, evals: pd.DataFrame):
+    """Add the derived columns the engine needs to raw user/evaluation frames.
+
+    User ids are factorised into shared integer codes (`user_code`, -1 when
+    missing) so every per-user aggregate is a bincount instead of a string hash.
+    """
+    users = users.copy()
+    evals = evals.copy()
+    users['day'] = day_ordinals(users['created_at'])
+
+    codes, _ = pd.factorize(pd.concat([users['uid'], evals['user_id']], ignore_index=True), use_na_sentinel=True)
+    users['user_code'] = codes[:len(users)]
+    evals['user_code'] = codes[len(users):]
+    users.attrs['user_code_count'] = evals.attrs['user_code_count'] = int(codes.max()) + 1 if len(codes) else 0
+
+    # Stored percentages where present; only rows saved before the numeric
+    # columns existed fall back to parsing the grade text
+    percentage = pd.to_numeric(evals['percentage'], errors='coerce').to_numpy(dtype=np.float64)
+    missing = np.isnan(percentage)
+    if missing.any():
+        percentage[missing] = parse_grade_values(evals['grade'][missing])
+    evals['grade_value'] = percentage
+    evals['day'] = day_ordinals(evals['timestamp'])
+    moments = pd.to_datetime(evals['timestamp'], utc=True, errors='coerce', format='ISO8601')
+    evals['hour'] = moments.dt.hour.fillna(-1).astype(np.int64)
+    evals['weekday'] = moments.dt.dayofweek.fillna(-1).astype(np.int64)
+    evals['has_user'] = (evals['user_code'] >= 0) & (evals['user_id'].astype('string') != '').fillna(False)
+    evals['qtype'] = evals['question_type'].where(evals['question_type'].notna() & (evals['question_type'] != ''), 'Unknown')
+    return users, evals
+
+def _binned_average(bins: np.ndarray, grades: np.ndarray, size: int) -> np.ndarray:
+    """Average of positive grades per bin (0 where a bin has none)."""
+    positive = grades > 0
+    sums = np.bincount(bins[positive], weights=grades[positive], minlength=size)
+    counts = np.bincount(bins[positive], minlength=size)
+    return np.divide(sums, counts, out=np.zeros(size), where=counts > 0)
+
+def _pct_change(current: int, previous: int) -> str:
+    return f"{((current - previous) / previous * 100) if previous else 0:.1f}%"
+
+def _trend(current: int, previous: int) -> str:
+    return "up" if current > previous else "down" if current < previous else "flat"
+
+def _exclusive_quantile(ordered: np.ndarray, i: int, n: int) -> float:
+    """statistics.quantiles(data, n=n)[i - 1] (its default 'exclusive' method) for sorted data.
+
+    Unlike numpy's 'weibull' percentiles, which clip to the min and max, this
+    extrapolates past the ends for small samples, exactly as the stdlib does.
+    """
+    size = len(ordered)
+    if size == 1:
+        return float(ordered[0])
+    m = size + 1
+    j = min(max(i * m // n, 1), size - 1)
+    delta = i * m - j * n
+    return float((ordered[j - 1] * (n - delta) + ordered[j] * delta) / n)
+
+def _pct(part, whole):
+    return (part / whole * 100) if whole else 0
+
+def _first_positions(keys: np.ndarray) -> Dict[Any, int]:
+    """Index of the first occurrence of every key, to keep first-seen ordering."""
+    uniques, first = np.unique(keys, return_index=True)
+    return dict(zip(uniques.tolist(), first.tolist()))
+
+def compute_admin_analytics(users: pd.DataFrame, evals: pd.DataFrame, days: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Compute the full admin analytics payload from prepared frames."""
+    now = now or datetime.utcnow()
+    days = max(1, min(days, 365))
+    start_dt = now - timedelta(days=days)
+    start_day = start_dt.date().toordinal()
+    prev_day = (start_dt - timedelta(days=days)).date().toordinal()
+
+    n_codes = evals.attrs.get('user_code_count', 0)
+    user_days = users['day'].to_numpy()
+    user_codes = users['user_code'].to_numpy()
+    eval_days = evals['day'].to_numpy()
+    eval_codes = evals['user_code'].to_numpy()
+    grades = evals['grade_value'].to_numpy()
+    has_user = evals['has_user'].to_numpy(dtype=bool)
+    recent_mask = eval_days >= start_day
+
+    def distinct_users(mask: np.ndarray) -> int:
+        return int(np.count_nonzero(np.bincount(eval_codes[mask], minlength=n_codes)))
+
+    # Totals and growth
+    total_users = len(users)
+    total_evaluations = len(evals)
+    unique_users_with_evals = distinct_users(has_user)
+
+    prev_users = int(((user_days >= prev_day) & (user_days < start_day)).sum())
+    new_users = int((user_days >= start_day).sum())
+    prev_evals = int(((eval_days >= prev_day) & (eval_days < start_day)).sum())
+    evals_last_n = int(recent_mask.sum())
+
+    active_1d = distinct_users(has_user & (eval_days >= (now - timedelta(days=1)).date().toordinal()))
+    active_7d = distinct_users(has_user & (eval_days >= (now - timedelta(days=7)).date().toordinal()))
+    active_30d = distinct_users(has_user & (eval_days >= (now - timedelta(days=30)).date().toordinal()))
+    recent_converted = distinct_users(has_user & recent_mask)
+
+    plans = users['current_plan']
+    estimated_revenue = float(plans.map(PLAN_REVENUE).fillna(0).sum())
+
+    # Daily series
+    in_window_users = (user_days >= start_day) & (user_days < start_day + days)
+    in_window_evals = recent_mask & (eval_days < start_day + days)
+    daily_new_users = np.bincount(user_days[in_window_users] - start_day, minlength=days)
+    daily_evals = np.bincount(eval_days[in_window_evals] - start_day, minlength=days)
+    daily_avg = _binned_average(eval_days[in_window_evals] - start_day, grades[in_window_evals], days)
+    cumulative_users = int((user_days < start_day).sum()) + np.cumsum(daily_new_users)
+    cumulative_evals = int((eval_days < start_day).sum()) + np.cumsum(daily_evals)
+    daily = []
+    for i in range(days):
+        daily.append({
+            'date': datetime.fromordinal(start_day + i).date().isoformat(),
+            'evaluations': int(daily_evals[i]),
+            'new_users': int(daily_new_users[i]),
+            'active_users': 0,
+            'cumulative_users': int(cumulative_users[i]),
+            'cumulative_evaluations': int(cumulative_evals[i]),
+            'avg_grade': float(daily_avg[i]),
+            'retention_rate': float(daily_evals[i] / max(daily_new_users[i], 1) * 100)
+        })
+
+    # Hourly and weekday distributions
+    hours = evals['hour'].to_numpy()
+    valid_hours = hours >= 0
+    hourly_counts = np.bincount(hours[valid_hours], minlength=24)
+    hourly_avg = _binned_average(hours[valid_hours], grades[valid_hours], 24)
+    hourly_distribution = [
+        {'hour': h, 'count': int(hourly_counts[h]), 'avg_grade': float(hourly_avg[h])}
+        for h in range(24)
+    ]
+    weekdays = evals['weekday'].to_numpy()
+    valid_weekdays = weekdays >= 0
+    weekly_counts = np.bincount(weekdays[valid_weekdays], minlength=7)
+    weekly_avg = _binned_average(weekdays[valid_weekdays], grades[valid_weekdays], 7)
+    weekly_distribution = [
+        {'day_of_week': d, 'count': int(weekly_counts[d]), 'avg_grade': float(weekly_avg[d])}
+        for d in range(7)
+    ]
+
+    # Question types, in order of first appearance
+    qcodes, qnames = pd.factorize(evals['qtype'])
+    n_types = len(qnames)
+    q_counts = np.bincount(qcodes, minlength=n_types)
+    q_recent = np.bincount(qcodes[recent_mask], minlength=n_types)
+    q_avg = _binned_average(qcodes, grades, n_types)
+    q_grade_sums = np.bincount(qcodes, weights=grades, minlength=n_types)
+    # Missing user ids count as one more distinct "user", as the set-based version did
+    q_users = np.bincount(np.unique(qcodes.astype(np.int64) * (n_codes + 1) + eval_codes + 1) // (n_codes + 1), minlength=n_types)
+    by_question_type = [
+        {
+            'question_type': qnames[t],
+            'count': int(q_counts[t]),
+            'recent': int(q_recent[t]),
+            'avg_grade': float(q_avg[t]),
+            'unique_users': int(q_users[t]),
+            'completion_rate': float(q_counts[t] / q_users[t]) if q_users[t] else 0,
+            'avg_time_spent': 0  # Placeholder for future time tracking
+        }
+        for t in range(n_types)
+    ]
+    recent_order = sorted((t for t in range(n_types) if q_recent[t]), key=lambda t: -q_recent[t])[:15]
+    top_qtypes_recent = [{"question_type": qnames[t], "count": int(q_recent[t])} for t in recent_order]
+    type_avgs = [round(float(q_grade_sums[t] / q_counts[t]), 2) if q_counts[t] else 0.0 for t in range(n_types)]
+    avg_order = sorted(range(n_types), key=lambda t: -type_avgs[t])[:15]
+    top_qtypes_by_avg = [{"question_type": qnames[t], "avg_grade": type_avgs[t]} for t in avg_order]
+
+    # Grade distribution and statistics
+    all_grades = grades[grades > 0]
+    grade_distribution = []
+    for range_name, min_grade, max_grade in GRADE_RANGES:
+        count = int(((all_grades >= min_grade) & (all_grades <= max_grade)).sum())
+        grade_distribution.append({
+            'range': range_name,
+            'count': count,
+            'percentage': _pct(count, len(all_grades))
+        })
+    grade_stats = {}
+    if len(all_grades):
+        ordered = np.sort(all_grades)
+        p25, p75, p90 = _exclusive_quantile(ordered, 1, 4), _exclusive_quantile(ordered, 3, 4), _exclusive_quantile(ordered, 9, 10)
+        grade_stats = {
+            'avg': round(float(all_grades.mean()), 2),
+            'p25': round(float(p25), 2),
+            'p50': round(float(np.median(all_grades)), 2),
+            'p75': round(float(p75), 2),
+            'p90': round(float(p90), 2),
+            'std_dev': round(float(all_grades.std(ddof=1)), 2) if len(all_grades) > 1 else 0.0,
+            'total_graded': int(len(all_grades)),
+            'min': round(float(all_grades.min()), 2),
+            'max': round(float(all_grades.max()), 2)
+        }
+
+    # Plans: evaluations are attributed to plans through the user code -> plan join
+    plan_codes, plan_names = pd.factorize(plans.astype(object).where(plans.notna(), NO_PLAN))
+    # One spare slot at the end absorbs code -1 (evaluations without a user)
+    plan_by_user = np.full(n_codes + 1, -1, dtype=np.int64)
+    known = user_codes >= 0
+    plan_by_user[user_codes[known]] = plan_codes[known]
+    eval_plans = plan_by_user[eval_codes]
+    plan_counts = np.bincount(plan_codes, minlength=len(plan_names))
+    plan_evals = np.bincount(eval_plans[eval_plans >= 0], minlength=len(plan_names))
+    by_plan = []
+    for p, plan in enumerate(plan_names):
+        by_plan.append({
+            'plan': None if plan == NO_PLAN else plan,
+            'count': int(plan_counts[p]),
+            'revenue': int(plan_counts[p]) * PLAN_REVENUE.get(plan, 0),
+            'avg_evaluations': plan_evals[p] / plan_counts[p] if plan_counts[p] else 0,
+            'churn_rate': 0  # Placeholder for churn calculation
+        })
+
+    # Evaluations-per-user buckets
+    per_user_counts = np.bincount(eval_codes[has_user], minlength=n_codes)
+    per_user_counts = per_user_counts[per_user_counts > 0]
+    distribution = []
+    for bucket, low, high in EVAL_COUNT_BUCKETS:
+        if low is None:
+            count = total_users - len(per_user_counts)
+        else:
+            selected = per_user_counts >= low
+            if high is not None:
+                selected &= per_user_counts <= high
+            count = int(selected.sum())
+        distribution.append({'bucket': bucket, 'users': int(count)})
+
+    # Top users in the period, ties broken by first appearance
+    window = has_user & recent_mask
+    window_codes = eval_codes[window]
+    window_days = eval_days[window]
+    window_counts = np.bincount(window_codes, minlength=n_codes)
+    window_avg = _binned_average(window_codes, grades[window], n_codes)
+    first_seen = _first_positions(window_codes)
+    top_codes = sorted(first_seen, key=lambda code: (-window_counts[code], first_seen[code]))[:20]
+    user_row = np.full(n_codes + 1, -1, dtype=np.int64)
+    user_row[user_codes[known]] = np.flatnonzero(known)
+    display_names = users['display_name'].to_numpy()
+    emails = users['email'].to_numpy()
+
+    def display_name_for(code: int) -> str:
+        row = user_row[code]
+        if row < 0:
+            return 'Unknown'
+        name, email = display_names[row], emails[row]
+        if isinstance(name, str) and name:
+            return name
+        return (email if isinstance(email, str) else '').split('@')[0]
+
+    eval_user_ids = evals['user_id'].to_numpy()
+    first_rows = np.flatnonzero(window)
+    top_users_last_n = []
+    for code in top_codes:
+        activity = ActivityBitmap()
+        for day in np.unique(window_days[window_codes == code]):
+            activity.add(int(day))
+        top_users_last_n.append({
+            'user_id': eval_user_ids[first_rows[first_seen[code]]],
+            'display_name': display_name_for(code),
+            'count': int(window_counts[code]),
+            'avg_grade': float(window_avg[code]),
+            'active_days': len(activity),
+            'streak': activity.longest_streak(),  # Longest run of active days in the period
+            'total_time': 0  # Placeholder for time tracking
+        })
+
+    # Time from sign-up to first evaluation
+    dated = has_user & (eval_days != MISSING_DAY)
+    first_eval = np.full(n_codes + 1, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first_eval, eval_codes[dated], eval_days[dated])
+    signed_up = (user_days != MISSING_DAY) & (user_codes >= 0)
+    user_first = first_eval[user_codes[signed_up]]
+    has_first = user_first != np.iinfo(np.int64).max
+    gaps = (user_first[has_first] - user_days[signed_up][has_first])
+    gaps = gaps[gaps >= 0]
+    tffe = {}
+    if len(gaps):
+        tffe = {
+            'avg_days': round(float(gaps.mean()), 2),
+            'median_days': round(float(np.median(gaps)), 2),
+            'count': int(len(gaps))
+        }
+
+    return {
+        "totals": {
+            "total_users": total_users,
+            "total_evaluations": total_evaluations,
+            "unique_users_with_evaluations": unique_users_with_evals,
+            "new_users_last_n_days": new_users,
+            "evaluations_last_n_days": evals_last_n,
+            "avg_evaluations_per_user": round((total_evaluations / total_users) if total_users else 0, 2),
+            "active_users_1d": active_1d,
+            "active_users_7d": active_7d,
+            "active_users_30d": active_30d,
+            "retention_rate": round(_pct(unique_users_with_evals, total_users), 2),
+            "retention_7d": round(_pct(active_7d, total_users), 2),
+            "retention_30d": round(_pct(active_30d, total_users), 2),
+            "conversion_overall_pct": round(_pct(unique_users_with_evals, total_users), 2),
+            "conversion_last_n_days_pct": round(_pct(recent_converted, new_users), 2),
+            "estimated_revenue": round(estimated_revenue, 2),
+            "user_growth_trend": _trend(new_users, prev_users),
+            "user_growth_rate": _pct_change(new_users, prev_users),
+            "evaluation_growth_trend": _trend(evals_last_n, prev_evals),
+            "evaluation_growth_rate": _pct_change(evals_last_n, prev_evals),
+        },
+        "daily": daily,
+        "hourly_distribution": hourly_distribution,
+        "weekly_distribution": weekly_distribution,
+        "by_question_type": by_question_type,
+        "by_plan": by_plan,
+        "evaluations_per_user_distribution": distribution,
+        "grade_stats": grade_stats,
+        "grade_distribution": grade_distribution,
+        "time_to_first_evaluation": tffe,
+        "top_users_last_n_days": top_users_last_n,
+        "top_question_types_recent": top_qtypes_recent,
+        "top_question_types_by_avg": top_qtypes_by_avg,
+    }
@@ -10,6 +10,9 @@ import logging
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 import secrets
+from config.container import container
+from config.settings import ADMIN_SESSION_STORE, ADMIN_SESSION_DB_PATH, ADMIN_SESSION_MAX
+from services.admin_session_store import create_session_store
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +22,8 @@ class AdminAuthService:
         self.admin_key = os.environ.get('ADMIN_SECRET_KEY', self._generate_secure_key())
         self.key_hash = self._hash_key(self.admin_key)
         
-        # Store active admin sessions
-        self.admin_sessions = {}
+        # Active admin sessions (in-process, or shared across workers via SQLite)
+        self.sessions = create_session_store(ADMIN_SESSION_STORE, ADMIN_SESSION_DB_PATH, ADMIN_SESSION_MAX)
         
         logger.info("AdminAuthService initialized with secure key system")
     
@@ -57,11 +60,11 @@ class AdminAuthService:
         session_expiry = datetime.now() + timedelta(hours=24)  # 24 hour session
         
         # Store session
-        self.admin_sessions[session_token] = {
+        self.sessions.put(session_token, {
             'authenticated': True,
             'expires_at': session_expiry,
             'authenticated_at': datetime.now()
-        }
+        })
         
         logger.info("Admin authenticated successfully")
         return {
@@ -71,27 +74,27 @@ class AdminAuthService:
             'message': 'Admin access granted'
         }
     
+    def get_session(self, session_token: str) -> Optional[Dict[str, Any]]:
+        """Return the session for a token, or None if it is unknown or expired"""
+        if not session_token:
+            return None
+        return self.sessions.get(session_token)
+    
     def verify_session(self, session_token: str) -> bool:
         """Verify if session token is valid"""
-        if not session_token or session_token not in self.admin_sessions:
-            return False
-        
-        session = self.admin_sessions[session_token]
-        if datetime.now() > session['expires_at']:
-            # Session expired, remove it
-            del self.admin_sessions[session_token]
-            return False
-        
-        return True
+        return self.get_session(session_token) is not None
     
     def revoke_session(self, session_token: str) -> bool:
         """Revoke an admin session"""
-        if session_token in self.admin_sessions:
-            del self.admin_sessions[session_token]
+        if self.sessions.delete(session_token):
             logger.info("Admin session revoked")
             return True
         return False
     
+    def has_sessions(self) -> bool:
+        """Whether any admin session is active"""
+        return not self.sessions.is_empty()
+    
     def get_admin_key(self) -> str:
         """Get the current admin key (for setup purposes)"""
         return self.admin_key
@@ -102,5 +105,5 @@ class AdminAuthService:
             return False
         return self.verify_session(session_token)
 
-# Global instance
-admin_auth_service = AdminAuthService()
+# Global instance, built on first use (see config/container.py)
+admin_auth_service = container.lazy('admin_auth_service')
@@ -0,0 +1,98 @@
+"""
+Admin global search across users, evaluations and feedback.
+
+The three primary searches run concurrently, then the related data (owners of
+matched evaluations, latest evaluations of matched users) is fetched with one
+batched call each, also concurrently. A search costs two round trips of
+latency whatever the number of matches.
+"""
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+# Related-user fields returned alongside evaluation matches
+RELATED_USER_FIELDS = ('uid', 'email', 'display_name', 'current_plan')
+
+# Latest evaluations attached to each matched user
+RECENT_PER_USER = 3
+
+def _search_users(supabase: 'Client', query: str, limit: int) -> List[Dict[str, Any]]:
+    return supabase.table('assessment_users').select('uid, email, display_name, current_plan, credits, created_at') \
+        .or_(f"uid.ilike.%{query}%,email.ilike.%{query}%,display_name.ilike.%{query}%") \
+        .order('created_at', desc=True).limit(limit).execute().data or []
+
+def _search_evaluations(supabase: 'Client', query: str, limit: int) -> List[Dict[str, Any]]:
+    # Search by short_id, full id, user_id, question_type, and grade
+    return supabase.table('assessment_evaluations').select('id, short_id, user_id, question_type, grade, timestamp') \
+        .or_(f"short_id.ilike.%{query}%,id.ilike.%{query}%,user_id.ilike.%{query}%,question_type.ilike.%{query}%,grade.ilike.%{query}%") \
+        .order('timestamp', desc=True).limit(limit).execute().data or []
+
+def _search_feedback(supabase: 'Client', query: str, limit: int) -> List[Dict[str, Any]]:
+    # Search by comments, category, evaluation_id, and user_id
+    try:
+        return supabase.table('assessment_feedback').select('id, evaluation_id, user_id, category, accurate, comments, created_at') \
+            .or_(f"comments.ilike.%{query}%,category.ilike.%{query}%,evaluation_id.ilike.%{query}%,user_id.ilike.%{query}%") \
+            .order('created_at', desc=True).limit(limit).execute().data or []
+    except Exception:
+        return []
+
+def top_per_user(rows: List[Dict[str, Any]], per_user: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Group rows by user_id keeping each user's `per_user` newest, newest first."""
+    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in sorted(rows, key=lambda r: str(r.get('timestamp') or ''), reverse=True):
+        bucket = grouped[row.get('user_id')]
+        if len(bucket) < per_user:
+            bucket.append({k: v for k, v in row.items() if k != 'user_id'})
+    return grouped
+
+def _valid_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+def _recent_evaluations(supabase: 'Client', user_ids: List[str], per_user: int) -> Dict[str, List[Dict[str, Any]]]:
+    # The function takes uuid[]; one malformed id would fail the whole call
+    user_ids = [user_id for user_id in user_ids if _valid_uuid(user_id)]
+    if not user_ids:
+        return {}
+    try:
+        rows = supabase.rpc('admin_recent_evaluations', {"user_ids": user_ids, "per_user": per_user}).execute().data or []
+    except Exception as e:
+        logger.error(f"Recent evaluations lookup failed: {str(e)}")
+        return {}
+    return top_per_user(rows, per_user)
+
+async def global_search(supabase: 'Client', user_management_service, query: str, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Run the admin search and attach related users and recent evaluations."""
+    users, evaluations, feedback = await asyncio.gather(
+        asyncio.to_thread(_search_users, supabase, query, limit),
+        asyncio.to_thread(_search_evaluations, supabase, query, limit),
+        asyncio.to_thread(_search_feedback, supabase, query, limit),
+    )
+
+    owner_ids = list({e.get('user_id') for e in evaluations if e.get('user_id')})
+    matched_ids = [u['uid'] for u in users[:limit] if u.get('uid')]
+    # The thread is started first: get_users_by_ids runs its query on the event loop
+    recent, related_users = await asyncio.gather(
+        asyncio.to_thread(_recent_evaluations, supabase, matched_ids, RECENT_PER_USER),
+        user_management_service.get_users_by_ids(owner_ids, include_deleted=True),
+    )
+
+    users_map = {
+        uid: {field: u.get(field) for field in RELATED_USER_FIELDS}
+        for uid, u in related_users.items()
+    }
+    return {
+        "users": [{**u, 'recent_evaluations': recent.get(u.get('uid'), [])} for u in users[:limit]],
+        "evaluations": [{**e, 'user': users_map.get(e.get('user_id'))} for e in evaluations],
+        "feedback": feedback
+    }
@@ -0,0 +1,394 @@
+"""
+Search index behind the admin global search, shared by every worker on a host.
+
+Users, evaluation metadata and feedback are copied into a SQLite file (WAL
+mode, like the SQLite admin session store) with an FTS5 trigram index over the
+searched columns. Writes made through the API go straight into the file
+(new evaluations and feedback, users changed through UserManagementService),
+so they are visible to every worker at once, and a periodic reconciliation
+from the database, run by one worker at a time, picks up anything written
+elsewhere and drops deleted rows.
+
+Matching is the same as the database queries in services/admin_search.py: a
+case-insensitive substring of any searched column (queries of three or more
+characters go through the trigram index, shorter ones scan the copied rows).
+When a single-word query matches nothing in a table, it is retried with the
+indexed words within a small edit distance of it. Until the first build
+completes, searches fall back to the database queries.
+
+Results are the newest matches, taken from the most recently indexed few
+hundred. Rows are indexed in time order (the build loads the oldest first and
+API writes are the newest), so this only differs from a full sort when a
+query matches more rows than that and some of them were written out of order,
+e.g. backfilled directly into the database.
+"""
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from config.settings import SEARCH_INDEX_DB_PATH
+from services.admin_search import RELATED_USER_FIELDS, RECENT_PER_USER
+from user_management_service import UserManagementService
+from utils.pagination import apply_keyset, build_page
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+class Table(NamedTuple):
+    source: str  # database table
+    key: str
+    sort: str  # newest first
+    fields: Tuple[str, ...]
+    searched: Tuple[str, ...]  # substring-matched, as in services/admin_search.py
+    vocabulary: Tuple[str, ...]  # free text whose words feed the fuzzy fallback
+
+TABLES = {
+    'users': Table('assessment_users', 'uid', 'created_at',
+                   ('uid', 'email', 'display_name', 'current_plan', 'credits', 'created_at'),
+                   ('uid', 'email', 'display_name'), ('email', 'display_name')),
+    'evaluations': Table('assessment_evaluations', 'id', 'timestamp',
+                         ('id', 'short_id', 'user_id', 'question_type', 'grade', 'timestamp'),
+                         ('short_id', 'id', 'user_id', 'question_type', 'grade'), ('question_type',)),
+    'feedback': Table('assessment_feedback', 'id', 'created_at',
+                      ('id', 'evaluation_id', 'user_id', 'category', 'accurate', 'comments', 'created_at'),
+                      ('comments', 'category', 'evaluation_id', 'user_id'), ('comments', 'category')),
+}
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+REBUILD_PAGE_SIZE = 1000
+# Changed users are re-read in chunks of this many ids
+DIRTY_BATCH_SIZE = 100
+# How often each worker checks whether a reconciliation is due
+REBUILD_POLL_SECONDS = 60
+# Shortest query the trigram index can answer; shorter ones scan the rows
+MIN_TRIGRAM_LENGTH = 3
+# Matches are read most recently indexed first, this many per result, and then ordered
+# newest first (see the module docstring)
+CANDIDATE_WINDOW_FACTOR = 20
+MIN_CANDIDATE_WINDOW = 200
+# Queries shorter than this are never fuzzy-matched
+MIN_FUZZY_LENGTH = 4
+# Candidate words checked with edit distance, and corrections searched, per fuzzy query
+MAX_FUZZY_CANDIDATES = 200
+MAX_CORRECTIONS = 3
+
+def _sort_value(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+def _like_pattern(text: str) -> str:
+    return '%' + re.sub(r'([\\%_])', r'\\\1', text) + '%'
+
+def _max_distance(term: str) -> int:
+    return 1 if len(term) <= 5 else 2
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 as soon as it must exceed `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def _schema(name: str, table: Table) -> List[str]:
+    columns = ', '.join(table.fields)
+    searched = ', '.join(table.searched)
+    old = ', '.join(f"old.{column}" for column in table.searched)
+    new = ', '.join(f"new.{column}" for column in table.searched)
+    changed = ' OR '.join(f"old.{column} IS NOT new.{column}" for column in table.searched)
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} ({columns}, indexed_at REAL NOT NULL, PRIMARY KEY ({table.key}))",
+        f"CREATE INDEX IF NOT EXISTS {name}_{table.sort} ON {name} ({table.sort})",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name}_fts USING fts5({searched}, content='{name}', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {name} BEGIN"
+        f" INSERT INTO {name}_fts (rowid, {searched}) VALUES (new.rowid, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {name} BEGIN"
+        f" INSERT INTO {name}_fts ({name}_fts, rowid, {searched}) VALUES ('delete', old.rowid, {old}); END",
+        # Reconciliation rewrites every row; only re-index the ones whose searched text changed
+        f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON {name} WHEN {changed} BEGIN"
+        f" INSERT INTO {name}_fts ({name}_fts, rowid, {searched}) VALUES ('delete', old.rowid, {old});"
+        f" INSERT INTO {name}_fts (rowid, {searched}) VALUES (new.rowid, {new}); END",
+    ]
+
+SCHEMA = [statement for name, table in TABLES.items() for statement in _schema(name, table)] + [
+    "CREATE INDEX IF NOT EXISTS evaluations_user_id ON evaluations (user_id, timestamp)",
+    "CREATE TABLE IF NOT EXISTS words (word TEXT PRIMARY KEY)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS words_fts USING fts5(word, content='words', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS words_ai AFTER INSERT ON words BEGIN"
+    " INSERT INTO words_fts (rowid, word) VALUES (new.rowid, new.word); END",
+    "CREATE TABLE IF NOT EXISTS dirty_users (uid TEXT PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS index_state (key TEXT PRIMARY KEY, value REAL NOT NULL)",
+]
+
+class AdminSearchIndex:
+    """Maintains the shared admin search index and answers searches from it."""
+
+    def __init__(self, supabase_client: 'Client', path: str):
+        self.supabase = supabase_client
+        self.path = path
+        # sqlite3 connections must stay on the thread (and process) that opened them
+        self._local = threading.local()
+        with self._connection() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        # A preloaded app forks workers after import; never reuse the parent's connection
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _state(self, key: str) -> Optional[float]:
+        row = self._connection().execute("SELECT value FROM index_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def ready(self) -> bool:
+        """Whether a build has completed (on any worker of this host)."""
+        return self._state('built_at') is not None
+
+    @property
+    def built_at(self) -> Optional[float]:
+        return self._state('built_at')
+
+    def _active(self) -> bool:
+        # Nothing to keep current until the first build has started
+        return self._state('build_started_at') is not None
+
+    # --- incremental updates ---
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, name: str, rows: List[Dict[str, Any]], indexed_at: float) -> None:
+        table = TABLES[name]
+        columns = ', '.join(table.fields)
+        updates = ', '.join(f"{column} = excluded.{column}" for column in table.fields if column != table.key)
+        conn.executemany(
+            f"INSERT INTO {name} ({columns}, indexed_at) VALUES ({', '.join('?' * (len(table.fields) + 1))})"
+            f" ON CONFLICT ({table.key}) DO UPDATE SET {updates}, indexed_at = excluded.indexed_at",
+            [tuple(_sort_value(row.get(field)) for field in table.fields) + (indexed_at,) for row in rows]
+        )
+        words = {word for row in rows for column in table.vocabulary
+                 for word in WORD_RE.findall(str(row.get(column) or '').lower()) if len(word) >= MIN_TRIGRAM_LENGTH}
+        conn.executemany("INSERT OR IGNORE INTO words (word) VALUES (?)", [(word,) for word in words])
+
+    def _add(self, name: str, row: Dict[str, Any]) -> None:
+        if not self._active():
+            return
+        with self._connection() as conn:
+            self._write(conn, name, [row], time.time())
+
+    async def _add_later(self, name: str, row: Dict[str, Any]) -> None:
+        try:
+            await asyncio.to_thread(self._add, name, row)
+        except Exception as e:
+            # The next reconciliation picks the row up
+            logger.error(f"❌ Search index update failed for {name}: {e}")
+
+    async def add_evaluation(self, row: Dict[str, Any]) -> None:
+        """Index a newly saved evaluation."""
+        await self._add_later('evaluations', row)
+
+    async def add_feedback(self, row: Dict[str, Any]) -> None:
+        """Index newly submitted feedback."""
+        await self._add_later('feedback', row)
+
+    def mark_user_changed(self, user_id: str) -> None:
+        """Queue a user to be re-read before the next search (UserManagementService change listener)."""
+        if user_id and self._active():
+            with self._connection() as conn:
+                conn.execute("INSERT OR IGNORE INTO dirty_users (uid) VALUES (?)", (user_id,))
+
+    def _refresh_dirty_users(self) -> None:
+        dirty = [row[0] for row in self._connection().execute("SELECT uid FROM dirty_users")]
+        fields = ', '.join(TABLES['users'].fields)
+        for start in range(0, len(dirty), DIRTY_BATCH_SIZE):
+            chunk = dirty[start:start + DIRTY_BATCH_SIZE]
+            rows = self.supabase.table('assessment_users').select(fields).in_('uid', chunk).execute().data or []
+            gone = [(uid,) for uid in set(chunk) - {row['uid'] for row in rows}]
+            with self._connection() as conn:
+                self._write(conn, 'users', rows, time.time())
+                conn.executemany("DELETE FROM users WHERE uid = ?", gone)
+                conn.executemany("DELETE FROM dirty_users WHERE uid = ?", [(uid,) for uid in chunk])
+
+    # --- reconciliation ---
+
+    def _load(self, table: Table) -> Iterable[List[Dict[str, Any]]]:
+        cursor = None
+        while True:
+            query = self.supabase.table(table.source).select(', '.join(table.fields))
+            query = apply_keyset(query, table.sort, table.key, cursor, desc=False, limit=REBUILD_PAGE_SIZE)
+            rows, cursor = build_page(query.execute().data, REBUILD_PAGE_SIZE, table.sort, table.key)
+            yield rows
+            if not cursor:
+                return
+
+    def _build(self) -> Dict[str, int]:
+        started = time.time()
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO index_state (key, value) VALUES ('build_started_at', ?)", (started,))
+        counts = {}
+        for name, table in TABLES.items():
+            # One transaction per page keeps request-path writes from waiting on the whole build
+            for rows in self._load(table):
+                with self._connection() as conn:
+                    self._write(conn, name, rows, time.time())
+            with self._connection() as conn:
+                # Rows not seen by this build (and not written since it started) were deleted
+                conn.execute(f"DELETE FROM {name} WHERE indexed_at < ?", (started,))
+                counts[name] = conn.execute(f"SELECT count(*) FROM {name}").fetchone()[0]
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO index_state (key, value) VALUES ('built_at', ?)", (time.time(),))
+        return counts
+
+    async def rebuild(self) -> None:
+        """Reconcile the index with the database."""
+        started = time.monotonic()
+        counts = await asyncio.to_thread(self._build)
+        logger.info(
+            f"🔎 Search index rebuilt in {time.monotonic() - started:.1f}s: "
+            f"{counts['users']} users, {counts['evaluations']} evaluations, {counts['feedback']} feedback"
+        )
+
+    def _claim_rebuild(self, interval_seconds: int) -> bool:
+        # Every worker runs the loop; the first to find the last claim older than the interval does the work
+        now = time.time()
+        with self._connection() as conn:
+            return conn.execute(
+                "INSERT INTO index_state (key, value) VALUES ('rebuild_claimed_at', ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value WHERE index_state.value <= ?",
+                (now, now - interval_seconds)
+            ).rowcount == 1
+
+    async def run_periodically(self, interval_seconds: int) -> None:
+        """Reconcile the index every interval (once per host, whichever worker claims it) until cancelled."""
+        while True:
+            try:
+                if await asyncio.to_thread(self._claim_rebuild, interval_seconds):
+                    await self.rebuild()
+            except Exception as e:
+                logger.error(f"❌ Search index rebuild failed: {e}")
+            await asyncio.sleep(min(interval_seconds, REBUILD_POLL_SECONDS))
+
+    # --- queries ---
+
+    def _match(self, name: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        table = TABLES[name]
+        columns = ', '.join(f"t.{field}" for field in table.fields)
+        window = max(limit * CANDIDATE_WINDOW_FACTOR, MIN_CANDIDATE_WINDOW)
+        if len(query) >= MIN_TRIGRAM_LENGTH:
+            cursor = self._connection().execute(
+                f"SELECT {columns} FROM {name}_fts f JOIN {name} t ON t.rowid = f.rowid"
+                f" WHERE {name}_fts MATCH ? ORDER BY f.rowid DESC LIMIT ?",
+                (_phrase(query), window)
+            )
+        else:
+            where = ' OR '.join(f"t.{column} LIKE ? ESCAPE '\\'" for column in table.searched)
+            cursor = self._connection().execute(
+                f"SELECT {columns} FROM {name} t WHERE {where} ORDER BY t.rowid DESC LIMIT ?",
+                (*[_like_pattern(query)] * len(table.searched), window)
+            )
+        rows = [dict(zip(table.fields, row)) for row in cursor]
+        rows.sort(key=lambda row: str(row.get(table.sort) or ''), reverse=True)
+        rows = rows[:limit]
+        if name == 'feedback':
+            for row in rows:
+                if row['accurate'] is not None:
+                    row['accurate'] = bool(row['accurate'])
+        return rows
+
+    def _corrections(self, word: str) -> List[str]:
+        grams = {word[i:i + MIN_TRIGRAM_LENGTH] for i in range(len(word) - MIN_TRIGRAM_LENGTH + 1)}
+        candidates = self._connection().execute(
+            "SELECT word FROM words_fts WHERE words_fts MATCH ? ORDER BY rank LIMIT ?",
+            (' OR '.join(_phrase(gram) for gram in grams), MAX_FUZZY_CANDIDATES)
+        )
+        limit = _max_distance(word)
+        scored = []
+        for (candidate,) in candidates:
+            # Compare against the word's leading part too, so corrections still match longer words
+            for form in (candidate[:len(word)], candidate):
+                distance = edit_distance(word, form, limit)
+                if distance <= limit:
+                    scored.append((distance, form))
+                    break
+        corrections = []
+        for _, form in sorted(scored):
+            if form != word and form not in corrections:
+                corrections.append(form)
+        return corrections[:MAX_CORRECTIONS]
+
+    def _fuzzy_match(self, name: str, corrections: List[str], limit: int) -> List[Dict[str, Any]]:
+        table = TABLES[name]
+        found: Dict[Any, Dict[str, Any]] = {}
+        for correction in corrections:
+            for row in self._match(name, correction, limit):
+                found.setdefault(row[table.key], row)
+        return sorted(found.values(), key=lambda row: str(row.get(table.sort) or ''), reverse=True)[:limit]
+
+    def _related_users(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not user_ids:
+            return {}
+        rows = self._connection().execute(
+            f"SELECT {', '.join(RELATED_USER_FIELDS)} FROM users WHERE uid IN ({', '.join('?' * len(user_ids))})",
+            user_ids
+        )
+        return {row[0]: dict(zip(RELATED_USER_FIELDS, row)) for row in rows}
+
+    def _recent_evaluations(self, user_id: str) -> List[Dict[str, Any]]:
+        fields = [field for field in TABLES['evaluations'].fields if field != 'user_id']
+        rows = self._connection().execute(
+            f"SELECT {', '.join(fields)} FROM evaluations WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?",
+            (user_id, RECENT_PER_USER)
+        )
+        return [dict(zip(fields, row)) for row in rows]
+
+    def _search(self, query: str, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        if self._connection().execute("SELECT 1 FROM dirty_users LIMIT 1").fetchone():
+            self._refresh_dirty_users()
+        results = {name: self._match(name, query, limit) for name in TABLES}
+        word = query.lower()
+        if len(word) >= MIN_FUZZY_LENGTH and WORD_RE.fullmatch(word) and not all(results.values()):
+            corrections = self._corrections(word)
+            for name, rows in results.items():
+                if not rows and corrections:
+                    results[name] = self._fuzzy_match(name, corrections, limit)
+
+        owners = self._related_users(list({e['user_id'] for e in results['evaluations'] if e.get('user_id')}))
+        return {
+            "users": [{**u, 'recent_evaluations': self._recent_evaluations(u['uid'])} for u in results['users']],
+            "evaluations": [{**e, 'user': owners.get(e.get('user_id'))} for e in results['evaluations']],
+            "feedback": results['feedback']
+        }
+
+    async def search(self, query: str, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Same result shape as services.admin_search.global_search, answered from the index."""
+        return await asyncio.to_thread(self._search, query, limit)
+
+_shared_index: Optional[AdminSearchIndex] = None
+
+def get_admin_search_index(supabase_client: 'Client') -> AdminSearchIndex:
+    """The process-wide handle on the host's index, shared by the routes that feed and query it."""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = AdminSearchIndex(supabase_client, SEARCH_INDEX_DB_PATH)
+        UserManagementService.change_listeners.append(_shared_index.mark_user_changed)
+    return _shared_index
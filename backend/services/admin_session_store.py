@@ -0,0 +1,175 @@
+"""
+Storage for admin sessions.
+
+InMemorySessionStore keeps sessions in the process, which is enough for a
+single worker. SQLiteSessionStore keeps them in a SQLite file (WAL mode) that
+every worker on the host opens, so a session created by one worker is valid in
+all of them and survives restarts. Either way a lookup is a single keyed read,
+and expired sessions are swept every `sweep_interval` seconds as well as
+rejected when they are read.
+
+Sessions are dicts with `authenticated`, `authenticated_at` and `expires_at`
+(datetimes). The SQLite store keys rows by a SHA-256 of the token, so the file
+never holds usable tokens.
+"""
+import abc
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_SWEEP_INTERVAL = 300
+
+class SessionStore(abc.ABC):
+    """Interface shared by the admin session stores."""
+
+    def __init__(self, sweep_interval: int = DEFAULT_SWEEP_INTERVAL):
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    @abc.abstractmethod
+    def put(self, token: str, session: Dict[str, Any]) -> None:
+        """Store (or replace) the session for a token."""
+
+    @abc.abstractmethod
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """The session for a token, or None if it is unknown or expired."""
+
+    @abc.abstractmethod
+    def delete(self, token: str) -> bool:
+        """Remove a token's session. Returns whether one existed."""
+
+    @abc.abstractmethod
+    def sweep(self) -> int:
+        """Remove expired sessions. Returns how many were removed."""
+
+    @abc.abstractmethod
+    def is_empty(self) -> bool:
+        """Whether no sessions are stored."""
+
+    def _maybe_sweep(self) -> None:
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + self.sweep_interval
+            removed = self.sweep()
+            if removed:
+                logger.info(f"🧹 Swept {removed} expired admin sessions")
+
+class InMemorySessionStore(SessionStore):
+    """Per-process sessions, capped at `max_sessions` (oldest are dropped first)."""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, sweep_interval: int = DEFAULT_SWEEP_INTERVAL):
+        super().__init__(sweep_interval)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def put(self, token: str, session: Dict[str, Any]) -> None:
+        self._maybe_sweep()
+        self._sessions[token] = session
+        self._sessions.move_to_end(token)
+        if len(self._sessions) > self.max_sessions:
+            self.sweep()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                logger.warning("Admin session limit reached; dropped the oldest session")
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        self._maybe_sweep()
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        if datetime.now() > session['expires_at']:
+            del self._sessions[token]
+            return None
+        return session
+
+    def delete(self, token: str) -> bool:
+        return self._sessions.pop(token, None) is not None
+
+    def sweep(self) -> int:
+        now = datetime.now()
+        expired = [token for token, session in self._sessions.items() if now > session['expires_at']]
+        for token in expired:
+            del self._sessions[token]
+        return len(expired)
+
+    def is_empty(self) -> bool:
+        return not self._sessions
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions shared by every process that opens the same SQLite file."""
+
+    def __init__(self, path: str, sweep_interval: int = DEFAULT_SWEEP_INTERVAL):
+        super().__init__(sweep_interval)
+        self.path = path
+        # sqlite3 connections must stay on the thread (and process) that opened them
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS admin_sessions ("
+                " token_hash TEXT PRIMARY KEY,"
+                " authenticated_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS admin_sessions_expires_at ON admin_sessions (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        # A preloaded app forks workers after import; never reuse the parent's connection
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def put(self, token: str, session: Dict[str, Any]) -> None:
+        self._maybe_sweep()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO admin_sessions (token_hash, authenticated_at, expires_at) VALUES (?, ?, ?)",
+                (self._key(token), session['authenticated_at'].timestamp(), session['expires_at'].timestamp())
+            )
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        self._maybe_sweep()
+        row = self._connection().execute(
+            "SELECT authenticated_at, expires_at FROM admin_sessions WHERE token_hash = ? AND expires_at > ?",
+            (self._key(token), time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'authenticated': True,
+            'authenticated_at': datetime.fromtimestamp(row[0]),
+            'expires_at': datetime.fromtimestamp(row[1])
+        }
+
+    def delete(self, token: str) -> bool:
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM admin_sessions WHERE token_hash = ?", (self._key(token),)).rowcount > 0
+
+    def sweep(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM admin_sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def is_empty(self) -> bool:
+        return self._connection().execute("SELECT 1 FROM admin_sessions LIMIT 1").fetchone() is None
+
+def create_session_store(backend: str, path: str, max_sessions: int = DEFAULT_MAX_SESSIONS) -> SessionStore:
+    """Build the configured store: 'sqlite' shares sessions through `path`, anything else stays in memory."""
+    if (backend or '').lower() == 'sqlite':
+        logger.info(f"Admin sessions stored in SQLite at {path}")
+        return SQLiteSessionStore(path)
+    return InMemorySessionStore(max_sessions=max_sessions)
@@ -0,0 +1,162 @@
+"""
+Data behind the admin user detail page.
+
+The user row, the latest evaluations and the user's analytics aggregate are
+fetched concurrently; the evaluation total comes from the aggregate
+(services/user_stats_service.py) when one exists instead of a COUNT over the
+user's history. The lookup is read-only, so viewing an unknown or
+never-aggregated user does not create a stats row.
+Grade stats and the activity timeline are derived in a single pass over the
+fetched evaluations.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from services.user_stats_service import UserStatsService
+from utils.grading import evaluation_percent
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+DETAIL_EVALUATION_FIELDS = (
+    'id, short_id, user_id, question_type, grade, percentage, reading_marks, writing_marks, ao1_marks, ao2_marks, '
+    'ao3_marks, content_structure_marks, style_accuracy_marks, student_response, improvement_suggestions, strengths, '
+    'next_steps, feedback, timestamp'
+)
+
+# Latest evaluations returned with the user
+DETAIL_EVALUATION_LIMIT = 100
+# Of those, how many recent ones can appear in the activity timeline
+TIMELINE_EVALUATION_LIMIT = 50
+TIMELINE_DAYS = 30
+
+PLAN_PRICES = {'unlimited': 4.99, 'basic': 9.99, 'premium': 19.99, 'pro': 39.99}
+
+def _grade_value(evaluation: Dict[str, Any]) -> Optional[float]:
+    """Percentage of an evaluation; bare numbers and 'NN%' grades count as percentages."""
+    percent = evaluation_percent(evaluation)
+    if percent is not None:
+        return percent
+    grade = evaluation.get('grade')
+    if isinstance(grade, (int, float)):
+        return float(grade)
+    try:
+        return float(str(grade).strip().rstrip('%')) if grade not in (None, '') else None
+    except ValueError:
+        return None
+
+def _grade_display(grade: Any) -> Any:
+    return f"{grade}%" if isinstance(grade, (int, float)) else grade
+
+def summarize_evaluations(evaluations: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Grade stats and timeline entries for evaluations ordered newest first, in one pass."""
+    cutoff = ((now or datetime.now()) - timedelta(days=TIMELINE_DAYS)).isoformat()
+    count, total = 0, 0.0
+    best = worst = None
+    timeline = []
+    for position, evaluation in enumerate(evaluations):
+        value = _grade_value(evaluation)
+        if value is not None:
+            count += 1
+            total += value
+            best = value if best is None or value > best else best
+            worst = value if worst is None or value < worst else worst
+        timestamp = evaluation.get('timestamp')
+        if position < TIMELINE_EVALUATION_LIMIT and timestamp and str(timestamp) >= cutoff:
+            timeline.append({
+                'type': 'evaluation',
+                'action': f'Completed {evaluation.get("question_type", "Unknown")} evaluation',
+                'details': f'Grade: {_grade_display(evaluation.get("grade", 0))} • ID: {evaluation.get("short_id", (evaluation.get("id") or "")[:8])}',
+                'timestamp': timestamp
+            })
+    return {
+        'avg_grade': total / count if count else 0,
+        'best_grade': best or 0,
+        'worst_grade': worst or 0,
+        'activity_timeline': timeline
+    }
+
+def _account_age_days(created_at: Optional[str], now: datetime) -> int:
+    if not created_at:
+        return 0
+    try:
+        created = datetime.fromisoformat(str(created_at).replace('Z', '+00:00'))
+        return (now - created.replace(tzinfo=None)).days
+    except ValueError as e:
+        logger.warning(f"Could not calculate account age: {e}")
+        return 0
+
+def _subscription_history(user: Dict[str, Any]) -> List[Dict[str, Any]]:
+    plan = user.get('current_plan')
+    if not plan or plan == 'free':
+        return []
+    return [{
+        'plan': plan,
+        'status': 'active',
+        'start_date': user.get('created_at', datetime.now().isoformat()),
+        'end_date': None,
+        'price': PLAN_PRICES.get(plan, 0),
+        'duration_months': 1
+    }]
+
+def _fetch_user(supabase: 'Client', user_id: str) -> Optional[Dict[str, Any]]:
+    result = supabase.table('assessment_users').select('*').eq('uid', user_id).limit(1).execute()
+    return result.data[0] if result.data else None
+
+def _fetch_evaluations(supabase: 'Client', user_id: str) -> List[Dict[str, Any]]:
+    return supabase.table('assessment_evaluations').select(DETAIL_EVALUATION_FIELDS) \
+        .eq('user_id', user_id).order('timestamp', desc=True).limit(DETAIL_EVALUATION_LIMIT).execute().data or []
+
+def _evaluation_total(supabase: 'Client', user_stats_service: UserStatsService, user_id: str) -> Optional[int]:
+    try:
+        stats = user_stats_service.peek_stats(user_id)
+        if stats is not None:
+            return int(stats.get('total_evaluations') or 0)
+    except Exception as e:
+        logger.warning(f"Analytics aggregate unavailable for {user_id}, counting evaluations: {e}")
+    try:
+        return supabase.table('assessment_evaluations').select('id', count='exact').eq('user_id', user_id).limit(1).execute().count
+    except Exception as e:
+        logger.error(f"Could not count evaluations for {user_id}: {e}")
+        return None
+
+async def load_user_detail(supabase: 'Client', user_stats_service: UserStatsService, user_id: str) -> Optional[Dict[str, Any]]:
+    """The enhanced user object for the admin detail view, or None if the user does not exist."""
+    user, evaluations, total = await asyncio.gather(
+        asyncio.to_thread(_fetch_user, supabase, user_id),
+        asyncio.to_thread(_fetch_evaluations, supabase, user_id),
+        asyncio.to_thread(_evaluation_total, supabase, user_stats_service, user_id),
+    )
+    if user is None:
+        return None
+
+    now = datetime.now()
+    # The aggregate can trail the evaluations just read; never report fewer than were fetched
+    total_evaluations = max(total or 0, len(evaluations))
+    summary = summarize_evaluations(evaluations, now)
+    timeline = summary['activity_timeline']
+    if user.get('created_at'):
+        timeline.append({
+            'type': 'registration',
+            'action': 'Account created',
+            'details': f'Joined with {user.get("current_plan", "free")} plan',
+            'timestamp': user['created_at']
+        })
+    timeline.sort(key=lambda entry: entry['timestamp'], reverse=True)
+
+    return {
+        **user,
+        'evaluations': evaluations,
+        'total_evaluations': total_evaluations,
+        'avg_grade': summary['avg_grade'],
+        'best_grade': summary['best_grade'],
+        'worst_grade': summary['worst_grade'],
+        'activity_timeline': timeline,
+        'subscription_history': _subscription_history(user),
+        'account_age_days': _account_age_days(user.get('created_at'), now),
+        'last_login': user.get('updated_at'),  # Use updated_at as proxy for last activity
+        'account_status': 'active' if total_evaluations > 0 else 'inactive'
+    }
@@ -0,0 +1,291 @@
+"""
+Partitioned Parquet snapshots of the assessment tables for offline analysis.
+
+Evaluations are written under evaluations/month=YYYY-MM/question_type=<type>/,
+feedback under feedback/month=YYYY-MM/ and users as a full copy under
+users/month=YYYY-MM/ (users change in place, so they are re-exported each
+run). A `_manifest.json` at the snapshot root records, per table, the files
+that belong to the snapshot and the (sort value, id) watermark of the last
+exported row; evaluation and feedback runs resume from it. Readers only trust
+files listed in the manifest, so a run interrupted before its manifest update
+leaves nothing half-visible.
+
+pyarrow ships in requirements.txt. It is still imported defensively, so a
+trimmed install without it just skips snapshots: the API only reads them when
+pyarrow is importable and ANALYTICS_SNAPSHOT_DIR points at one.
+"""
+import json
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import pandas as pd
+from services.rollup_service import SAFETY_LAG
+from utils.pagination import apply_keyset, build_page, encode_cursor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # snapshots are disabled without it
+    pa = pq = None
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '_manifest.json'
+
+# Rows buffered before a run writes its part files and advances the watermark
+ROWS_PER_FLUSH = 100_000
+FETCH_PAGE_SIZE = 1000
+
+@dataclass(frozen=True)
+class SnapshotTable:
+    table: str
+    sort_column: str
+    id_column: str
+    # column -> 'string' | 'float' | 'int' | 'bool'
+    columns: Dict[str, str]
+    by_question_type: bool = False
+    incremental: bool = True
+
+MARK_TEXT_COLUMNS = ('reading_marks', 'writing_marks', 'ao1_marks', 'ao2_marks', 'ao3_marks',
+                     'content_structure_marks', 'style_accuracy_marks')
+
+SNAPSHOT_TABLES: Dict[str, SnapshotTable] = {
+    'evaluations': SnapshotTable(
+        'assessment_evaluations', 'timestamp', 'id',
+        {'id': 'string', 'short_id': 'string', 'user_id': 'string', 'question_type': 'string', 'grade': 'string',
+         'score': 'float', 'max_score': 'float', 'percentage': 'float',
+         **{column: 'string' for column in MARK_TEXT_COLUMNS}, 'timestamp': 'string'},
+        by_question_type=True
+    ),
+    'feedback': SnapshotTable(
+        'assessment_feedback', 'created_at', 'id',
+        {'id': 'string', 'evaluation_id': 'string', 'user_id': 'string', 'category': 'string',
+         'accurate': 'bool', 'comments': 'string', 'created_at': 'string'}
+    ),
+    'users': SnapshotTable(
+        'assessment_users', 'created_at', 'uid',
+        {'uid': 'string', 'email': 'string', 'display_name': 'string', 'current_plan': 'string',
+         'academic_level': 'string', 'credits': 'int', 'questions_marked': 'int',
+         'created_at': 'string', 'updated_at': 'string'},
+        incremental=False
+    ),
+}
+
+def parquet_available() -> bool:
+    return pq is not None
+
+def _require_pyarrow() -> None:
+    if pq is None:
+        raise RuntimeError("pyarrow is not installed - pip install pyarrow to use analytics snapshots")
+
+def _schema(spec: SnapshotTable):
+    types = {'string': pa.string(), 'float': pa.float64(), 'int': pa.int64(), 'bool': pa.bool_()}
+    return pa.schema([(column, types[kind]) for column, kind in spec.columns.items()])
+
+def _safe_segment(value: Any) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', str(value or '')) or 'unknown'
+
+def _month(value: Any) -> str:
+    text = str(value or '')
+    return text[:7] if re.match(r'\d{4}-\d{2}', text) else 'unknown'
+
+def _coerce(value: Any, kind: str) -> Any:
+    if value is None or value == '':
+        return None
+    try:
+        if kind == 'float':
+            return float(value)
+        if kind == 'int':
+            return int(value)
+        if kind == 'bool':
+            return bool(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+class AnalyticsSnapshot:
+    """Writes and reads the Parquet snapshot rooted at one directory."""
+
+    def __init__(self, directory: str):
+        self.root = Path(directory)
+
+    # --- manifest ---
+
+    def manifest(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.root / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f"{MANIFEST_NAME}.tmp"
+        staging.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(staging, self.root / MANIFEST_NAME)
+
+    def watermark(self, name: str) -> Optional[Tuple[str, str]]:
+        entry = self.manifest().get(name) or {}
+        mark = entry.get('watermark')
+        return tuple(mark) if mark else None
+
+    # --- export ---
+
+    def _write_parts(self, name: str, spec: SnapshotTable, rows: List[Dict[str, Any]], run_id: str, sequence: int) -> List[str]:
+        partitions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            path = f"{name}/month={_month(row.get(spec.sort_column))}"
+            if spec.by_question_type:
+                path += f"/question_type={_safe_segment(row.get('question_type'))}"
+            partitions[path].append(row)
+
+        schema = _schema(spec)
+        written = []
+        for path, part_rows in partitions.items():
+            directory = self.root / path
+            directory.mkdir(parents=True, exist_ok=True)
+            arrays = {column: [_coerce(row.get(column), kind) for row in part_rows] for column, kind in spec.columns.items()}
+            filename = f"{path}/part-{run_id}-{sequence:04d}.parquet"
+            pq.write_table(pa.table(arrays, schema=schema), self.root / filename, compression='zstd')
+            written.append(filename)
+        return written
+
+    def export_table(self, supabase: 'Client', name: str, page_size: int = FETCH_PAGE_SIZE) -> int:
+        """Export rows added since the watermark (every row for full-copy tables). Returns rows written."""
+        _require_pyarrow()
+        spec = SNAPSHOT_TABLES[name]
+        run_id = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        manifest = self.manifest()
+        previous = manifest.get(name) or {}
+        files: List[str] = list(previous.get('files', [])) if spec.incremental else []
+        mark = previous.get('watermark') if spec.incremental else None
+        cursor = encode_cursor(*mark) if mark else None
+        # Rows this recent may still be joined by slower concurrent inserts
+        cutoff = (datetime.utcnow() - SAFETY_LAG).isoformat()
+
+        total, sequence, buffer = 0, 0, []
+
+        def flush() -> None:
+            nonlocal sequence, buffer, manifest
+            if not buffer:
+                return
+            files.extend(self._write_parts(name, spec, buffer, run_id, sequence))
+            last = buffer[-1]
+            sequence, buffer = sequence + 1, []
+            if spec.incremental:
+                # Incremental runs commit as they go, so an interrupted run resumes here
+                manifest = self.manifest()
+                manifest[name] = {
+                    'files': files, 'rows': previous.get('rows', 0) + total,
+                    'watermark': [last[spec.sort_column], last[spec.id_column]],
+                    'updated_at': datetime.utcnow().isoformat()
+                }
+                self._save_manifest(manifest)
+
+        while True:
+            query = supabase.table(spec.table).select(', '.join(spec.columns)).lt(spec.sort_column, cutoff)
+            query = apply_keyset(query, spec.sort_column, spec.id_column, cursor, desc=False, limit=page_size)
+            rows, cursor = build_page(query.execute().data, page_size, spec.sort_column, spec.id_column)
+            buffer.extend(rows)
+            total += len(rows)
+            if len(buffer) >= ROWS_PER_FLUSH:
+                flush()
+            if not cursor:
+                break
+        flush()
+
+        if not spec.incremental:
+            manifest = self.manifest()
+            stale = (manifest.get(name) or {}).get('files', [])
+            manifest[name] = {'files': files, 'rows': total, 'watermark': None, 'updated_at': datetime.utcnow().isoformat()}
+            self._save_manifest(manifest)
+            self._remove(stale)
+        return total
+
+    def _remove(self, files: List[str]) -> None:
+        for filename in files:
+            try:
+                (self.root / filename).unlink()
+            except FileNotFoundError:
+                pass
+
+    def prune_unlisted(self) -> int:
+        """Delete part files no manifest entry refers to (left by interrupted runs). Returns files removed."""
+        listed = {filename for entry in self.manifest().values() for filename in (entry or {}).get('files', [])}
+        removed = 0
+        for path in self.root.glob('*/**/*.parquet'):
+            if path.relative_to(self.root).as_posix() not in listed:
+                path.unlink()
+                removed += 1
+        for directory in sorted(self.root.glob('*/**/'), reverse=True):
+            if directory != self.root and not any(directory.iterdir()):
+                directory.rmdir()
+        return removed
+
+    # --- read ---
+
+    def read(self, name: str, columns: Optional[List[str]] = None,
+             since: Optional[str] = None, until: Optional[str] = None) -> pd.DataFrame:
+        """Rows of a snapshot table as a DataFrame, optionally limited to [since, until) on its sort column.
+
+        Whole month partitions outside the range are skipped without being opened.
+        """
+        _require_pyarrow()
+        spec = SNAPSHOT_TABLES[name]
+        wanted = [column for column in (columns or spec.columns) if column in spec.columns]
+        files = (self.manifest().get(name) or {}).get('files', [])
+        low, high = (since or '')[:7], (until or '')[:7]
+        selected = []
+        for filename in files:
+            month = re.search(r'month=([^/]+)', filename).group(1)
+            if (low and month != 'unknown' and month < low) or (high and month != 'unknown' and month > high):
+                continue
+            selected.append(str(self.root / filename))
+        if not selected:
+            return pd.DataFrame(columns=columns or wanted)
+
+        # Partition directories only route reads; every column, question_type included, is stored in the files
+        frame = pa.concat_tables([pq.read_table(path, columns=wanted, partitioning=None) for path in selected]).to_pandas()
+        if since:
+            frame = frame[frame[spec.sort_column] >= since]
+        if until:
+            frame = frame[frame[spec.sort_column] < until]
+        # Columns the snapshot does not carry come back empty, like missing keys in API rows
+        return frame.reindex(columns=columns or wanted).reset_index(drop=True)
+
+def load_evaluation_history(supabase: 'Client', directory: str, columns: List[str]) -> Optional[pd.DataFrame]:
+    """Every evaluation as a frame: snapshot rows up to its watermark plus live rows after it.
+
+    Returns None when no usable snapshot exists, so callers fall back to the database.
+    """
+    if not directory or pq is None:
+        return None
+    snapshot = AnalyticsSnapshot(directory)
+    mark = snapshot.watermark('evaluations')
+    if not mark:
+        return None
+    started = time.monotonic()
+    spec = SNAPSHOT_TABLES['evaluations']
+    history = snapshot.read('evaluations', columns)
+
+    tail: List[Dict[str, Any]] = []
+    cursor = encode_cursor(*mark)
+    while True:
+        query = supabase.table(spec.table).select(', '.join(columns))
+        query = apply_keyset(query, spec.sort_column, spec.id_column, cursor, desc=False, limit=FETCH_PAGE_SIZE)
+        rows, cursor = build_page(query.execute().data, FETCH_PAGE_SIZE, spec.sort_column, spec.id_column)
+        tail.extend(rows)
+        if not cursor:
+            break
+    logger.info(f"📦 Loaded {len(history)} snapshot + {len(tail)} live evaluations in {time.monotonic() - started:.2f}s")
+    if not tail:
+        return history
+    return pd.concat([history, pd.DataFrame.from_records(tail, columns=columns)], ignore_index=True)
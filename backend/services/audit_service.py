@@ -0,0 +1,132 @@
+"""
+Append-only audit store for evaluation prompts and raw AI responses.
+
+The full prompt sent to the model is mostly static marking criteria, so it is
+split at the student response: the static prefix is stored once per content
+hash in `assessment_prompt_prefixes`, and each evaluation only stores its
+compressed suffix and response in `assessment_evaluation_audit`.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+try:
+    import zstandard
+except ImportError:  # optional dependency; gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Everything before this marker in the evaluation prompt is criteria text that
+# repeats across submissions of the same question type.
+PROMPT_SPLIT_MARKER = "Student Response: "
+
+AUDIT_TABLE = 'assessment_evaluation_audit'
+PREFIX_TABLE = 'assessment_prompt_prefixes'
+
+def _compress(data: bytes) -> Dict[str, str]:
+    """Compress bytes with zstd when installed, gzip otherwise, as base64 text."""
+    if zstandard is not None:
+        codec, packed = "zstd", zstandard.ZstdCompressor(level=10).compress(data)
+    else:
+        codec, packed = "gzip", gzip.compress(data, compresslevel=9)
+    return {"codec": codec, "body": base64.b64encode(packed).decode("ascii")}
+
+def _decompress(codec: str, body: str) -> bytes:
+    """Inverse of _compress."""
+    packed = base64.b64decode(body)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this audit record")
+        return zstandard.ZstdDecompressor().decompress(packed)
+    if codec == "gzip":
+        return gzip.decompress(packed)
+    raise ValueError(f"Unknown audit codec: {codec}")
+
+def split_prompt(prompt: str) -> tuple[str, str]:
+    """Split a prompt into (static prefix, per-submission suffix)."""
+    index = prompt.find(PROMPT_SPLIT_MARKER)
+    if index < 0:
+        return "", prompt
+    return prompt[:index], prompt[index:]
+
+def prefix_hash(prefix: str) -> str:
+    """Content hash used to deduplicate prompt prefixes."""
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+class EvaluationAuditStore:
+    """Writes and lazily reads evaluation full_chat payloads outside assessment_evaluations."""
+
+    def __init__(self, supabase_client: 'Client'):
+        self.supabase = supabase_client
+        # Prefix hashes already known to exist, to skip redundant upserts
+        self._known_prefixes: Set[str] = set()
+
+    def _ensure_prefix(self, prefix: str) -> Optional[str]:
+        if not prefix:
+            return None
+        digest = prefix_hash(prefix)
+        if digest in self._known_prefixes:
+            return digest
+        packed = _compress(prefix.encode("utf-8"))
+        self.supabase.table(PREFIX_TABLE).upsert({
+            "hash": digest,
+            "codec": packed["codec"],
+            "body": packed["body"],
+            "created_at": datetime.utcnow().isoformat()
+        }, on_conflict="hash", ignore_duplicates=True).execute()
+        self._known_prefixes.add(digest)
+        return digest
+
+    def record(self, evaluation_id: str, prompt: str, response: str, timestamp: Optional[str] = None) -> bool:
+        """Append the audit record for an evaluation. Failures are logged, never raised."""
+        if not self.supabase:
+            return False
+        try:
+            prefix, suffix = split_prompt(prompt or "")
+            digest = self._ensure_prefix(prefix)
+            payload = json.dumps({
+                "prompt_suffix": suffix,
+                "response": response,
+                "timestamp": timestamp or datetime.now().isoformat()
+            }).encode("utf-8")
+            packed = _compress(payload)
+            self.supabase.table(AUDIT_TABLE).insert({
+                "evaluation_id": evaluation_id,
+                "prefix_hash": digest,
+                "codec": packed["codec"],
+                "payload": packed["body"],
+                "created_at": datetime.utcnow().isoformat()
+            }).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to record evaluation audit for {evaluation_id}: {str(e)}")
+            return False
+
+    def load(self, evaluation_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild the {prompt, response, timestamp} payload for an evaluation, or None."""
+        if not self.supabase:
+            return None
+        result = self.supabase.table(AUDIT_TABLE).select('prefix_hash, codec, payload').eq('evaluation_id', evaluation_id).limit(1).execute()
+        if not result.data:
+            return None
+        record = result.data[0]
+        data = json.loads(_decompress(record['codec'], record['payload']))
+        prefix = ""
+        if record.get('prefix_hash'):
+            prefix_result = self.supabase.table(PREFIX_TABLE).select('codec, body').eq('hash', record['prefix_hash']).limit(1).execute()
+            if prefix_result.data:
+                prefix_row = prefix_result.data[0]
+                prefix = _decompress(prefix_row['codec'], prefix_row['body']).decode("utf-8")
+        return {
+            "prompt": prefix + data.get("prompt_suffix", ""),
+            "response": data.get("response"),
+            "timestamp": data.get("timestamp")
+        }
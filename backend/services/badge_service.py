@@ -0,0 +1,123 @@
+"""
+Badge definitions and the incremental badge engine.
+
+Badge progress is read from the per-user analytics aggregate
+(services/user_stats_service.py), so checking badges after an evaluation costs
+one query for the earned set and at most one bulk insert.
+"""
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Set
+from utils.activity import ActivityBitmap
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+BADGE_DEFINITIONS = [
+    # Streak badges
+    {"type": "streak", "name": "3-Day Streak", "description": "Submit for 3 consecutive days", "icon": "🔥", "requirement": 3},
+    {"type": "streak", "name": "7-Day Streak", "description": "Submit for 7 consecutive days", "icon": "🏆", "requirement": 7},
+    {"type": "streak", "name": "30-Day Streak", "description": "Submit for 30 consecutive days", "icon": "💎", "requirement": 30},
+    
+    # Volume badges
+    {"type": "volume", "name": "10 Essay Milestone", "description": "Submit 10 essays", "icon": "📝", "requirement": 10},
+    {"type": "volume", "name": "25 Essay Milestone", "description": "Submit 25 essays", "icon": "📚", "requirement": 25},
+    {"type": "volume", "name": "50 Essay Milestone", "description": "Submit 50 essays", "icon": "🎯", "requirement": 50},
+    
+    # Word count badges
+    {"type": "words", "name": "10K Word Club", "description": "Write 10,000 words total", "icon": "✍️", "requirement": 10000},
+    {"type": "words", "name": "25K Word Club", "description": "Write 25,000 words total", "icon": "📖", "requirement": 25000},
+    
+    # Improvement badges
+    {"type": "improvement", "name": "Band Booster", "description": "Improve by 2 bands", "icon": "⬆️", "requirement": 2},
+    {"type": "improvement", "name": "Perseverance Award", "description": "Submit 5 times on same question type", "icon": "💪", "requirement": 5},
+    
+    # Exploration badges
+    {"type": "exploration", "name": "Paper Explorer", "description": "Try 5 different question types", "icon": "🗺️", "requirement": 5},
+    {"type": "exploration", "name": "IGCSE Specialist", "description": "Complete 10 IGCSE questions", "icon": "🎓", "requirement": 10},
+    {"type": "exploration", "name": "A-Level Expert", "description": "Complete 10 A-Level questions", "icon": "🏅", "requirement": 10}
+]
+
+def _current_streak(stats: Dict[str, Any]) -> int:
+    return ActivityBitmap.from_record(stats.get("activity_start"), stats.get("activity_bits")).current_streak()
+
+def _total_evaluations(stats: Dict[str, Any]) -> int:
+    return stats.get("total_evaluations") or 0
+
+def _total_words(stats: Dict[str, Any]) -> int:
+    return stats.get("total_words") or 0
+
+def _type_count_with_prefix(stats: Dict[str, Any], prefix: str) -> int:
+    return sum(count for qtype, count in (stats.get("type_counts") or {}).items() if qtype.startswith(prefix))
+
+# Progress for each badge, computed from the aggregate row
+BADGE_PROGRESS: Dict[str, Callable[[Dict[str, Any]], int]] = {
+    "3-Day Streak": _current_streak,
+    "7-Day Streak": _current_streak,
+    "30-Day Streak": _current_streak,
+    "10 Essay Milestone": _total_evaluations,
+    "25 Essay Milestone": _total_evaluations,
+    "50 Essay Milestone": _total_evaluations,
+    "10K Word Club": _total_words,
+    "25K Word Club": _total_words,
+    "Band Booster": lambda stats: stats.get("grade_improvements") or 0,
+    "Perseverance Award": lambda stats: max((stats.get("type_counts") or {}).values(), default=0),
+    "Paper Explorer": lambda stats: len(stats.get("type_counts") or {}),
+    "IGCSE Specialist": lambda stats: _type_count_with_prefix(stats, "igcse"),
+    "A-Level Expert": lambda stats: _type_count_with_prefix(stats, "alevel"),
+}
+
+class BadgeEngine:
+    """Awards badges from a user's aggregate with one read and one bulk insert."""
+
+    def __init__(self, supabase_client: 'Client'):
+        self.supabase = supabase_client
+
+    def earned_badge_names(self, user_id: str) -> Set[str]:
+        """Names of the badges a user already holds."""
+        result = self.supabase.table('assessment_badges').select('badge_name').eq('user_id', user_id).execute()
+        return {row['badge_name'] for row in result.data or []}
+
+    def award(self, user_id: str, stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Insert every newly earned badge for the user and return them."""
+        earned = self.earned_badge_names(user_id)
+        cache: Dict[Callable, int] = {}
+        awarded_badges = []
+        for badge_def in BADGE_DEFINITIONS:
+            if badge_def["name"] in earned:
+                continue
+            progress_fn = BADGE_PROGRESS[badge_def["name"]]
+            # Badges of the same kind share one progress function; compute it once
+            if progress_fn not in cache:
+                cache[progress_fn] = progress_fn(stats)
+            progress = cache[progress_fn]
+            if progress >= badge_def["requirement"]:
+                awarded_badges.append({
+                    "user_id": user_id,
+                    "badge_type": badge_def["type"],
+                    "badge_name": badge_def["name"],
+                    "badge_description": badge_def["description"],
+                    "badge_icon": badge_def["icon"],
+                    "progress": progress,
+                    "requirement": badge_def["requirement"],
+                    "earned_at": datetime.utcnow().isoformat()
+                })
+        if awarded_badges:
+            self.supabase.table('assessment_badges').upsert(
+                awarded_badges, on_conflict="user_id,badge_name", ignore_duplicates=True
+            ).execute()
+            logger.info(f"🏆 Awarded {len(awarded_badges)} badges to {user_id}")
+        return awarded_badges
+
+    def process_evaluation(self, stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run after an evaluation is folded into `stats`. Failures are logged, never raised."""
+        user_id = (stats or {}).get("user_id")
+        if not self.supabase or not user_id:
+            return []
+        try:
+            return self.award(user_id, stats)
+        except Exception as e:
+            logger.error(f"Badge processing failed for {user_id}: {str(e)}")
+            return []
@@ -0,0 +1,75 @@
+"""
+Thin client for the admin dashboard aggregate functions.
+
+Each method calls one SQL function from migrations/006_dashboard_aggregate_functions.sql
+(or 009_dashboard_rollup_batches.sql) and returns its few rows, so counting and summing happen in Postgres instead of
+over whole columns transferred to the API.
+"""
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+BUCKET_UNITS = {"hour", "day", "week", "month"}
+
+class DashboardAggregates:
+    """Typed wrappers around the dashboard aggregate RPCs."""
+
+    def __init__(self, supabase_client: 'Client'):
+        self.supabase = supabase_client
+
+    def _single_row(self, function: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        data = self.supabase.rpc(function, params or {}).execute().data
+        if isinstance(data, list):
+            return data[0] if data else {}
+        return data or {}
+
+    def user_totals(self) -> Dict[str, int]:
+        """{total_users, total_credits, active_today}."""
+        row = self._single_row('admin_user_totals')
+        return {
+            "total_users": int(row.get('total_users') or 0),
+            "total_credits": int(row.get('total_credits') or 0),
+            "active_today": int(row.get('active_today') or 0)
+        }
+
+    def plan_counts(self) -> List[Dict[str, Any]]:
+        """[{plan, count}], largest plan first."""
+        rows = self.supabase.rpc('admin_plan_counts', {}).execute().data or []
+        return [{"plan": row['plan'], "count": int(row['count'])} for row in rows]
+
+    def evaluation_totals(self, since: Optional[datetime] = None) -> Dict[str, Any]:
+        """{evaluations, distinct_users, graded, average_grade} over evaluations since a time (all when None)."""
+        row = self._single_row('admin_evaluation_totals', {"since": since.isoformat() if since else None})
+        return {
+            "evaluations": int(row.get('evaluations') or 0),
+            "distinct_users": int(row.get('distinct_users') or 0),
+            "graded": int(row.get('graded') or 0),
+            "average_grade": float(row.get('average_grade') or 0)
+        }
+
+    def grade_distribution(self) -> List[Dict[str, Any]]:
+        """[{grade_range, count}] in rollup_service.GRADE_BUCKETS order."""
+        rows = self.supabase.rpc('admin_grade_distribution', {}).execute().data or []
+        return [{"grade_range": row['grade_range'], "count": int(row['count'])} for row in rows]
+
+    def question_type_stats(self) -> List[Dict[str, Any]]:
+        """[{question_type, count, average_grade}], most used first."""
+        rows = self.supabase.rpc('admin_question_type_stats', {}).execute().data or []
+        return [{
+            "question_type": row['question_type'],
+            "count": int(row['count']),
+            "average_grade": float(row.get('average_grade') or 0)
+        } for row in rows]
+
+    def evaluation_buckets(self, bucket: str, since: datetime) -> List[Dict[str, Any]]:
+        """[{bucket_start, evaluations, distinct_users}] per date_trunc bucket since a time."""
+        if bucket not in BUCKET_UNITS:
+            raise ValueError(f"Unsupported bucket: {bucket}")
+        rows = self.supabase.rpc('admin_evaluation_buckets', {"bucket": bucket, "since": since.isoformat()}).execute().data or []
+        return [{
+            "bucket_start": row['bucket_start'],
+            "evaluations": int(row['evaluations']),
+            "distinct_users": int(row['distinct_users'])
+        } for row in rows]
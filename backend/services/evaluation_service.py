@@ -114,10 +114,7 @@ class EvaluationService:
     
     def build_evaluation_prompt(self, submission: SubmissionRequest) -> str:
         """Build the complete evaluation prompt."""
-        logger.info(f"🔧 Building evaluation prompt for submission:")
-        logger.info(f"🔧 Submission data: {submission}")
-        logger.info(f"🔧 Submission type: {type(submission)}")
-        logger.info(f"🔧 Submission attributes: {dir(submission)}")
+        logger.debug("🔧 Building evaluation prompt for submission: %s", submission)
         
         # Get marking criteria
         marking_criteria = self.marking_criteria.get(submission.question_type, "")
@@ -126,18 +123,18 @@ class EvaluationService:
             logger.error(f"❌ Available question types: {list(self.marking_criteria.keys())}")
             raise ValueError(f"Invalid question type: {submission.question_type}")
         
-        logger.info(f"📋 Base marking criteria loaded for: {submission.question_type}")
+        logger.debug("📋 Base marking criteria loaded for: %s", submission.question_type)
         
         # For IGCSE directed writing, combine general criteria with text-type-specific criteria
         if submission.question_type == 'igcse_directed':
-            logger.info(f"🎯 IGCSE Directed detected - text_type: {submission.text_type}")
+            logger.debug("🎯 IGCSE Directed detected - text_type: %s", submission.text_type)
             if submission.text_type:
                 text_type_key = f"igcse_directed_{submission.text_type}"
-                logger.info(f"🔍 Looking for text-type criteria with key: {text_type_key}")
+                logger.debug("🔍 Looking for text-type criteria with key: %s", text_type_key)
                 text_type_criteria = self.marking_criteria.get(text_type_key, "")
                 if text_type_criteria:
-                    logger.info(f"✅ Text-type criteria found and added: {text_type_key}")
-                    logger.info(f"📏 Combined criteria length: {len(marking_criteria)} + {len(text_type_criteria)} = {len(marking_criteria) + len(text_type_criteria)}")
+                    logger.debug("✅ Text-type criteria found and added: %s", text_type_key)
+                    logger.debug("📏 Combined criteria length: %s + %s = %s", len(marking_criteria), len(text_type_criteria), len(marking_criteria) + len(text_type_criteria))
                     marking_criteria = f"{marking_criteria}\n\n{text_type_criteria}"
                 else:
                     logger.warning(f"⚠️ No text-type criteria found for key: {text_type_key}")
@@ -148,14 +145,14 @@ class EvaluationService:
         
         # For IGCSE Extended Q3, combine general criteria with text-type-specific criteria
         if submission.question_type == 'igcse_extended_q3':
-            logger.info(f"🎯 IGCSE Extended Q3 detected - text_type: {submission.text_type}")
+            logger.debug("🎯 IGCSE Extended Q3 detected - text_type: %s", submission.text_type)
             if submission.text_type:
                 text_type_key = f"igcse_extended_q3_{submission.text_type}"
-                logger.info(f"🔍 Looking for text-type criteria with key: {text_type_key}")
+                logger.debug("🔍 Looking for text-type criteria with key: %s", text_type_key)
                 text_type_criteria = self.marking_criteria.get(text_type_key, "")
                 if text_type_criteria:
-                    logger.info(f"✅ Text-type criteria found and added: {text_type_key}")
-                    logger.info(f"📏 Combined criteria length: {len(marking_criteria)} + {len(text_type_criteria)} = {len(marking_criteria) + len(text_type_criteria)}")
+                    logger.debug("✅ Text-type criteria found and added: %s", text_type_key)
+                    logger.debug("📏 Combined criteria length: %s + %s = %s", len(marking_criteria), len(text_type_criteria), len(marking_criteria) + len(text_type_criteria))
                     marking_criteria = f"{marking_criteria}\n\n{text_type_criteria}"
                 else:
                     logger.warning(f"⚠️ No text-type criteria found for key: {text_type_key}")
@@ -166,14 +163,14 @@ class EvaluationService:
         
         # For A-Level directed writing, combine general criteria with text-type-specific criteria
         if submission.question_type == 'alevel_directed':
-            logger.info(f"🎯 A-Level Directed detected - text_type: {submission.text_type}")
+            logger.debug("🎯 A-Level Directed detected - text_type: %s", submission.text_type)
             if submission.text_type:
                 text_type_key = f"alevel_directed_{submission.text_type}"
-                logger.info(f"🔍 Looking for text-type criteria with key: {text_type_key}")
+                logger.debug("🔍 Looking for text-type criteria with key: %s", text_type_key)
                 text_type_criteria = self.marking_criteria.get(text_type_key, "")
                 if text_type_criteria:
-                    logger.info(f"✅ Text-type criteria found and added: {text_type_key}")
-                    logger.info(f"📏 Combined criteria length: {len(marking_criteria)} + {len(text_type_criteria)} = {len(marking_criteria) + len(text_type_criteria)}")
+                    logger.debug("✅ Text-type criteria found and added: %s", text_type_key)
+                    logger.debug("📏 Combined criteria length: %s + %s = %s", len(marking_criteria), len(text_type_criteria), len(marking_criteria) + len(text_type_criteria))
                     marking_criteria = f"{marking_criteria}\n\n{text_type_criteria}"
                 else:
                     logger.warning(f"⚠️ No text-type criteria found for key: {text_type_key}")
@@ -371,13 +368,13 @@ Student Response: {sanitized_response}
         start_time = time.time()
         
         try:
-            logger.info(f"🔧 Starting evaluation for submission:")
-            logger.info(f"🔧 Question Type: {submission.question_type}")
-            logger.info(f"🔧 Text Type: {submission.text_type}")
-            logger.info(f"🔧 Command Word: {submission.command_word}")
-            logger.info(f"🔧 Has Marking Scheme: {bool(submission.marking_scheme)}")
-            logger.info(f"🔧 User ID: {submission.user_id}")
-            logger.info(f"🔧 Response Length: {len(submission.student_response)} chars")
+            logger.debug("🔧 Starting evaluation for submission:")
+            logger.debug("🔧 Question Type: %s", submission.question_type)
+            logger.debug("🔧 Text Type: %s", submission.text_type)
+            logger.debug("🔧 Command Word: %s", submission.command_word)
+            logger.debug("🔧 Has Marking Scheme: %s", bool(submission.marking_scheme))
+            logger.debug("🔧 User ID: %s", submission.user_id)
+            logger.debug("🔧 Response Length: %s chars", len(submission.student_response))
             
             # Validate question type
             if submission.question_type not in self.marking_criteria:
@@ -398,17 +395,17 @@ Student Response: {sanitized_response}
             full_prompt = self.build_evaluation_prompt(submission)
             prompt_time = time.time() - prompt_start
             
-            logger.debug(f"Prompt building took {prompt_time:.2f}s, length: {len(full_prompt)}")
+            logger.debug("Prompt building took %.2fs, length: %d", prompt_time, len(full_prompt))
             
             # Call AI API with structured outputs
             ai_start = time.time()
-            logger.info(f"🚀 PERFORMANCE: Starting AI API call with structured outputs...")
-            logger.info(f"🚀 PERFORMANCE: Prompt length: {len(full_prompt)} characters")
+            logger.debug("🚀 PERFORMANCE: Starting AI API call with structured outputs...")
+            logger.debug("🚀 PERFORMANCE: Prompt length: %s characters", len(full_prompt))
             ai_response, _ = await call_deepseek_api(full_prompt, submission.question_type)
             ai_time = time.time() - ai_start
             
-            logger.info(f"🚀 PERFORMANCE: AI API call completed in {ai_time:.2f}s")
-            logger.info(f"🚀 PERFORMANCE: Response length: {len(ai_response)} characters")
+            logger.debug("🚀 PERFORMANCE: AI API call completed in %.2fs", ai_time)
+            logger.debug("🚀 PERFORMANCE: Response length: %s characters", len(ai_response))
             
             # Log slow AI calls
             if ai_time > 15:
@@ -426,10 +423,10 @@ Student Response: {sanitized_response}
             # Parse AI response using structured outputs (MUST be perfect)
             parse_start = time.time()
             parsed_data = self.parse_structured_response(ai_response, submission.question_type)
-            logger.info("✅ Successfully parsed structured JSON response")
+            logger.debug("✅ Successfully parsed structured JSON response")
             parse_time = time.time() - parse_start
             
-            logger.debug(f"Response parsing took {parse_time:.2f}s")
+            logger.debug("Response parsing took %.2fs", parse_time)
             
             # Compute dynamic overall grade
             grade_start = time.time()
@@ -475,7 +472,7 @@ Student Response: {sanitized_response}
             feedback_response.short_id = short_id
             
             total_time = time.time() - start_time
-            logger.info(f"Evaluation completed in {total_time:.2f}s (prompt: {prompt_time:.2f}s, AI: {ai_time:.2f}s, parse: {parse_time:.2f}s, grade: {grade_time:.2f}s)")
+            logger.info("Evaluation completed in %.2fs (prompt: %.2fs, AI: %.2fs, parse: %.2fs, grade: %.2fs)", total_time, prompt_time, ai_time, parse_time, grade_time)
             
             # Log performance warnings
             if total_time > 30:
@@ -0,0 +1,63 @@
+"""
+Canned model responses for LLM_PROVIDER=fake.
+
+Used for load tests and local runs without provider keys: each call waits
+FAKE_LLM_LATENCY_MS (without blocking the event loop), then spends
+FAKE_LLM_CPU_MS of CPU standing in for parsing a real response, and returns
+text in the same shape the evaluation parser expects from the real model.
+"""
+import asyncio
+import json
+import time
+from typing import Optional
+from config.settings import FAKE_LLM_LATENCY_MS, FAKE_LLM_CPU_MS
+
+FAKE_MARKS = {
+    "reading_marks": "12/15",
+    "writing_marks": "20/25",
+    "ao1_marks": "4/5",
+    "ao2_marks": "10/15",
+    "ao3_marks": "8/10",
+    "ao4_marks": "4/5",
+    "ao5_marks": "11/15",
+    "content_structure_marks": "12/16",
+    "style_accuracy_marks": "18/24",
+}
+
+FAKE_TEXT_RESPONSE = (
+    "FEEDBACK: • Clear line of argument with relevant supporting detail.\n"
+    "• Paragraphing is mostly effective.\n"
+    "GRADE: 32/40\n"
+    "READING_MARKS: 12/15\n"
+    "WRITING_MARKS: 20/25\n"
+    "AO1_MARKS: 4/5\n"
+    "AO2_MARKS: 10/15\n"
+    "AO3_MARKS: 8/10\n"
+    "IMPROVEMENTS: Vary sentence openings | Develop the conclusion | Quote more precisely\n"
+    "STRENGTHS: Confident tone | Relevant examples | Accurate spelling\n"
+    "NEXT STEPS: Practise timed plans | Review complex punctuation | Read model answers"
+)
+
+def _burn_cpu(milliseconds: int) -> None:
+    deadline = time.perf_counter() + milliseconds / 1000
+    while time.perf_counter() < deadline:
+        json.dumps(FAKE_MARKS)
+
+def _structured_response(schema: dict) -> str:
+    properties = schema.get("properties", {})
+    response = {
+        "feedback": "• Clear line of argument with relevant supporting detail.",
+        "grade": "32/40",
+        "improvements": ["Vary sentence openings", "Develop the conclusion", "Quote more precisely"],
+        "strengths": ["Confident tone", "Relevant examples", "Accurate spelling"],
+        "next_steps": ["Practise timed plans", "Review complex punctuation", "Read model answers"],
+    }
+    response.update({field: FAKE_MARKS[field] for field in properties if field in FAKE_MARKS})
+    return json.dumps(response)
+
+async def fake_completion(prompt: str, schema: Optional[dict] = None) -> str:
+    """A canned evaluation: JSON matching `schema` when one is given, marked-up text otherwise."""
+    await asyncio.sleep(FAKE_LLM_LATENCY_MS / 1000)
+    if FAKE_LLM_CPU_MS > 0:
+        _burn_cpu(FAKE_LLM_CPU_MS)
+    return _structured_response(schema) if schema else FAKE_TEXT_RESPONSE
@@ -5,12 +5,12 @@ import base64
 import io
 import logging
 from fastapi import HTTPException
-import PyPDF2
 
 logger = logging.getLogger(__name__)
 
 def extract_text_from_pdf(file_content: bytes) -> str:
     """Extract text from PDF file"""
+    import PyPDF2  # deferred: only PDF uploads need it
     try:
         pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
         text = ""
@@ -0,0 +1,93 @@
+"""
+Per-question-type grade percentage series for the analytics charts.
+
+Moving averages are computed over a user's full history, then each series is
+downsampled with LTTB to the requested point count, so the payload size is
+fixed no matter how many evaluations the user has.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from utils.downsample import lttb, moving_average
+from utils.grading import evaluation_percent
+from utils.pagination import apply_keyset, build_page
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+DEFAULT_POINTS = 60
+MAX_POINTS = 500
+DEFAULT_WINDOW = 5
+MAX_WINDOW = 50
+
+# Evaluations read per request while walking a user's history
+FETCH_PAGE_SIZE = 1000
+
+TIMESERIES_FIELDS = "id, question_type, grade, percentage, timestamp"
+
+def _epoch(timestamp: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+def build_series(rows: List[Dict[str, Any]], points: int = DEFAULT_POINTS, window: int = DEFAULT_WINDOW) -> List[Dict[str, Any]]:
+    """Group graded rows by question type into downsampled {timestamp, percentage, moving_average} series.
+
+    Rows must be in timestamp order; ungraded rows are skipped.
+    """
+    by_type: Dict[str, List[tuple]] = defaultdict(list)
+    for row in rows:
+        percent = evaluation_percent(row)
+        moment = _epoch(row.get("timestamp")) if row.get("timestamp") else None
+        if percent is None or moment is None:
+            continue
+        by_type[row.get("question_type") or "unknown"].append((moment, percent, row["timestamp"]))
+
+    series = []
+    for qtype, entries in by_type.items():
+        smoothed = moving_average([percent for _, percent, _ in entries], window)
+        keep = lttb([(moment, percent) for moment, percent, _ in entries], points)
+        series.append({
+            "question_type": qtype,
+            "count": len(entries),
+            "points": [{
+                "timestamp": entries[i][2],
+                "percentage": round(entries[i][1], 1),
+                "moving_average": round(smoothed[i], 1)
+            } for i in keep]
+        })
+    return sorted(series, key=lambda s: -s["count"])
+
+class GradeTimeseriesService:
+    """Loads a user's graded history and shapes it into chart series."""
+
+    def __init__(self, supabase_client: 'Client'):
+        self.supabase = supabase_client
+
+    def _fetch(self, user_id: str, question_type: Optional[str], since: Optional[str]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        cursor = None
+        while True:
+            query = self.supabase.table('assessment_evaluations').select(TIMESERIES_FIELDS).eq('user_id', user_id)
+            if question_type:
+                query = query.eq('question_type', question_type)
+            if since:
+                query = query.gte('timestamp', since)
+            query = apply_keyset(query, 'timestamp', 'id', cursor, desc=False, limit=FETCH_PAGE_SIZE)
+            page, cursor = build_page(query.execute().data, FETCH_PAGE_SIZE, 'timestamp', 'id')
+            rows.extend(page)
+            if not cursor:
+                return rows
+
+    def get_series(self, user_id: str, points: int = DEFAULT_POINTS, window: int = DEFAULT_WINDOW,
+                   question_type: Optional[str] = None, since: Optional[str] = None) -> Dict[str, Any]:
+        points = max(2, min(points or DEFAULT_POINTS, MAX_POINTS))
+        window = max(1, min(window or DEFAULT_WINDOW, MAX_WINDOW))
+        rows = self._fetch(user_id, question_type, since)
+        return {
+            "points": points,
+            "window": window,
+            "total_evaluations": len(rows),
+            "series": build_series(rows, points, window)
+        }
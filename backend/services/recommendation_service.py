@@ -0,0 +1,213 @@
+"""
+AI study recommendations with a watermark-versioned cache.
+
+Recommendations are cached in `assessment_meta` under `recos_{user_id}` together
+with the evaluation watermark (count and latest evaluation id) they were built
+from. A cached entry is served while it is fresh; once the user has submitted
+enough new work or the entry has aged past its TTL it is still served, and a
+single background regeneration refreshes it off the request path.
+
+Regenerations are deduplicated per worker. Workers that miss the same entry at
+the same moment may each regenerate it (at most one call per worker); the
+cache row is shared, so the last write wins and later reads on every worker
+hit it.
+"""
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from config.settings import RECOMMENDATIONS_API_KEY, RECOMMENDATIONS_MODEL, LLM_PROVIDER
+from services.fake_llm import fake_completion
+from utils.http_client import get_http_client
+from utils.evaluation_rows import EVALUATION_ANALYTICS_FIELDS, decode_list_field
+from utils.grading import evaluation_percent
+from utils.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt or output format changes to invalidate every cached entry
+RECOMMENDATIONS_CACHE_VERSION = 2
+
+# Users need this many evaluations before recommendations are generated
+MIN_EVALUATIONS = 5
+# Regenerate after this many new evaluations since the cached watermark
+REFRESH_EVERY_EVALUATIONS = 5
+# Regenerate entries older than this even without new evaluations
+RECOMMENDATIONS_TTL = timedelta(days=7)
+# Recent evaluations summarised in the prompt
+RECENT_EVALUATIONS = 10
+
+SYSTEM_PROMPT = """You are an expert English tutor. Generate practical, encouraging study recommendations.
+                            Focus on vocabulary improvement and be specific about what to improve and how."""
+
+def evaluation_watermark(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """The (count, latest evaluation id) pair a recommendation was built from."""
+    recent = stats.get("recent_grades") or []
+    return {
+        "count": stats.get("total_evaluations") or 0,
+        "last_id": recent[-1].get("id") if recent else None
+    }
+
+def _parse_cached(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Decode a cached meta row. Legacy rows stored the plain recommendation text."""
+    if not row or not row.get("value"):
+        return None
+    value = row["value"]
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return {"text": row["value"], "version": 0, "watermark": {"count": 0}, "generated_at": row.get("updated_at")}
+    if not isinstance(value, dict) or not value.get("text"):
+        return None
+    return value
+
+class RecommendationService:
+    """Serves cached recommendations and regenerates them in the background."""
+
+    def __init__(self, supabase_client: 'Client'):
+        self.supabase = supabase_client
+        self._flights = SingleFlight()
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"recos_{user_id}"
+
+    def is_fresh(self, cached: Dict[str, Any], watermark: Dict[str, Any]) -> bool:
+        """Whether a cached entry can be served without scheduling a refresh."""
+        if cached.get("version") != RECOMMENDATIONS_CACHE_VERSION:
+            return False
+        new_evaluations = watermark["count"] - (cached.get("watermark") or {}).get("count", 0)
+        if new_evaluations >= REFRESH_EVERY_EVALUATIONS:
+            return False
+        generated_at = cached.get("generated_at")
+        if not generated_at:
+            return False
+        try:
+            age = datetime.utcnow() - datetime.fromisoformat(generated_at.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            return False
+        return age < RECOMMENDATIONS_TTL
+
+    async def get_recommendations(self, user_id: str, stats: Dict[str, Any]) -> Optional[str]:
+        """Return recommendation text for the user, or None if they have too few evaluations.
+
+        Fresh cache: returned as-is. Stale cache: returned immediately while one
+        background regeneration runs. No cache: generated inline, shared by
+        concurrent requests.
+        """
+        watermark = evaluation_watermark(stats)
+        if watermark["count"] < MIN_EVALUATIONS:
+            logger.info(f"ℹ️ User has only {watermark['count']} evaluations, need {MIN_EVALUATIONS}+ for recommendations")
+            return None
+
+        key = self._key(user_id)
+        try:
+            rec_resp = self.supabase.table('assessment_meta').select('*').eq('key', key).execute()
+            cached = _parse_cached(rec_resp.data[0] if rec_resp.data else None)
+        except Exception as e:
+            logger.error(f"❌ Cache lookup failed: {e}")
+            cached = None
+
+        if cached and self.is_fresh(cached, watermark):
+            logger.info(f"♻️ Using cached recommendations for {user_id}")
+            return cached["text"]
+
+        if cached:
+            logger.info(f"🔄 Serving stale recommendations for {user_id}, refreshing in background")
+            self._flights.spawn(key, lambda: self._regenerate(user_id, watermark, exists=True))
+            return cached["text"]
+
+        logger.info(f"🚀 No cached recommendations for {user_id}, generating")
+        return await self._flights.do(key, lambda: self._regenerate(user_id, watermark, exists=False))
+
+    async def _regenerate(self, user_id: str, watermark: Dict[str, Any], exists: bool) -> str:
+        started = datetime.utcnow()
+        recent = self.supabase.table('assessment_evaluations').select(EVALUATION_ANALYTICS_FIELDS) \
+            .eq('user_id', user_id).order('timestamp', desc=True).limit(RECENT_EVALUATIONS).execute().data or []
+        rec_text = await self._call_model(self._build_prompt(recent, watermark["count"]))
+        logger.info(f"✅ AI recommendations generated in {(datetime.utcnow() - started).total_seconds():.2f}s")
+
+        record = {
+            "key": self._key(user_id),
+            "value": json.dumps({
+                "text": rec_text,
+                "version": RECOMMENDATIONS_CACHE_VERSION,
+                "watermark": watermark,
+                "generated_at": datetime.utcnow().isoformat()
+            }),
+            "user_id": user_id,
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        try:
+            if exists:
+                self.supabase.table('assessment_meta').update(record).eq('key', record["key"]).execute()
+            else:
+                self.supabase.table('assessment_meta').insert(record).execute()
+        except Exception as e:
+            logger.error(f"❌ Failed to save recommendations cache: {e}")
+        return rec_text
+
+    @staticmethod
+    def _build_prompt(recent_evaluations, total_evaluations: int) -> str:
+        # Aggregate per question type: average score and improvement suggestions
+        type_to_scores = defaultdict(list)
+        type_to_improvements = defaultdict(list)
+        for ev in recent_evaluations:
+            qtype = ev.get('question_type')
+            percent = evaluation_percent(ev)
+            if percent is not None:
+                type_to_scores[qtype].append(percent / 100.0)
+            for imp in decode_list_field(ev.get('improvement_suggestions')) or []:
+                if isinstance(imp, str) and imp:
+                    type_to_improvements[qtype].append(imp)
+
+        summaries = []
+        for qtype, scores in type_to_scores.items():
+            summaries.append({
+                "questionType": qtype,
+                "averageScorePercent": round(sum(scores) / max(len(scores), 1) * 100),
+                "improvementSuggestions": type_to_improvements.get(qtype, [])[:10],
+            })
+
+        return f"""Student performance: {json.dumps(summaries, indent=1)}
+
+Provide study plan:
+1. **Top 3 Priorities** - Critical improvements
+2. **Vocabulary Focus** - Specific areas
+3. **Study Plan** - Daily/weekly goals
+4. **Success Tracking** - Progress indicators
+
+Keep under 200 words. Be encouraging. Student has {total_evaluations} assessments."""
+
+    @staticmethod
+    async def _call_model(prompt: str) -> str:
+        if LLM_PROVIDER == 'fake':
+            return await fake_completion(prompt)
+        if not RECOMMENDATIONS_API_KEY:
+            logger.error("❌ OPENROUTER_GPT_OSS_120B_KEY not configured")
+            raise Exception("OPENROUTER_GPT_OSS_120B_KEY not configured for recommendations")
+
+        headers = {
+            "Authorization": f"Bearer {RECOMMENDATIONS_API_KEY}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://englishgpt.everythingenglish.xyz",
+            "X-Title": "EnglishGPT Recommendations"
+        }
+        payload = {
+            "model": RECOMMENDATIONS_MODEL,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 400,
+            "temperature": 0.5
+        }
+        logger.info(f"📡 Calling OpenRouter API with model: {RECOMMENDATIONS_MODEL}")
+        r = await get_http_client().post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload, timeout=10.0)
+        r.raise_for_status()
+        return r.json()['choices'][0]['message']['content']
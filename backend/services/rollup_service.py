@@ -0,0 +1,310 @@
+"""
+Daily rollups behind the admin dashboard endpoints.
+
+`assessment_daily_rollups` holds one row per (day, question_type, plan) with
+evaluation counts, grade sums, grade bucket counts and a HyperLogLog sketch of
+distinct users. `DailyRollupService.run` folds in evaluations newer than the
+stored watermark, so the job cost follows new traffic rather than table size,
+and the dashboard reads a few hundred small rows instead of scanning
+assessment_evaluations. Each batch's merged cells and its new watermark are
+committed together by the assessment_apply_rollup_batch function
+(migrations/009_dashboard_rollup_batches.sql).
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from utils.grading import evaluation_percent
+from utils.hyperloglog import HyperLogLog
+from utils.pagination import apply_keyset, build_page, encode_cursor
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = 'assessment_daily_rollups'
+STATE_TABLE = 'assessment_rollup_state'
+STATE_NAME = 'daily_rollups'
+
+# 2 KiB per sketch, ~2.3% standard error
+ROLLUP_HLL_PRECISION = 11
+
+# Evaluations younger than this are left for the next run, so rows committed
+# slightly out of timestamp order are never skipped by the watermark
+SAFETY_LAG = timedelta(minutes=2)
+
+# Inclusive percentage ranges, in grade_buckets order
+GRADE_BUCKETS = [('0-20', 0, 20), ('21-40', 21, 40), ('41-60', 41, 60), ('61-80', 61, 80), ('81-100', 81, 100)]
+
+# A crashed run's lease expires after this long
+LEASE_DURATION = timedelta(minutes=10)
+
+UNKNOWN = 'unknown'
+# PostgREST caps a response at 1000 rows
+READ_PAGE_SIZE = 1000
+
+CellKey = Tuple[str, str, str]
+
+def grade_bucket(percent: float) -> Optional[int]:
+    """Index into GRADE_BUCKETS for a grade percentage, or None if out of range."""
+    value = round(percent)
+    for index, (_, low, high) in enumerate(GRADE_BUCKETS):
+        if low <= value <= high:
+            return index
+    return None
+
+def empty_cell() -> Dict[str, Any]:
+    return {
+        "evaluations": 0,
+        "graded": 0,
+        "grade_sum": 0.0,
+        "grade_buckets": [0] * len(GRADE_BUCKETS),
+        "users": HyperLogLog(ROLLUP_HLL_PRECISION),
+    }
+
+def _decode_buckets(value: Any) -> List[int]:
+    if isinstance(value, str):
+        value = json.loads(value)
+    buckets = list(value or [])
+    return buckets + [0] * (len(GRADE_BUCKETS) - len(buckets))
+
+def fold_rows(evaluations: List[Dict[str, Any]], plans: Dict[str, str]) -> Dict[CellKey, Dict[str, Any]]:
+    """Aggregate evaluation rows into rollup cells keyed by (day, question_type, plan)."""
+    cells: Dict[CellKey, Dict[str, Any]] = defaultdict(empty_cell)
+    for evaluation in evaluations:
+        day = str(evaluation.get('timestamp') or '')[:10]
+        if len(day) != 10:
+            continue
+        user_id = evaluation.get('user_id')
+        key = (day, evaluation.get('question_type') or UNKNOWN, plans.get(user_id) or UNKNOWN)
+        cell = cells[key]
+        cell["evaluations"] += 1
+        percent = evaluation_percent(evaluation)
+        if percent is not None:
+            cell["graded"] += 1
+            cell["grade_sum"] += percent
+            bucket = grade_bucket(percent)
+            if bucket is not None:
+                cell["grade_buckets"][bucket] += 1
+        if user_id:
+            cell["users"].add(user_id)
+    return cells
+
+class DailyRollupService:
+    """Maintains and reads the per-day dashboard rollups."""
+
+    def __init__(self, supabase_client: 'Client', user_service=None):
+        self.supabase = supabase_client
+        # UserManagementService, used to resolve each evaluation's plan in batches
+        self.user_service = user_service
+        self._owner = uuid.uuid4().hex
+
+    # --- job ---
+
+    def _load_state(self) -> Dict[str, Any]:
+        result = self.supabase.table(STATE_TABLE).select('*').eq('name', STATE_NAME).limit(1).execute()
+        return result.data[0] if result.data else {}
+
+    def _acquire_lease(self) -> bool:
+        """Claim the job lease; False if another process holds an unexpired one."""
+        now = datetime.utcnow()
+        self.supabase.table(STATE_TABLE).upsert({"name": STATE_NAME}, on_conflict="name", ignore_duplicates=True).execute()
+        result = self.supabase.table(STATE_TABLE).update({
+            "lease_owner": self._owner,
+            "lease_until": (now + LEASE_DURATION).isoformat()
+        }).eq('name', STATE_NAME).or_(f"lease_until.is.null,lease_until.lt.{now.isoformat()},lease_owner.eq.{self._owner}").execute()
+        return bool(result.data)
+
+    def _release_lease(self) -> None:
+        self.supabase.table(STATE_TABLE).update({"lease_owner": None, "lease_until": None}) \
+            .eq('name', STATE_NAME).eq('lease_owner', self._owner).execute()
+
+    async def _plans_for(self, evaluations: List[Dict[str, Any]]) -> Dict[str, str]:
+        user_ids = {row.get('user_id') for row in evaluations if row.get('user_id')}
+        if not user_ids or not self.user_service:
+            return {}
+        users = await self.user_service.get_users_by_ids(user_ids, include_deleted=True)
+        return {uid: user.get('current_plan') or UNKNOWN for uid, user in users.items()}
+
+    def _merged_records(self, cells: Dict[CellKey, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Freshly folded cells added onto the stored rows, as absolute rollup rows."""
+        days = sorted({key[0] for key in cells})
+        existing = {}
+        stored = self.supabase.table(ROLLUP_TABLE).select('*').in_('day', days).execute().data or []
+        for row in stored:
+            existing[(str(row['day'])[:10], row['question_type'], row['plan'])] = row
+
+        records = []
+        for key, cell in cells.items():
+            row = existing.get(key)
+            buckets = cell["grade_buckets"]
+            sketch = cell["users"]
+            evaluations, graded, grade_sum = cell["evaluations"], cell["graded"], cell["grade_sum"]
+            if row:
+                evaluations += row.get('evaluations') or 0
+                graded += row.get('graded') or 0
+                grade_sum += row.get('grade_sum') or 0
+                buckets = [a + b for a, b in zip(buckets, _decode_buckets(row.get('grade_buckets')))]
+                sketch.merge(HyperLogLog.from_text(row.get('users_hll'), ROLLUP_HLL_PRECISION))
+            records.append({
+                "day": key[0],
+                "question_type": key[1],
+                "plan": key[2],
+                "evaluations": evaluations,
+                "graded": graded,
+                "grade_sum": grade_sum,
+                "grade_buckets": buckets,
+                "users_hll": sketch.to_text()
+            })
+        return records
+
+    def _commit_batch(self, records: List[Dict[str, Any]], previous_id: Optional[str],
+                      last_row: Dict[str, Any], users: HyperLogLog) -> bool:
+        """Write a batch's rollup rows and advance the watermark in one transaction.
+
+        False if this process no longer holds the lease or the watermark moved
+        since it was read; nothing is written then.
+        """
+        result = self.supabase.rpc('assessment_apply_rollup_batch', {
+            "cells": records,
+            "lease_holder": self._owner,
+            "expected_watermark_id": previous_id,
+            "new_watermark_timestamp": last_row['timestamp'],
+            "new_watermark_id": last_row['id'],
+            "new_users_hll": users.to_text()
+        }).execute()
+        return bool(result.data)
+
+    async def run(self, batch_size: int = 1000, max_batches: Optional[int] = None) -> int:
+        """Fold evaluations newer than the watermark into the rollups. Returns rows processed.
+
+        Each batch's rows and watermark are committed atomically, so an
+        interrupted run resumes where it stopped without counting a row twice. Returns 0 without work if another process
+        holds the lease.
+        """
+        if not self._acquire_lease():
+            logger.info("⏭️ Rollup job already running elsewhere, skipping")
+            return 0
+        try:
+            return await self._run_batches(batch_size, max_batches)
+        finally:
+            self._release_lease()
+
+    async def _run_batches(self, batch_size: int, max_batches: Optional[int]) -> int:
+        state = self._load_state()
+        cursor = None
+        watermark_id = state.get('watermark_id')
+        if state.get('watermark_timestamp') and watermark_id:
+            cursor = encode_cursor(state['watermark_timestamp'], watermark_id)
+        all_users = HyperLogLog.from_text(state.get('users_hll'), ROLLUP_HLL_PRECISION)
+        cutoff = (datetime.utcnow() - SAFETY_LAG).isoformat()
+
+        processed = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            query = self.supabase.table('assessment_evaluations').select('id, user_id, question_type, grade, percentage, timestamp').lt('timestamp', cutoff)
+            query = apply_keyset(query, 'timestamp', 'id', cursor, desc=False, limit=batch_size)
+            rows, next_cursor = build_page(query.execute().data, batch_size, 'timestamp', 'id')
+            if not rows:
+                break
+
+            cells = fold_rows(rows, await self._plans_for(rows))
+            records = self._merged_records(cells) if cells else []
+            all_users.update(row['user_id'] for row in rows if row.get('user_id'))
+            last = rows[-1]
+            if not self._commit_batch(records, watermark_id, last, all_users):
+                logger.warning("⚠️ Rollup lease lost or watermark moved, stopping this run")
+                break
+            watermark_id = last['id']
+            cursor = encode_cursor(last['timestamp'], last['id'])
+            processed += len(rows)
+            batches += 1
+            if not next_cursor:
+                break
+
+        if processed:
+            logger.info(f"📊 Rolled up {processed} evaluations")
+        return processed
+
+    async def run_periodically(self, interval_seconds: int) -> None:
+        """Run the job every interval until cancelled; failures are logged and retried."""
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"❌ Rollup job failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    # --- reads ---
+
+    def as_of(self) -> Optional[str]:
+        """Timestamp of the newest evaluation folded in, or None before the first run."""
+        result = self.supabase.table(STATE_TABLE).select('watermark_timestamp').eq('name', STATE_NAME).limit(1).execute()
+        return result.data[0].get('watermark_timestamp') if result.data else None
+
+    def _select_rows(self, columns: str, since: Optional[date] = None) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = self.supabase.table(ROLLUP_TABLE).select(columns)
+            if since:
+                query = query.gte('day', since.isoformat())
+            page = query.order('day').order('question_type').order('plan') \
+                .range(start, start + READ_PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < READ_PAGE_SIZE:
+                return rows
+            start += READ_PAGE_SIZE
+
+    def totals(self) -> Dict[str, Any]:
+        """All-time evaluation count, average grade percentage and distinct users."""
+        rows = self._select_rows('evaluations, graded, grade_sum')
+        graded = sum(row.get('graded') or 0 for row in rows)
+        grade_sum = sum(row.get('grade_sum') or 0 for row in rows)
+        state = self._load_state()
+        return {
+            "evaluations": sum(row.get('evaluations') or 0 for row in rows),
+            "average_grade": grade_sum / graded if graded else 0.0,
+            "distinct_users": HyperLogLog.from_text(state.get('users_hll'), ROLLUP_HLL_PRECISION).count(),
+            "as_of": state.get('watermark_timestamp')
+        }
+
+    def daily_counts(self, since: date) -> Dict[str, int]:
+        """Evaluations per ISO day from `since` onwards."""
+        counts: Dict[str, int] = defaultdict(int)
+        for row in self._select_rows('day, evaluations', since):
+            counts[str(row['day'])[:10]] += row.get('evaluations') or 0
+        return counts
+
+    def grade_distribution(self) -> List[Dict[str, Any]]:
+        """Evaluation counts per GRADE_BUCKETS range."""
+        totals = [0] * len(GRADE_BUCKETS)
+        for row in self._select_rows('grade_buckets'):
+            totals = [a + b for a, b in zip(totals, _decode_buckets(row.get('grade_buckets')))]
+        return [{"grade_range": name, "count": count} for (name, _, _), count in zip(GRADE_BUCKETS, totals)]
+
+    def question_types(self) -> List[Dict[str, Any]]:
+        """Count and average grade percentage per question type, most used first."""
+        by_type: Dict[str, Dict[str, float]] = defaultdict(lambda: {"count": 0, "graded": 0, "grade_sum": 0.0})
+        for row in self._select_rows('question_type, evaluations, graded, grade_sum'):
+            entry = by_type[row['question_type']]
+            entry["count"] += row.get('evaluations') or 0
+            entry["graded"] += row.get('graded') or 0
+            entry["grade_sum"] += row.get('grade_sum') or 0
+        stats = [{
+            "question_type": qtype,
+            "count": entry["count"],
+            "average_grade": entry["grade_sum"] / entry["graded"] if entry["graded"] else 0.0
+        } for qtype, entry in by_type.items()]
+        return sorted(stats, key=lambda x: x["count"], reverse=True)
+
+    def distinct_users(self, since: Optional[date] = None) -> int:
+        """Approximate distinct users with evaluations from `since` (all time when None)."""
+        sketch = HyperLogLog(ROLLUP_HLL_PRECISION)
+        for row in self._select_rows('users_hll', since):
+            sketch.merge(HyperLogLog.from_text(row.get('users_hll'), ROLLUP_HLL_PRECISION))
+        return sketch.count()
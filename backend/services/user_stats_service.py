@@ -0,0 +1,240 @@
+"""
+Incrementally maintained per-user analytics aggregates.
+
+Each user has one `assessment_user_stats` row holding counts, per-type score
+sums, per-component mark sums and counts, the last few grades and a
+day-activity bitmap.
+The row is folded forward as each evaluation is saved, so analytics reads are
+a single-row lookup instead of a scan of the user's whole history.
+"""
+import logging
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from utils.activity import ActivityBitmap
+from utils.evaluation_rows import EVALUATION_STATS_FIELDS
+from utils.grading import MARK_COLUMNS, evaluation_percent, parse_marks_value, parse_score_pair
+from utils.pagination import apply_keyset, build_page
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+STATS_TABLE = 'assessment_user_stats'
+
+# How many of the latest grades are kept on the aggregate row
+RECENT_GRADES_LIMIT = 20
+
+# Optimistic-concurrency retries when two evaluations land at once
+MAX_APPLY_ATTEMPTS = 3
+
+# Evaluations read per request while rebuilding; with the look-ahead row this stays under PostgREST's max-rows cap
+REBUILD_PAGE_SIZE = 500
+
+def empty_stats(user_id: str) -> Dict[str, Any]:
+    """A fresh aggregate row for a user with no evaluations."""
+    return {
+        "user_id": user_id,
+        "total_evaluations": 0,
+        "total_words": 0,
+        "type_counts": {},
+        "type_score_sums": {},
+        "type_scored_counts": {},
+        "component_sums": {},
+        "component_counts": {},
+        "recent_grades": [],
+        "grade_improvements": 0,
+        "last_grade_value": None,
+        "activity_start": None,
+        "activity_bits": None,
+        "first_evaluation_at": None,
+        "last_evaluation_at": None,
+        "version": 0
+    }
+
+def fold_evaluation(stats: Dict[str, Any], evaluation: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of `stats` with one evaluation added."""
+    stats = dict(stats)
+    qtype = evaluation.get("question_type") or "unknown"
+    timestamp = evaluation.get("timestamp")
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.isoformat()
+
+    stats["total_evaluations"] = (stats.get("total_evaluations") or 0) + 1
+    stats["total_words"] = (stats.get("total_words") or 0) + len((evaluation.get("student_response") or "").split())
+
+    type_counts = dict(stats.get("type_counts") or {})
+    type_counts[qtype] = type_counts.get(qtype, 0) + 1
+    stats["type_counts"] = type_counts
+
+    percent = evaluation_percent(evaluation)
+    if percent is not None:
+        score_sums = dict(stats.get("type_score_sums") or {})
+        scored_counts = dict(stats.get("type_scored_counts") or {})
+        score_sums[qtype] = score_sums.get(qtype, 0.0) + percent
+        scored_counts[qtype] = scored_counts.get(qtype, 0) + 1
+        stats["type_score_sums"] = score_sums
+        stats["type_scored_counts"] = scored_counts
+
+    component_sums = {k: dict(v) for k, v in (stats.get("component_sums") or {}).items()}
+    component_counts = {k: dict(v) for k, v in (stats.get("component_counts") or {}).items()}
+    type_sums = component_sums.setdefault(qtype, {})
+    type_counts_by_component = component_counts.setdefault(qtype, {})
+    component_marks = evaluation.get("component_marks")
+    if component_marks is None:
+        # Rows saved before the numeric columns existed; unparseable marks are skipped, as in numeric_grade_fields
+        component_marks = {}
+        for component, column in MARK_COLUMNS.items():
+            mark, _ = parse_score_pair(evaluation.get(column))
+            if mark is not None:
+                component_marks[component] = mark
+    for component, mark in component_marks.items():
+        type_sums[component] = type_sums.get(component, 0) + mark
+        type_counts_by_component[component] = type_counts_by_component.get(component, 0) + 1
+    stats["component_sums"] = component_sums
+    stats["component_counts"] = component_counts
+
+    # Count submissions whose leading grade number beat the previous submission's
+    score = evaluation.get("score")
+    grade_value = int(score) if score is not None else parse_marks_value(evaluation.get("grade"))
+    last_value = stats.get("last_grade_value")
+    if last_value is not None and grade_value > last_value:
+        stats["grade_improvements"] = (stats.get("grade_improvements") or 0) + 1
+    stats["last_grade_value"] = grade_value
+
+    recent = list(stats.get("recent_grades") or [])
+    recent.append({
+        "id": evaluation.get("id"),
+        "question_type": qtype,
+        "grade": evaluation.get("grade"),
+        "percent": round(percent, 1) if percent is not None else None,
+        "timestamp": timestamp
+    })
+    stats["recent_grades"] = recent[-RECENT_GRADES_LIMIT:]
+
+    if timestamp:
+        activity = ActivityBitmap.from_record(stats.get("activity_start"), stats.get("activity_bits"))
+        activity.add(timestamp)
+        stats.update(activity.to_record())
+        if not stats.get("first_evaluation_at") or timestamp < stats["first_evaluation_at"]:
+            stats["first_evaluation_at"] = timestamp
+        if not stats.get("last_evaluation_at") or timestamp > stats["last_evaluation_at"]:
+            stats["last_evaluation_at"] = timestamp
+    return stats
+
+def summarize_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape an aggregate row for the analytics API."""
+    type_counts = stats.get("type_counts") or {}
+    score_sums = stats.get("type_score_sums") or {}
+    scored_counts = stats.get("type_scored_counts") or {}
+    component_sums = stats.get("component_sums") or {}
+    component_counts = stats.get("component_counts") or {}
+
+    question_types = []
+    for qtype, count in sorted(type_counts.items(), key=lambda item: -item[1]):
+        scored = scored_counts.get(qtype, 0)
+        marked = component_counts.get(qtype) or {}
+        question_types.append({
+            "question_type": qtype,
+            "count": count,
+            "average_percent": round(score_sums.get(qtype, 0.0) / scored, 1) if scored else None,
+            # Each component is averaged over the evaluations that carried a mark for it
+            "component_averages": {
+                component: round(total / marked[component], 2)
+                for component, total in (component_sums.get(qtype) or {}).items()
+                if marked.get(component)
+            }
+        })
+
+    total_scored = sum(scored_counts.values())
+    recent = stats.get("recent_grades") or []
+    recent_percents = [g["percent"] for g in recent if g.get("percent") is not None]
+    trend = None
+    if len(recent_percents) >= 2:
+        half = len(recent_percents) // 2
+        earlier, later = recent_percents[:half], recent_percents[half:]
+        trend = round(sum(later) / len(later) - sum(earlier) / len(earlier), 1)
+
+    activity = ActivityBitmap.from_record(stats.get("activity_start"), stats.get("activity_bits"))
+    today = date.today().toordinal()
+    return {
+        "total_evaluations": stats.get("total_evaluations") or 0,
+        "total_words": stats.get("total_words") or 0,
+        "average_percent": round(sum(score_sums.values()) / total_scored, 1) if total_scored else None,
+        "question_types": question_types,
+        "recent_grades": recent,
+        "recent_trend": trend,
+        "active_days": len(activity),
+        "active_days_last_30": activity.active_days_in_window(today - 29, today),
+        "current_streak": activity.current_streak(today),
+        "longest_streak": activity.longest_streak(),
+        "first_evaluation_at": stats.get("first_evaluation_at"),
+        "last_evaluation_at": stats.get("last_evaluation_at")
+    }
+
+class UserStatsService:
+    """Reads and incrementally updates per-user analytics aggregates."""
+
+    def __init__(self, supabase_client: 'Client'):
+        self.supabase = supabase_client
+
+    def _fetch(self, user_id: str) -> Optional[Dict[str, Any]]:
+        result = self.supabase.table(STATS_TABLE).select('*').eq('user_id', user_id).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    def rebuild(self, user_id: str) -> Dict[str, Any]:
+        """Recompute a user's aggregate from their full history and store it."""
+        current = self._fetch(user_id)
+        stats = empty_stats(user_id)
+        # Fold the history page by page, oldest first; one unpaged select stops at PostgREST's row cap
+        cursor = None
+        while True:
+            query = self.supabase.table('assessment_evaluations').select(EVALUATION_STATS_FIELDS).eq('user_id', user_id)
+            query = apply_keyset(query, 'timestamp', 'id', cursor, desc=False, limit=REBUILD_PAGE_SIZE)
+            page, cursor = build_page(query.execute().data, REBUILD_PAGE_SIZE, 'timestamp', 'id')
+            for evaluation in page:
+                stats = fold_evaluation(stats, evaluation)
+            if not cursor:
+                break
+        stats["version"] = (current or {}).get("version", 0) + 1
+        stats["updated_at"] = datetime.utcnow().isoformat()
+        self.supabase.table(STATS_TABLE).upsert(stats, on_conflict="user_id").execute()
+        logger.info(f"Rebuilt analytics aggregate for {user_id} from {stats['total_evaluations']} evaluations")
+        return stats
+
+    def get_stats(self, user_id: str) -> Dict[str, Any]:
+        """Return the user's aggregate, building it once from history if it does not exist yet."""
+        stats = self._fetch(user_id)
+        if stats is None:
+            stats = self.rebuild(user_id)
+        return stats
+
+    def peek_stats(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the user's stored aggregate, or None if it has not been built. Never writes."""
+        return self._fetch(user_id)
+
+    def apply_evaluation(self, evaluation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fold a just-saved evaluation into its user's aggregate. Failures are logged, never raised."""
+        user_id = evaluation.get("user_id")
+        if not self.supabase or not user_id:
+            return None
+        try:
+            for _ in range(MAX_APPLY_ATTEMPTS):
+                current = self._fetch(user_id)
+                if current is None:
+                    # First aggregate for this user; the rebuild already includes this evaluation
+                    return self.rebuild(user_id)
+                if any(g.get("id") == evaluation.get("id") for g in current.get("recent_grades") or []):
+                    return current
+                updated = fold_evaluation(current, evaluation)
+                updated["version"] = current.get("version", 0) + 1
+                updated["updated_at"] = datetime.utcnow().isoformat()
+                result = self.supabase.table(STATS_TABLE).update(updated) \
+                    .eq('user_id', user_id).eq('version', current.get("version", 0)).execute()
+                if result.data:
+                    return updated
+            # Lost the race repeatedly; fall back to a full recompute
+            return self.rebuild(user_id)
+        except Exception as e:
+            logger.error(f"Failed to update analytics aggregate for {user_id}: {str(e)}")
+            return None
@@ -4,17 +4,179 @@ Handles user creation, restoration, and sync operations with soft delete support
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Any, Optional, List, Iterable, MutableMapping, Tuple
 from datetime import datetime
-from supabase import Client
+from utils.batch_loader import BatchLoader
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of values per in_() filter, keeping the request URL well under limits
+USER_BATCH_SIZE = 100
+# How long looked-up users are served from the in-process cache by the batch APIs
+USER_CACHE_TTL_SECONDS = 30
+
 class UserManagementService:
     """Service for managing assessment users with soft delete support"""
     
-    def __init__(self, supabase_client: Client):
+    # Called with a user ID whenever any instance changes that user (e.g. the admin search index)
+    change_listeners: List[Callable[[str], None]] = []
+    
+    def __init__(self, supabase_client: 'Client'):
         self.supabase = supabase_client
+        # uid -> (expires_at, user row) for active users, plus an email -> uid index
+        self._user_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._email_index: Dict[str, str] = {}
+
+    def _cache_user(self, user_data: Dict[str, Any]) -> None:
+        uid = user_data.get('uid')
+        if not uid:
+            return
+        self._user_cache[uid] = (time.monotonic() + USER_CACHE_TTL_SECONDS, dict(user_data))
+        if user_data.get('email'):
+            self._email_index[user_data['email']] = uid
+
+    def _cached_user(self, uid: str) -> Optional[Dict[str, Any]]:
+        entry = self._user_cache.get(uid)
+        if not entry:
+            return None
+        expires_at, user_data = entry
+        if expires_at < time.monotonic():
+            self._evict_user(uid)
+            return None
+        return dict(user_data)
+
+    def _evict_user(self, user_id: str) -> None:
+        entry = self._user_cache.pop(user_id, None)
+        if entry and entry[1].get('email'):
+            self._email_index.pop(entry[1]['email'], None)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop a user from the lookup cache after it changes and notify change listeners."""
+        self._evict_user(user_id)
+        for listener in self.change_listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                logger.error(f"User change listener failed for {user_id}: {str(e)}")
+
+    def _fetch_users(self, column: str, values: List[str], include_deleted: bool) -> List[Dict[str, Any]]:
+        """Query users where `column` is in `values`, one in_() request per chunk."""
+        table = 'assessment_users' if include_deleted else 'active_assessment_users'
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(values), USER_BATCH_SIZE):
+            chunk = values[start:start + USER_BATCH_SIZE]
+            response = self.supabase.table(table).select('*').in_(column, chunk).execute()
+            for user_data in response.data or []:
+                # Add compatibility field
+                user_data['id'] = user_data['uid']
+                rows.append(user_data)
+        return rows
+
+    async def get_users_by_ids(
+        self,
+        user_ids: Iterable[str],
+        include_deleted: bool = False,
+        use_cache: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get many users by ID with one query per batch
+        
+        Args:
+            user_ids: User IDs to retrieve (duplicates and empty values are ignored)
+            include_deleted: Whether to include soft-deleted users (bypasses the cache)
+            use_cache: Whether recently looked-up users may be served from memory
+            
+        Returns:
+            Dict mapping user ID to user data; missing users are omitted
+        """
+        wanted = list(dict.fromkeys(uid for uid in user_ids if uid and uid != "undefined"))
+        found: Dict[str, Dict[str, Any]] = {}
+        if not wanted:
+            return found
+        
+        read_cache = use_cache and not include_deleted
+        missing = []
+        for uid in wanted:
+            cached = self._cached_user(uid) if read_cache else None
+            if cached:
+                found[uid] = cached
+            else:
+                missing.append(uid)
+        
+        try:
+            for user_data in self._fetch_users('uid', missing, include_deleted):
+                found[user_data['uid']] = user_data
+                if not include_deleted:
+                    self._cache_user(user_data)
+        except Exception as e:
+            logger.error(f"Error retrieving {len(missing)} users by id: {str(e)}")
+        
+        return found
+
+    async def get_users_by_emails(
+        self,
+        emails: Iterable[str],
+        include_deleted: bool = False,
+        use_cache: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get many users by email with one query per batch
+        
+        Args:
+            emails: Email addresses to search for
+            include_deleted: Whether to include soft-deleted users (bypasses the cache)
+            use_cache: Whether recently looked-up users may be served from memory
+            
+        Returns:
+            Dict mapping email to user data; missing users are omitted
+        """
+        wanted = list(dict.fromkeys(email for email in emails if email))
+        found: Dict[str, Dict[str, Any]] = {}
+        if not wanted:
+            return found
+        
+        read_cache = use_cache and not include_deleted
+        missing = []
+        for email in wanted:
+            uid = self._email_index.get(email) if read_cache else None
+            cached = self._cached_user(uid) if uid else None
+            if cached and cached.get('email') == email:
+                found[email] = cached
+            else:
+                missing.append(email)
+        
+        try:
+            for user_data in self._fetch_users('email', missing, include_deleted):
+                found[user_data['email']] = user_data
+                if not include_deleted:
+                    self._cache_user(user_data)
+        except Exception as e:
+            logger.error(f"Error retrieving {len(missing)} users by email: {str(e)}")
+        
+        return found
+
+    def user_loader(self) -> BatchLoader:
+        """Request-scoped loader that coalesces get-user-by-id calls into get_users_by_ids.
+
+        Rows are read fresh (like get_user_by_id) and then memoised for the loader's lifetime.
+        """
+        return BatchLoader(lambda user_ids: self.get_users_by_ids(user_ids, use_cache=False))
+
+    def request_user_loader(self, scope: MutableMapping[str, Any]) -> BatchLoader:
+        """The user loader for one request, kept in its ASGI scope state (request.state.user_loader).
+
+        AuthRecoveryMiddleware and the route share it, so a user the middleware
+        had to look up is not fetched again by the handler.
+        """
+        state = scope.setdefault("state", {})
+        loader = state.get("user_loader")
+        if loader is None:
+            loader = state["user_loader"] = self.user_loader()
+        return loader
         
     async def create_or_restore_user(
         self,
@@ -47,6 +209,7 @@ class UserManagementService:
         """
         try:
             logger.info(f"Creating or restoring user: {user_id} ({email})")
+            self.invalidate_user(user_id)
             logger.info(f"Parameters: display_name={display_name}, academic_level={academic_level}, current_plan={current_plan}, credits={credits}, is_launch_user={is_launch_user}, photo_url={photo_url}, dark_mode={dark_mode}")
             
             # Check if user already exists to determine if we should preserve their plan
@@ -236,42 +399,26 @@ class UserManagementService:
             User data dict or None if not found
         """
         try:
-            print(f"🔍 DEBUG user_management_service.py - get_user_by_id called with user_id: {user_id}")
-            print(f"🔍 DEBUG user_management_service.py - supabase client available: {self.supabase is not None}")
-            
             if not user_id or user_id == "undefined":
-                print(f"❌ DEBUG user_management_service.py - Invalid user_id: {user_id}")
+                logger.debug("Invalid user_id: %s", user_id)
                 return None
                 
             # Use the active_assessment_users view to only get non-deleted users
-            print(f"🔍 DEBUG user_management_service.py - Querying active_assessment_users table for uid: {user_id}")
             response = self.supabase.table('active_assessment_users').select('*').eq('uid', user_id).execute()
             
-            print(f"🔍 DEBUG user_management_service.py - Supabase response: {response}")
-            print(f"🔍 DEBUG user_management_service.py - Response data: {response.data}")
-            print(f"🔍 DEBUG user_management_service.py - Response data length: {len(response.data) if response.data else 0}")
-            
             if response.data:
                 user_data = response.data[0]
-                print(f"🔍 DEBUG user_management_service.py - Raw user data from DB: {user_data}")
-                print(f"🔍 DEBUG user_management_service.py - current_plan: {user_data.get('current_plan', 'NOT_FOUND')}")
-                print(f"🔍 DEBUG user_management_service.py - credits: {user_data.get('credits', 'NOT_FOUND')}")
-                print(f"🔍 DEBUG user_management_service.py - questions_marked: {user_data.get('questions_marked', 'NOT_FOUND')}")
-                
                 # Add compatibility field
                 user_data['id'] = user_data['uid']
-                print(f"✅ DEBUG user_management_service.py - Returning user data: {user_data}")
+                self._cache_user(user_data)
+                logger.debug("Loaded user %s: %s", user_id, user_data)
                 return user_data
             else:
-                print(f"⚠️ DEBUG user_management_service.py - No user found for user_id: {user_id}")
+                logger.debug("No user found for user_id: %s", user_id)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error retrieving user {user_id}: {str(e)}")
-            print(f"❌ DEBUG user_management_service.py - Exception in get_user_by_id: {str(e)}")
-            print(f"❌ DEBUG user_management_service.py - Exception type: {type(e)}")
-            import traceback
-            print(f"❌ DEBUG user_management_service.py - Traceback: {traceback.format_exc()}")
+            logger.error("Error retrieving user %s: %s", user_id, e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return None
     
     async def get_user_by_email(self, email: str, include_deleted: bool = False) -> Optional[Dict[str, Any]]:
@@ -328,6 +475,7 @@ class UserManagementService:
             
             # Update in the main table (not the view)
             response = self.supabase.table('assessment_users').update(updates).eq('uid', user_id).execute()
+            self.invalidate_user(user_id)
             
             if response.data:
                 updated_user = response.data[0]
@@ -353,6 +501,7 @@ class UserManagementService:
         """
         try:
             logger.info(f"Soft deleting user: {user_id}")
+            self.invalidate_user(user_id)
             
             result = self.supabase.rpc(
                 'soft_delete_assessment_user',
@@ -385,6 +534,7 @@ class UserManagementService:
         """
         try:
             logger.info(f"Restoring user: {user_id}")
+            self.invalidate_user(user_id)
             
             # Update the user to remove deleted_at timestamp
             result = self.supabase.table('assessment_users').update({
@@ -546,9 +696,12 @@ class UserManagementService:
         try:
             logger.info(f"Merging user accounts: auth_user_id={auth_user_id}, existing_user_id={existing_user_id}")
             
-            # Get both user records
-            auth_user = await self.get_user_by_id(auth_user_id)
-            existing_user = await self.get_user_by_id(existing_user_id)
+            # Get both user records in one query
+            self.invalidate_user(auth_user_id)
+            self.invalidate_user(existing_user_id)
+            users = await self.get_users_by_ids([auth_user_id, existing_user_id], use_cache=False)
+            auth_user = users.get(auth_user_id)
+            existing_user = users.get(existing_user_id)
             
             if not existing_user:
                 logger.error(f"Existing user {existing_user_id} not found")
@@ -573,8 +726,7 @@ class UserManagementService:
                 logger.info(f"Starting two-phase account merge: {existing_user_id} -> {auth_user_id}")
                 
                 # Phase 1: Create the new user record first (if it doesn't exist)
-                existing_new_user = await self.get_user_by_id(auth_user_id)
-                if not existing_new_user:
+                if not auth_user:
                     logger.info(f"Creating new user record for {auth_user_id}")
                     try:
                         # Create a minimal user record with a TEMPORARY email to avoid conflicts
@@ -625,6 +777,12 @@ class UserManagementService:
                 except Exception as eval_error:
                     logger.warning(f"Could not update evaluations: {str(eval_error)}")
                 
+                # Aggregates for both users are stale now; they are rebuilt on next read
+                try:
+                    self.supabase.table('assessment_user_stats').delete().in_('user_id', [auth_user_id, existing_user_id]).execute()
+                except Exception as stats_error:
+                    logger.warning(f"Could not reset analytics aggregates: {str(stats_error)}")
+                
                 # Update badges table
                 try:
                     badge_update = self.supabase.table('assessment_badges').update({
@@ -681,6 +839,8 @@ class UserManagementService:
                     logger.warning(f"Could not delete old user record: {str(delete_error)}")
                 
                 # Get the merged user data
+                self.invalidate_user(existing_user_id)
+                self.invalidate_user(auth_user_id)
                 merged_user = await self.get_user_by_id(auth_user_id)
                 if merged_user:
                     logger.info(f"Successfully completed two-phase account merge: {existing_user_id} -> {auth_user_id}")
@@ -0,0 +1,120 @@
+"""
+Compact per-user day-activity bitmap.
+
+Shared by the analytics aggregate, the badge engine and the admin dashboard for
+streaks and active-day counts without re-parsing evaluation timestamps.
+
+Bit i is set when the user submitted on day `start + i`, where days are
+proleptic Gregorian ordinals (date.toordinal()). The bitmap is persisted as an
+integer start day plus base64 bytes.
+"""
+import base64
+from datetime import date, datetime
+from typing import Optional, Union
+
+DayLike = Union[int, date, datetime, str]
+
+def day_ordinal(value: DayLike) -> int:
+    """Convert a date, datetime, ISO timestamp string or ordinal to a day ordinal."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    # ISO strings: only the calendar date part matters
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+class ActivityBitmap:
+    """Set of active days stored as a bitmap anchored at the first active day."""
+
+    __slots__ = ("start", "bits")
+
+    def __init__(self, start: Optional[int] = None, bits: Optional[bytearray] = None):
+        self.start = start
+        self.bits = bits if bits is not None else bytearray()
+
+    @classmethod
+    def from_record(cls, start: Optional[int], encoded: Optional[str]) -> "ActivityBitmap":
+        """Rebuild from the (activity_start, activity_bits) columns."""
+        if start is None or not encoded:
+            return cls()
+        return cls(int(start), bytearray(base64.b64decode(encoded)))
+
+    def to_record(self) -> dict:
+        """Serialise to the (activity_start, activity_bits) columns."""
+        return {
+            "activity_start": self.start,
+            "activity_bits": base64.b64encode(bytes(self.bits)).decode("ascii") if self.start is not None else None
+        }
+
+    def add(self, day: DayLike) -> None:
+        """Mark a day as active. Appending today or a later day is O(1) amortised."""
+        ordinal = day_ordinal(day)
+        if self.start is None:
+            self.start = ordinal
+        elif ordinal < self.start:
+            # Rare out-of-order backfill: re-anchor at the earlier day
+            shift = self.start - ordinal
+            old_bits = self.bits
+            self.start, self.bits = ordinal, bytearray()
+            for offset in range(len(old_bits) * 8):
+                if old_bits[offset >> 3] & (1 << (offset & 7)):
+                    self._set(offset + shift)
+        self._set(ordinal - self.start)
+
+    def _set(self, offset: int) -> None:
+        index = offset >> 3
+        if index >= len(self.bits):
+            self.bits.extend(b"\x00" * (index + 1 - len(self.bits)))
+        self.bits[index] |= 1 << (offset & 7)
+
+    def contains(self, day: DayLike) -> bool:
+        """Whether the user was active on `day`."""
+        if self.start is None:
+            return False
+        offset = day_ordinal(day) - self.start
+        if offset < 0 or (offset >> 3) >= len(self.bits):
+            return False
+        return bool(self.bits[offset >> 3] & (1 << (offset & 7)))
+
+    def _as_int(self) -> int:
+        # Bit i of the little-endian integer is day start + i
+        return int.from_bytes(self.bits, "little")
+
+    def __len__(self) -> int:
+        """Number of active days."""
+        return self._as_int().bit_count()
+
+    def active_days_in_window(self, first_day: DayLike, last_day: DayLike) -> int:
+        """Number of active days between first_day and last_day inclusive."""
+        if self.start is None:
+            return 0
+        lo = max(day_ordinal(first_day) - self.start, 0)
+        hi = day_ordinal(last_day) - self.start
+        if hi < lo:
+            return 0
+        return ((self._as_int() >> lo) & ((1 << (hi - lo + 1)) - 1)).bit_count()
+
+    def longest_streak(self) -> int:
+        """Longest run of consecutive active days."""
+        value = self._as_int()
+        longest = 0
+        while value:
+            # Drop trailing inactive days, then measure the run of active ones
+            value >>= (value & -value).bit_length() - 1
+            run = (~value & (value + 1)).bit_length() - 1
+            longest = max(longest, run)
+            value >>= run
+        return longest
+
+    def current_streak(self, today: Optional[DayLike] = None) -> int:
+        """Consecutive active days ending today, or yesterday if today has no activity yet."""
+        day = day_ordinal(today or date.today())
+        if not self.contains(day):
+            day -= 1
+        streak = 0
+        while self.contains(day):
+            streak += 1
+            day -= 1
+        return streak
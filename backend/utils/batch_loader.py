@@ -0,0 +1,75 @@
+"""
+DataLoader-style request batching.
+
+A BatchLoader collects every load() issued in the same event-loop tick and
+resolves them with a single call to the batch function. Create one loader per
+request: results are memoised for the loader's lifetime, so the middleware and
+the route handling a request can share lookups through it.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+BatchFunction = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+class BatchLoader:
+    """Coalesce individual key lookups into one batch call per event-loop tick."""
+
+    def __init__(self, batch_fn: BatchFunction):
+        # batch_fn receives a list of unique keys and returns {key: value};
+        # keys missing from the result resolve to None
+        self.batch_fn = batch_fn
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._pending: List[Hashable] = []
+        self._scheduled = False
+
+    def load(self, key: Hashable) -> Awaitable[Optional[Any]]:
+        """Return an awaitable for the value of `key`."""
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        self._pending.append(key)
+        if not self._scheduled:
+            self._scheduled = True
+            # Runs after every callback already queued, so sibling tasks get to enqueue first
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Optional[Any]]:
+        """Load several keys at once, preserving order."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Seed the loader with a value that is already known."""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: Hashable) -> None:
+        """Forget a memoised value, e.g. after the underlying record changed."""
+        future = self._futures.get(key)
+        if future is not None and future.done():
+            del self._futures[key]
+
+    def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        self._scheduled = False
+        if keys:
+            asyncio.ensure_future(self._resolve(keys))
+
+    async def _resolve(self, keys: List[Hashable]) -> None:
+        try:
+            results = await self.batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(results.get(key))
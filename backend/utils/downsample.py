@@ -0,0 +1,61 @@
+"""
+Server-side downsampling for chart series.
+
+`lttb` (Largest-Triangle-Three-Buckets) keeps the points that best preserve a
+line chart's visual shape, so a series of any length becomes a fixed-size
+payload. `moving_average` smooths a series before it is sampled.
+"""
+from typing import List, Sequence, Tuple
+
+def lttb(points: Sequence[Tuple[float, float]], threshold: int) -> List[int]:
+    """Indices of at most `threshold` points chosen by LTTB, in order.
+
+    `points` are (x, y) pairs sorted by x. The first and last points are always
+    kept; every series shorter than the threshold is returned whole.
+    """
+    count = len(points)
+    if threshold >= count or count <= 2:
+        return list(range(count))
+    if threshold <= 2:
+        return [0, count - 1]
+
+    selected = [0]
+    # Interior points are split into threshold - 2 buckets
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the next bucket (or the last point) is the third vertex
+        next_start, next_end = end, min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        span = next_end - next_start
+        avg_x = sum(points[i][0] for i in range(next_start, next_end)) / span
+        avg_y = sum(points[i][1] for i in range(next_start, next_end)) / span
+
+        ax, ay = points[previous]
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            x, y = points[i]
+            # Twice the triangle area; the factor does not change the argmax
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+        previous = best
+    selected.append(count - 1)
+    return selected
+
+def moving_average(values: Sequence[float], window: int) -> List[float]:
+    """Trailing mean over the last `window` values (fewer at the start)."""
+    window = max(1, window)
+    averages = []
+    running = 0.0
+    for i, value in enumerate(values):
+        running += value
+        if i >= window:
+            running -= values[i - window]
+        averages.append(running / min(i + 1, window))
+    return averages
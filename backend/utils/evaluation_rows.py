@@ -0,0 +1,82 @@
+"""
+Column projections and row decoding for reads from the assessment_evaluations table.
+
+User history lists default to the detail projection because the history
+pages render the essay and feedback straight from the list; callers that only
+draw rows ask for view=summary. No read selects the admin-only `full_chat`
+payload, which lives in the audit store.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+# Columns rendered in history lists and tables
+EVALUATION_SUMMARY_FIELDS = (
+    "id, short_id, user_id, question_type, grade, score, max_score, percentage, reading_marks, writing_marks, "
+    "ao1_marks, ao2_marks, ao3_marks, content_structure_marks, style_accuracy_marks, timestamp"
+)
+
+# Everything a result page needs, without the admin-only full_chat payload
+EVALUATION_DETAIL_FIELDS = (
+    EVALUATION_SUMMARY_FIELDS
+    + ", student_response, feedback, improvement_suggestions, strengths, next_steps"
+)
+
+# Columns used by the per-user analytics and recommendations
+EVALUATION_ANALYTICS_FIELDS = "id, short_id, question_type, grade, percentage, improvement_suggestions, timestamp"
+
+# Columns folded into the per-user aggregate (see services/user_stats_service.py)
+EVALUATION_STATS_FIELDS = (
+    "id, question_type, grade, score, percentage, component_marks, student_response, reading_marks, writing_marks, "
+    "ao1_marks, ao2_marks, ao3_marks, content_structure_marks, style_accuracy_marks, timestamp"
+)
+
+EVALUATION_VIEWS = {
+    "summary": EVALUATION_SUMMARY_FIELDS,
+    "full": EVALUATION_DETAIL_FIELDS,
+}
+
+def evaluation_fields_for_view(view: str) -> str:
+    """Return the select() column list for a list view ('summary' or 'full').
+    Unknown views fall back to the full projection.
+    """
+    return EVALUATION_VIEWS.get((view or "").lower(), EVALUATION_DETAIL_FIELDS)
+
+# Columns stored as JSON arrays (legacy rows hold pipe-joined strings)
+LIST_FIELDS = ("improvement_suggestions", "strengths", "next_steps")
+
+def decode_list_field(value: Any) -> Any:
+    """Normalise a list column value to a list of strings.
+
+    Native arrays are returned untouched; only legacy string values (pipe-joined
+    or JSON-encoded text) are parsed. None is passed through.
+    """
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if not text:
+        return []
+    if text.startswith('['):
+        try:
+            parsed = json.loads(text)
+            if isinstance(parsed, list):
+                return [str(item).strip() for item in parsed if str(item).strip()]
+        except ValueError:
+            pass
+    if '|' in text:
+        return [s.strip() for s in text.split('|') if s.strip()]
+    return [text]
+
+def decode_evaluation_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode the list columns of an evaluation row in place and return it."""
+    for field in LIST_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            row[field] = decode_list_field(value)
+    return row
+
+def decode_evaluation_rows(rows: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Decode the list columns of every row in a result set."""
+    rows = rows or []
+    for row in rows:
+        decode_evaluation_row(row)
+    return rows
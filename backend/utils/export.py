@@ -0,0 +1,96 @@
+"""
+Streaming CSV / NDJSON export helpers.
+
+Rows are read in keyset-paged batches and encoded batch by batch, optionally
+through an incremental gzip stream, so an export holds one batch in memory
+however many rows it covers. The generators are synchronous: StreamingResponse
+runs them in its threadpool, which keeps the blocking Supabase calls off the
+event loop.
+"""
+import csv
+import io
+import json
+import logging
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from utils.pagination import apply_keyset, build_page
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Rows fetched per keyset page while exporting
+EXPORT_BATCH_SIZE = 1000
+
+def iter_keyset_batches(build_query: Callable[[], Any], sort_column: str, id_column: str, desc: bool,
+                        batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Yield every row of a filtered query as keyset-paged batches.
+
+    build_query returns a fresh filtered query for each page, since PostgREST
+    query builders are mutated by ordering and limits.
+    """
+    cursor = None
+    while True:
+        query = apply_keyset(build_query(), sort_column, id_column, cursor, desc, batch_size)
+        rows, cursor = build_page(query.execute().data, batch_size, sort_column, id_column)
+        if rows:
+            yield rows
+        if not cursor:
+            return
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return "" if value is None else value
+
+def encode_csv(batches: Iterable[List[Dict[str, Any]]], columns: Optional[List[str]] = None) -> Iterator[bytes]:
+    """CSV with a header row; columns default to the keys of the first row."""
+    buffer = io.StringIO()
+    writer = None
+    for rows in batches:
+        if writer is None:
+            columns = columns or list(rows[0].keys())
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+        writer.writerows([_cell(row.get(column)) for column in columns] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if writer is None and columns:
+        yield (",".join(columns) + "\r\n").encode()
+
+def encode_ndjson(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """One JSON object per line."""
+    for rows in batches:
+        yield "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream incrementally into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        packed = compressor.compress(chunk)
+        if packed:
+            yield packed
+    yield compressor.flush()
+
+def export_stream(batches: Iterable[List[Dict[str, Any]]], fmt: str, gzip: bool = False,
+                  columns: Optional[List[str]] = None, label: str = "export") -> Iterator[bytes]:
+    """Encode batches as csv or ndjson, gzip them if asked, and log the outcome."""
+    total = 0
+
+    def counted() -> Iterator[List[Dict[str, Any]]]:
+        nonlocal total
+        for rows in batches:
+            total += len(rows)
+            yield rows
+
+    chunks = encode_csv(counted(), columns) if fmt == "csv" else encode_ndjson(counted())
+    if gzip:
+        chunks = gzip_stream(chunks)
+    try:
+        yield from chunks
+    except Exception as e:
+        # Headers are already sent, so the client only sees a truncated body
+        logger.error(f"❌ {label} failed after {total} rows: {e}")
+        raise
+    logger.info(f"📤 {label} streamed {total} rows as {fmt}{'.gz' if gzip else ''}")
@@ -2,7 +2,7 @@
 Grading utilities for computing overall grades and parsing marks.
 """
 import re
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from schemas.question_types import QUESTION_TOTALS
 
 def parse_marks_value(marks_text: Optional[str]) -> int:
@@ -68,3 +68,66 @@ def compute_overall_grade(question_type: str, reading_marks: Optional[str], writ
 
     total = cfg["total"]
     return f"{achieved}/{total}"
+
+def grade_percent(grade_text: Optional[str]) -> Optional[float]:
+    """Convert a grade string like '13/25' into a percentage (52.0).
+    Returns None when the grade has no 'achieved/total' pair.
+    """
+    match = re.search(r"(\d+)\s*/\s*(\d+)", str(grade_text or ""))
+    if not match:
+        return None
+    total = int(match.group(2))
+    return int(match.group(1)) / total * 100.0 if total else None
+
+# Mark columns stored as text on assessment_evaluations, keyed by component name
+MARK_COLUMNS = {
+    "reading": "reading_marks",
+    "writing": "writing_marks",
+    "ao1": "ao1_marks",
+    "ao2": "ao2_marks",
+    "ao3": "ao3_marks",
+    "content_structure": "content_structure_marks",
+    "style_accuracy": "style_accuracy_marks",
+}
+
+def parse_score_pair(text: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """Parse '24/40', '24 out of 40' or '24' into (score, max_score).
+    Either part is None when it is not present.
+    """
+    value = str(text or "")
+    match = re.search(r"(\d+(?:\.\d+)?)\s*(?:/|out of)\s*(\d+(?:\.\d+)?)", value)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    match = re.search(r"\d+(?:\.\d+)?", value)
+    return (float(match.group(0)), None) if match else (None, None)
+
+def numeric_grade_fields(grade: Optional[str], marks: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """Numeric columns stored next to the text grade: score, max_score,
+    percentage and component_marks ({component: score}).
+
+    `marks` maps mark column names (e.g. 'reading_marks') to their text values.
+    """
+    score, max_score = parse_score_pair(grade)
+    if max_score is None:
+        # A bare number is not a grade we can place on a scale
+        score = None
+    component_marks = {}
+    for component, column in MARK_COLUMNS.items():
+        component_score, _ = parse_score_pair(marks.get(column))
+        if component_score is not None:
+            component_marks[component] = component_score
+    return {
+        "score": score,
+        "max_score": max_score,
+        "percentage": round(score / max_score * 100.0, 2) if score is not None and max_score else None,
+        "component_marks": component_marks,
+    }
+
+def evaluation_percent(evaluation: Dict[str, Any]) -> Optional[float]:
+    """Grade percentage of an evaluation row, preferring the stored numeric column.
+    Rows written before the numeric columns existed fall back to parsing the grade.
+    """
+    percentage = evaluation.get("percentage")
+    if percentage is not None:
+        return float(percentage)
+    return grade_percent(evaluation.get("grade"))
@@ -0,0 +1,55 @@
+"""
+Host-wide lease for work that one worker per host should do.
+
+Every worker started by launcher.py runs the same startup hook. The worker
+that takes an exclusive flock on the lease file runs the periodic jobs; the
+others retry every `poll_seconds`. The lock belongs to the process, so the
+operating system releases it when the holder exits or is recycled, and
+another worker takes over on its next attempt.
+
+Where fcntl is unavailable (Windows development), every process holds the
+lease.
+"""
+import asyncio
+import logging
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class HostLease:
+    """Non-blocking exclusive lock on a file, held until the process exits."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    async def wait(self, poll_seconds: float) -> None:
+        """Return once this process holds the lease."""
+        while not self.try_acquire():
+            await asyncio.sleep(poll_seconds)
+        logger.info(f"🔒 Worker {os.getpid()} holds the background job lease ({self.path})")
@@ -0,0 +1,42 @@
+"""
+Pooled outbound HTTP client.
+
+One httpx.AsyncClient per worker process keeps connections to the model
+providers alive between calls instead of paying a TCP and TLS handshake for
+every evaluation. The client is opened by the app's startup hook and closed
+by its shutdown hook; it is never created at import time, so a preloaded app
+does not hand one process's sockets to the workers it forks.
+"""
+import logging
+import os
+from typing import Optional
+import httpx
+from config.settings import HTTP_POOL_MAX_CONNECTIONS, HTTP_POOL_MAX_KEEPALIVE, LLM_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_pid: Optional[int] = None
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0),
+        limits=httpx.Limits(max_connections=HTTP_POOL_MAX_CONNECTIONS, max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE)
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """This worker's pooled client, created on first use if the startup hook has not run."""
+    global _client, _client_pid
+    if _client is None or _client.is_closed or _client_pid != os.getpid():
+        _client, _client_pid = _new_client(), os.getpid()
+    return _client
+
+async def start_http_client() -> None:
+    get_http_client()
+    logger.info(f"🌐 HTTP client pool ready in worker {os.getpid()}")
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None and _client_pid == os.getpid() and not _client.is_closed:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,73 @@
+"""
+HyperLogLog sketch for approximate distinct counts.
+
+Used by the dashboard rollups to count distinct users per day/type/plan cell
+and to merge cells into distinct counts over any range (merging is an
+element-wise max of registers). With the default precision of 12 bits a sketch
+is 4 KiB and the standard error is about 1.6%.
+"""
+import base64
+import hashlib
+import math
+from typing import Iterable, Optional
+
+DEFAULT_PRECISION = 12
+
+class HyperLogLog:
+    """Mergeable approximate distinct counter."""
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytearray] = None):
+        self.precision = precision
+        size = 1 << precision
+        self.registers = registers if registers is not None else bytearray(size)
+        if len(self.registers) != size:
+            raise ValueError(f"Expected {size} registers, got {len(self.registers)}")
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add(self, value: str) -> None:
+        """Add one element (any string, e.g. a user id)."""
+        hashed = self._hash(str(value))
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct elements added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_text(self) -> str:
+        """Serialise for storage in a text column."""
+        return base64.b64encode(bytes(self.registers)).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text: Optional[str], precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        """Inverse of to_text; empty input gives an empty sketch."""
+        if not text:
+            return cls(precision)
+        return cls(precision, bytearray(base64.b64decode(text)))
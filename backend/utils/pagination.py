@@ -0,0 +1,83 @@
+"""
+Keyset (cursor) pagination helpers for PostgREST queries.
+
+Pages are ordered on a (sort_column, id_column) pair and the cursor encodes
+the last row's values, so fetching page N costs the same as page 1 instead
+of scanning and discarding `offset` rows.
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+
+# PostgREST count strategies: exact runs COUNT(*), planned uses the query
+# planner estimate, estimated is exact for small results and planned above.
+COUNT_MODES = {"exact", "planned", "estimated"}
+
+MAX_PAGE_SIZE = 500
+
+# PostgREST's default max-rows: a response never holds more rows than this, so keyset
+# pages (limit plus the look-ahead row) are kept below it
+POSTGREST_MAX_ROWS = 1000
+
+def _fetch_limit(limit: int) -> int:
+    return max(1, min(limit, POSTGREST_MAX_ROWS - 1))
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """Encode the last row's sort value and id into an opaque URL-safe cursor."""
+    raw = json.dumps([sort_value, row_id], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode a cursor produced by encode_cursor, raising 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if sort_value is None or row_id is None:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return sort_value, row_id
+
+def _quote(value: Any) -> str:
+    """Quote a value for use inside a PostgREST logical (or/and) filter."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+def count_option(count_mode: str) -> Optional[str]:
+    """Map a count query parameter to a PostgREST count option (None skips counting)."""
+    mode = (count_mode or "").lower()
+    return mode if mode in COUNT_MODES else None
+
+def clamp_page_size(limit: int) -> int:
+    """Keep page sizes within sane bounds."""
+    return max(1, min(limit or 1, MAX_PAGE_SIZE))
+
+def apply_keyset(query, sort_column: str, id_column: str, cursor: Optional[str], desc: bool, limit: int):
+    """Apply keyset ordering, the cursor predicate and limit+1 to a query.
+
+    One extra row is requested so callers can tell whether a next page exists
+    without a count. Limits at or above POSTGREST_MAX_ROWS are lowered so that
+    row still fits in the response; build_page applies the same bound.
+    """
+    limit = _fetch_limit(limit)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        op = "lt" if desc else "gt"
+        query = query.or_(
+            f"{sort_column}.{op}.{_quote(sort_value)},"
+            f"and({sort_column}.eq.{_quote(sort_value)},{id_column}.{op}.{_quote(row_id)})"
+        )
+    return query.order(sort_column, desc=desc).order(id_column, desc=desc).limit(limit + 1)
+
+def build_page(rows: Optional[List[Dict[str, Any]]], limit: int, sort_column: str, id_column: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim the extra look-ahead row and return (page_rows, next_cursor)."""
+    limit = _fetch_limit(limit)
+    rows = rows or []
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    if last.get(sort_column) is None or last.get(id_column) is None:
+        return page, None
+    return page, encode_cursor(last[sort_column], last[id_column])
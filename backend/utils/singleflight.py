@@ -0,0 +1,44 @@
+"""
+Single-flight execution for async work.
+
+Concurrent callers asking for the same key share one in-flight task instead of
+each starting their own (e.g. one LLM call for many simultaneous dashboard loads).
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Deduplicate concurrent async calls by key."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def _start(self, key: Hashable, fn: Callable[[], Awaitable[Any]], background: bool = False) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, key=key: self._inflight.pop(key, None))
+            if background:
+                task.add_done_callback(self._log_failure)
+        return task
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() for key, or wait for the call already running for it."""
+        # shield: a cancelled waiter must not cancel the shared task
+        return await asyncio.shield(self._start(key, fn))
+
+    def spawn(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start fn() in the background unless a call for key is already running."""
+        return self._start(key, fn, background=True)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background task failed: {task.exception()}")
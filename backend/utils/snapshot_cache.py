@@ -0,0 +1,99 @@
+"""
+Stale-while-revalidate snapshot cache for expensive, read-mostly payloads.
+
+Each key holds the last computed payload with its `as_of` time and an ETag.
+Readers always get the cached snapshot when one exists; a snapshot older than
+the refresh interval triggers one background recompute. Only the very first
+read of a key waits for the computation. `run_periodically` keeps recently
+read keys warm so admins rarely see an aged snapshot.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Snapshot:
+    value: Any
+    as_of: str
+    etag: str
+    computed_at: float
+
+def payload_etag(value: Any) -> str:
+    """Strong ETag derived from the payload content."""
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches the current ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+class SnapshotCache:
+    """Per-key snapshots computed by an async function and refreshed off the request path."""
+
+    def __init__(self, compute: Callable[[Hashable], Awaitable[Any]], refresh_interval: float, max_keys: int = 16, keep_warm_for: float = 3600):
+        self.compute = compute
+        self.refresh_interval = refresh_interval
+        # Least recently read keys are dropped beyond this many
+        self.max_keys = max_keys
+        # The periodic refresher skips keys nobody has read for this long
+        self.keep_warm_for = keep_warm_for
+        self._snapshots: "OrderedDict[Hashable, Snapshot]" = OrderedDict()
+        self._last_read: dict = {}
+        self._flights = SingleFlight()
+
+    async def _refresh(self, key: Hashable) -> Snapshot:
+        started = time.monotonic()
+        value = await self.compute(key)
+        snapshot = Snapshot(
+            value=value,
+            as_of=datetime.utcnow().isoformat() + "Z",
+            etag=payload_etag(value),
+            computed_at=time.monotonic()
+        )
+        self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_keys:
+            evicted, _ = self._snapshots.popitem(last=False)
+            self._last_read.pop(evicted, None)
+        logger.info(f"📸 Snapshot {key!r} recomputed in {time.monotonic() - started:.2f}s")
+        return snapshot
+
+    def is_stale(self, snapshot: Snapshot) -> bool:
+        return time.monotonic() - snapshot.computed_at >= self.refresh_interval
+
+    async def get(self, key: Hashable) -> Snapshot:
+        """Return the snapshot for key, computing it only if none exists yet."""
+        self._last_read[key] = time.monotonic()
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return await self._flights.do(key, lambda: self._refresh(key))
+        self._snapshots.move_to_end(key)
+        if self.is_stale(snapshot):
+            self._flights.spawn(key, lambda: self._refresh(key))
+        return snapshot
+
+    async def run_periodically(self) -> None:
+        """Refresh recently read keys every refresh interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            now = time.monotonic()
+            for key in list(self._snapshots):
+                if now - self._last_read.get(key, 0) > self.keep_warm_for:
+                    continue
+                try:
+                    await self._flights.do(key, lambda key=key: self._refresh(key))
+                except Exception as e:
+                    logger.error(f"❌ Snapshot refresh failed for {key!r}: {e}")
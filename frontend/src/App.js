@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useRef, lazy } from 'react';
+import React, { useState, useEffect, useRef, useCallback, lazy } from 'react';
 import './App.css';
 import { Routes, Route, useNavigate, useLocation } from 'react-router-dom';
 import { Toaster } from 'react-hot-toast';
@@ -10,6 +10,8 @@ import { usePreferences } from './hooks/usePreferences';
 
 // Import services
 import { submitFeedback } from './services/feedback';
+import { getEvaluationPage } from './services/evaluations';
+import { getUserStats } from './services/analytics';
 import api, { debugPendingRequests, debugAllRequests } from './services/api';
 import { getApiUrl } from './utils/backendUrl';
 import { supabase } from './supabaseClient';
@@ -182,6 +184,13 @@ const App = () => {
   const [loadingMessageIndex, setLoadingMessageIndex] = useState(0);
   const [evaluations, setEvaluations] = useState(null);  // Changed from [] to null to detect loading state
   const [evaluationsLoading, setEvaluationsLoading] = useState(true);
+  const [evaluationsTotal, setEvaluationsTotal] = useState(null);
+  const [evaluationsCursor, setEvaluationsCursor] = useState(null);
+  const [loadingMoreEvaluations, setLoadingMoreEvaluations] = useState(false);
+  const loadingMoreEvaluationsRef = useRef(false);
+  // Aggregate stats row from /analytics (unlimited plan only); counts come from here, not from loaded pages
+  const [evaluationStats, setEvaluationStats] = useState(null);
+  const [evaluationStatsVersion, setEvaluationStatsVersion] = useState(0);
 
   const navigate = useNavigate();
   
@@ -254,8 +263,8 @@ const App = () => {
             });
           }, 15000);
           
-          // Fetch evaluations using the evaluations service with timeout
-          const evalResponse = await api.get(`/evaluations/user/${user.id}`, {
+          // Fetch the first page only; later pages are loaded on demand
+          const page = await getEvaluationPage(user.id, {}, {
             signal: controller.signal,
             timeout: 15000
           });
@@ -263,20 +272,17 @@ const App = () => {
           clearTimeout(timeoutId);
           const duration = Date.now() - startTime;
           
-          console.log(`✅ Evaluations loaded: ${evalResponse.data?.evaluations?.length || 0} items in ${duration}ms`);
+          console.log(`✅ Evaluations loaded: ${page.evaluations.length} of ${page.total} items in ${duration}ms`);
           
           // Performance monitoring - log slow requests
           if (duration > 3000) {
             console.warn(`⚠️ Slow evaluations fetch: ${duration}ms for user ${user.id}`);
           }
           
-          if (evalResponse.data?.evaluations) {
-            setEvaluations(evalResponse.data.evaluations);
-            console.log(`✅ Set ${evalResponse.data.evaluations.length} evaluations in state`);
-          } else {
-            setEvaluations([]);
-            console.log(`⚠️ No evaluations in response, set to empty array`);
-          }
+          setEvaluations(page.evaluations);
+          setEvaluationsTotal(page.total ?? page.evaluations.length);
+          setEvaluationsCursor(page.nextCursor);
+          console.log(`✅ Set ${page.evaluations.length} evaluations in state`);
         } catch (error) {
           if (error.name === 'AbortError') {
             console.warn('⏰ Evaluations fetch was aborted due to timeout');
@@ -285,6 +291,8 @@ const App = () => {
             console.error('❌ Error fetching evaluations:', error);
             setEvaluations([]);
           }
+          setEvaluationsTotal(null);
+          setEvaluationsCursor(null);
         } finally {
           setEvaluationsLoading(false);
         }
@@ -296,6 +304,37 @@ const App = () => {
     fetchEvaluations();
   }, [user]);
 
+  // Load the next page of evaluations (History scrolling, wider Analytics ranges)
+  const loadMoreEvaluations = useCallback(async () => {
+    if (!user?.id || !evaluationsCursor || loadingMoreEvaluationsRef.current) return;
+    loadingMoreEvaluationsRef.current = true;
+    setLoadingMoreEvaluations(true);
+    try {
+      const page = await getEvaluationPage(user.id, { cursor: evaluationsCursor });
+      setEvaluations(prev => [...(prev || []), ...page.evaluations]);
+      setEvaluationsCursor(page.nextCursor);
+      console.log(`✅ Loaded ${page.evaluations.length} more evaluations`);
+    } catch (error) {
+      console.error('❌ Error loading more evaluations:', error);
+    } finally {
+      loadingMoreEvaluationsRef.current = false;
+      setLoadingMoreEvaluations(false);
+    }
+  }, [user?.id, evaluationsCursor]);
+
+  // Fetch the aggregate stats row for users with analytics access
+  useEffect(() => {
+    if (!user?.id || userStats?.current_plan !== 'unlimited') {
+      setEvaluationStats(null);
+      return;
+    }
+    let cancelled = false;
+    getUserStats(user.id)
+      .then(stats => { if (!cancelled) setEvaluationStats(stats); })
+      .catch(error => console.error('❌ Error fetching evaluation stats:', error));
+    return () => { cancelled = true; };
+  }, [user?.id, userStats?.current_plan, evaluationStatsVersion]);
+
   // Set academic level from userStats when available
   useEffect(() => {
     if (userStats?.academicLevel && userStats.academicLevel !== 'N/A') {
@@ -557,7 +596,9 @@ const App = () => {
       console.log(`📊 Response parsing: ${parseTime}ms`);
       
       setEvaluation(responseData);
-      setEvaluations(prev => [responseData, ...prev]);
+      setEvaluations(prev => [responseData, ...(prev || [])]);
+      setEvaluationsTotal(prev => (prev === null ? prev : prev + 1));
+      setEvaluationStatsVersion(version => version + 1);
       
       // Refresh user data to get updated questions marked counter from backend
       try {
@@ -887,6 +928,11 @@ const App = () => {
             <LazyWrapper fallback={<PageSkeleton />}>
               <HistoryPage 
                 evaluations={evaluations}
+                evaluationsTotal={evaluationsTotal}
+                evaluationStats={evaluationStats}
+                hasMoreEvaluations={!!evaluationsCursor}
+                loadingMoreEvaluations={loadingMoreEvaluations}
+                onLoadMore={loadMoreEvaluations}
                 onBack={handleBack}
                 userPlan={userStats?.currentPlan || 'free'}
                 userStats={userStats}
@@ -913,6 +959,11 @@ const App = () => {
                 userStats={userStats || {}}
                 user={user}
                 evaluations={evaluations}
+                evaluationsTotal={evaluationsTotal}
+                evaluationStats={evaluationStats}
+                hasMoreEvaluations={!!evaluationsCursor}
+                loadingMoreEvaluations={loadingMoreEvaluations}
+                onLoadMore={loadMoreEvaluations}
                 onBack={handleBack}
                 onUpgrade={() => navigate('/pricing')}
               />
@@ -181,7 +181,22 @@ const LockedAnalyticsPage = ({ onBack, upgradeType, page = 'analytics' }) => {
 };
 
 // Analytics Dashboard
-const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade }) => {
+// Days covered by each time range option
+const RANGE_DAYS = { week: 7, month: 30, quarter: 90, year: 365 };
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+const AnalyticsDashboard = ({
+  onBack,
+  userStats,
+  user,
+  evaluations,
+  evaluationsTotal,
+  evaluationStats,
+  hasMoreEvaluations,
+  loadingMoreEvaluations,
+  onLoadMore,
+  onUpgrade
+}) => {
   console.log('🚀 [AnalyticsDashboard] Component initialized with props:', {
     userStats,
     user: user ? { id: user.id, email: user.email } : null,
@@ -197,6 +212,9 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
   const [analyticsData, setAnalyticsData] = useState(null);
   const [lastFetchedCount, setLastFetchedCount] = useState(0);
 
+  // Counts come from the stats row; the loaded pages only cover the selected range
+  const totalEvaluations = evaluationStats?.total_evaluations ?? evaluationsTotal ?? evaluations?.length ?? 0;
+
   console.log('📊 [AnalyticsDashboard] State initialized:', {
     selectedTimeRange,
     activeTab,
@@ -224,7 +242,7 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
 
   // Check if new insights are available (dynamic - 5 assessments after last fetch)
   const shouldShowInsightsButton = useMemo(() => {
-    const currentCount = evaluations?.length || 0;
+    const currentCount = totalEvaluations;
     
     console.log('💡 [AnalyticsDashboard] Insights button calculation:', {
       currentCount,
@@ -267,7 +285,7 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
     });
     
     return shouldShow;
-  }, [evaluations?.length, lastFetchedCount, aiRecommendations]);
+  }, [totalEvaluations, lastFetchedCount, aiRecommendations]);
 
   // Calculate when next insights will be available
   const nextInsightCount = useMemo(() => {
@@ -303,7 +321,7 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
     
     try {
       console.log('🚀 [AI Insights] Starting AI insights fetch for user:', user.id);
-      console.log('📊 [AI Insights] Current evaluations count:', evaluations?.length || 0);
+      console.log('📊 [AI Insights] Current evaluations count:', totalEvaluations);
       console.log('📊 [AI Insights] Last fetched count:', lastFetchedCount);
       
       const startTime = Date.now();
@@ -338,12 +356,12 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
       console.log('🔄 [AI Insights] Updating state with new data...');
       setAnalyticsData(data?.analytics);
       setAiRecommendations(data?.analytics?.recommendations);
-      setLastFetchedCount(evaluations?.length || 0);
+      setLastFetchedCount(data?.analytics?.total_responses ?? totalEvaluations);
       
       console.log('✅ [AI Insights] State updated successfully:', {
         newAnalyticsData: !!data?.analytics,
         newRecommendations: !!data?.analytics?.recommendations,
-        newLastFetchedCount: evaluations?.length || 0,
+        newLastFetchedCount: data?.analytics?.total_responses ?? totalEvaluations,
         recommendationsCount: data?.analytics?.recommendations?.length || 0
       });
       
@@ -374,6 +392,14 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
     }
   };
 
+  // Load older pages until the loaded evaluations cover the selected range
+  useEffect(() => {
+    if (!hasMoreEvaluations || loadingMoreEvaluations || !onLoadMore || !evaluations?.length) return;
+    const rangeStart = Date.now() - RANGE_DAYS[selectedTimeRange] * DAY_MS;
+    const oldestLoaded = new Date(evaluations[evaluations.length - 1].timestamp).getTime();
+    if (oldestLoaded >= rangeStart) onLoadMore();
+  }, [evaluations, hasMoreEvaluations, loadingMoreEvaluations, onLoadMore, selectedTimeRange]);
+
   // If user doesn't have unlimited access, show locked page
   if (!hasUnlimitedAccess) {
     return <LockedAnalyticsPage onBack={onBack} page="analytics" />;
@@ -501,12 +527,12 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
   const COLORS = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#14b8a6'];
 
   // Range filter + nicer view data
-  const daysForRange = selectedTimeRange === 'week' ? 7 : selectedTimeRange === 'month' ? 30 : selectedTimeRange === 'quarter' ? 90 : null;
-  const cutoff = daysForRange ? new Date(Date.now() - daysForRange * 24 * 60 * 60 * 1000) : null;
-  const viewEvaluations = cutoff ? parsedEvaluations.filter(e => {
+  const daysForRange = RANGE_DAYS[selectedTimeRange];
+  const cutoff = new Date(Date.now() - daysForRange * DAY_MS);
+  const viewEvaluations = parsedEvaluations.filter(e => {
     const d = new Date(e.dateKey);
     return d >= cutoff;
-  }) : parsedEvaluations;
+  });
 
   const viewByDate = Object.values(viewEvaluations.reduce((acc, e) => {
     if (!acc[e.dateKey]) acc[e.dateKey] = { date: e.dateKey, total: 0, count: 0 };
@@ -964,7 +990,7 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
 
               {shouldShowInsightsButton ? (
                 <div className="bg-white/80 backdrop-blur-sm rounded-xl p-12 text-center">
-                  {evaluations && evaluations.length < 5 ? (
+                  {totalEvaluations < 5 ? (
                     <>
                       <ChartBarIcon className="w-16 h-16 text-purple-500 mx-auto mb-6" />
                       <h4 className="text-2xl font-bold text-gray-900 mb-3 font-fredoka">Complete More Assessments</h4>
@@ -973,16 +999,16 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
                       </p>
                       <div className="flex items-center justify-center gap-2 mb-4">
                         <div className="text-sm text-gray-500">
-                          Progress: <span className="font-bold text-purple-600">{evaluations.length} / 5</span> assessments
+                          Progress: <span className="font-bold text-purple-600">{totalEvaluations} / 5</span> assessments
           </div>
                       </div>
                       <div className="w-full bg-gray-200 rounded-full h-4 max-w-md mx-auto shadow-inner">
                         <div 
                           className="bg-gradient-to-r from-purple-500 to-pink-500 h-4 rounded-full transition-all duration-500 flex items-center justify-end pr-2"
-                          style={{ width: `${(evaluations.length / 5) * 100}%` }}
+                          style={{ width: `${(totalEvaluations / 5) * 100}%` }}
                         >
-                          {evaluations.length > 0 && (
-                            <span className="text-white text-xs font-bold">{Math.round((evaluations.length / 5) * 100)}%</span>
+                          {totalEvaluations > 0 && (
+                            <span className="text-white text-xs font-bold">{Math.round((totalEvaluations / 5) * 100)}%</span>
                           )}
                         </div>
                       </div>
@@ -997,14 +1023,14 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
                       </h4>
                       <p className="text-gray-600 mb-4 max-w-lg mx-auto">
                         {aiRecommendations 
-                          ? `You've completed ${(evaluations?.length || 0) - lastFetchedCount} new assessments since your last analysis (at ${lastFetchedCount}). Generate fresh insights now!`
-                          : `Our advanced AI will analyze your ${evaluations?.length || 0} assessments and provide personalized recommendations to help you improve.`
+                          ? `You've completed ${totalEvaluations - lastFetchedCount} new assessments since your last analysis (at ${lastFetchedCount}). Generate fresh insights now!`
+                          : `Our advanced AI will analyze your ${totalEvaluations} assessments and provide personalized recommendations to help you improve.`
                         }
                       </p>
                       {aiRecommendations && (
                         <div className="mb-6 inline-block bg-purple-100 px-4 py-2 rounded-full">
                           <p className="text-sm text-purple-700 font-medium">
-                            <span className="font-bold">{evaluations?.length}</span> total assessments | Last analyzed: <span className="font-bold">{lastFetchedCount}</span>
+                            <span className="font-bold">{totalEvaluations}</span> total assessments | Last analyzed: <span className="font-bold">{lastFetchedCount}</span>
                           </p>
                         </div>
                       )}
@@ -1032,7 +1058,7 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
                     </div>
                   </div>
                   <h4 className="text-xl font-bold text-gray-900 mb-2 font-fredoka">Analyzing Your Performance</h4>
-                  <p className="text-gray-600 mb-4">Our AI is reviewing your {evaluations?.length || 0} assessments...</p>
+                  <p className="text-gray-600 mb-4">Our AI is reviewing your {totalEvaluations} assessments...</p>
                   <div className="flex flex-col gap-2 text-sm text-gray-500 max-w-md mx-auto">
                     <div className="flex items-center gap-2 justify-center">
                       <div className="w-2 h-2 bg-purple-500 rounded-full animate-pulse"></div>
@@ -1059,7 +1085,7 @@ const AnalyticsDashboard = ({ onBack, userStats, user, evaluations, onUpgrade })
                           Based on {lastFetchedCount} assessments
                           {!shouldShowInsightsButton && (
                             <span className="ml-1">
-                              • Next update at {nextInsightCount} ({nextInsightCount - (evaluations?.length || 0)} more needed)
+                              • Next update at {nextInsightCount} ({nextInsightCount - totalEvaluations} more needed)
                             </span>
                           )}
                         </p>
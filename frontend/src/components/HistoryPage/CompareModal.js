@@ -1,10 +1,13 @@
 import React from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
+import { useEvaluationDetail } from '../../hooks/useEvaluationDetail';
 
 const CompareModal = ({ evaluations, isOpen, onClose, parseFeedbackToBullets, getSubmarks }) => {
-  if (!isOpen || evaluations.length !== 2) return null;
-
-  const [a, b] = evaluations;
+  // Compared rows come from the summary list; both detail rows are fetched when the modal opens
+  const open = isOpen && evaluations.length === 2;
+  const { evaluation: a } = useEvaluationDetail(evaluations[0], open);
+  const { evaluation: b } = useEvaluationDetail(evaluations[1], open);
+  if (!open) return null;
 
   const StrengthsDiffChip = ({ a, b }) => {
     const aScore = parseInt(a.grade?.match(/\d+/)?.[0] || '0');
@@ -2,8 +2,11 @@ import React from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { getSubmarks } from '../../utils/submarks';
 import { formatQuestionTypeName } from '../../utils/questionTypeFormatter';
+import { useEvaluationDetail } from '../../hooks/useEvaluationDetail';
 
-const EvaluationDetailModal = ({ evaluation, isOpen, onClose, parseFeedbackToBullets }) => {
+const EvaluationDetailModal = ({ evaluation: row, isOpen, onClose, parseFeedbackToBullets }) => {
+  // History rows are summaries; the essay and feedback are fetched when the modal opens
+  const { evaluation } = useEvaluationDetail(row, isOpen);
   if (!isOpen || !evaluation) return null;
 
   return (
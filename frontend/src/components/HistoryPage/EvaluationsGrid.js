@@ -55,9 +55,11 @@ const EvaluationsGrid = ({ evaluations, viewMode, onSelectEvaluation, onSelectFo
               </div>
             </div>
             
-            <div className="text-sm text-gray-600 line-clamp-2">
-              {evaluation.student_response?.substring(0, 200)}...
-            </div>
+            {evaluation.student_response && (
+              <div className="text-sm text-gray-600 line-clamp-2">
+                {evaluation.student_response.substring(0, 200)}...
+              </div>
+            )}
           </motion.div>
         ))}
       </div>
@@ -104,9 +106,11 @@ const EvaluationsGrid = ({ evaluations, viewMode, onSelectEvaluation, onSelectFo
             </div>
           </div>
           
-          <div className="text-sm text-gray-600 line-clamp-3 mb-4">
-            {evaluation.student_response?.substring(0, 150)}...
-          </div>
+          {evaluation.student_response && (
+            <div className="text-sm text-gray-600 line-clamp-3 mb-4">
+              {evaluation.student_response.substring(0, 150)}...
+            </div>
+          )}
 
           {/* Submarks */}
           <div className="flex flex-wrap gap-2">
@@ -1,44 +1,21 @@
-import React, { useState, useEffect } from 'react';
+import React, { useMemo } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import EvaluationDetailModal from './EvaluationDetailModal';
 import { formatQuestionTypeName } from '../../utils/questionTypeFormatter';
+import { useEvaluationDetail } from '../../hooks/useEvaluationDetail';
 
 const HistoryDetailPage = ({ evaluations, onBack, userPlan }) => {
   const { shortId } = useParams();
   const navigate = useNavigate();
-  const [evaluation, setEvaluation] = useState(null);
-  const [loading, setLoading] = useState(true);
 
-  useEffect(() => {
-    // Find the evaluation by short_id
-    const foundEvaluation = evaluations.find(evaluation => evaluation.short_id === shortId);
-    if (foundEvaluation) {
-      setEvaluation(foundEvaluation);
-      setLoading(false);
-    } else {
-      // If not found in current evaluations, try to fetch from API
-      fetchEvaluationFromAPI();
-    }
-  }, [shortId, evaluations]);
-
-  const fetchEvaluationFromAPI = async () => {
-    try {
-      const response = await fetch(`/api/evaluations/${shortId}`);
-      if (response.ok) {
-        const data = await response.json();
-        setEvaluation(data);
-      } else {
-        // Evaluation not found, redirect to history
-        navigate('/history');
-      }
-    } catch (error) {
-      console.error('Error fetching evaluation:', error);
-      navigate('/history');
-    } finally {
-      setLoading(false);
-    }
-  };
+  // The loaded history holds summary rows; the essay and feedback come from /evaluations/{short_id}
+  const summary = useMemo(
+    () => evaluations?.find(evaluation => evaluation.short_id === shortId) || { short_id: shortId },
+    [evaluations, shortId]
+  );
+  const { evaluation: detail, loading, found } = useEvaluationDetail(summary);
+  const evaluation = found ? detail : null;
 
   const parseFeedbackToBullets = (feedback) => {
     if (!feedback) return [];
@@ -1,4 +1,4 @@
-import React, { useState, useMemo } from 'react';
+import React, { useState, useMemo, useEffect, useRef } from 'react';
 import { motion } from 'framer-motion';
 import { useNavigate } from 'react-router-dom';
 import Footer from '../ui/Footer';
@@ -71,7 +71,17 @@ const LockedAnalyticsPage = ({ onBack, upgradeType, page = 'analytics' }) => {
 };
 
 // History Page
-const HistoryPage = ({ onBack, evaluations, userPlan, userStats }) => {
+const HistoryPage = ({
+  onBack,
+  evaluations,
+  evaluationsTotal,
+  evaluationStats,
+  hasMoreEvaluations,
+  loadingMoreEvaluations,
+  onLoadMore,
+  userPlan,
+  userStats
+}) => {
   const navigate = useNavigate();
   const [searchTerm, setSearchTerm] = useState('');
   const [filterType, setFilterType] = useState('all');
@@ -81,6 +91,7 @@ const HistoryPage = ({ onBack, evaluations, userPlan, userStats }) => {
   const [showCompare, setShowCompare] = useState(false);
   const [selectedEvaluation, setSelectedEvaluation] = useState(null);
   const [showDetailModal, setShowDetailModal] = useState(false);
+  const loadMoreRef = useRef(null);
 
   // Check if user has unlimited access - consistent with other components
   const hasUnlimitedAccess = useMemo(() => {
@@ -99,12 +110,11 @@ const HistoryPage = ({ onBack, evaluations, userPlan, userStats }) => {
     if (!evaluations) return [];
 
     let filtered = evaluations.filter(evaluation => {
-      // Search filter
+      // Search filter (list rows are summaries, so the essay and feedback text are not searched)
       const matchesSearch = !searchTerm || 
-        evaluation.student_response?.toLowerCase().includes(searchTerm.toLowerCase()) ||
         evaluation.question_type?.toLowerCase().includes(searchTerm.toLowerCase()) ||
         evaluation.grade?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        evaluation.feedback?.toLowerCase().includes(searchTerm.toLowerCase());
+        evaluation.short_id?.toLowerCase().includes(searchTerm.toLowerCase());
 
       // Type filter
       const matchesType = filterType === 'all' || 
@@ -136,6 +146,36 @@ const HistoryPage = ({ onBack, evaluations, userPlan, userStats }) => {
     return filtered;
   }, [evaluations, searchTerm, filterType, sortBy]);
 
+  // Search and type filters only see the pages loaded so far
+  const isFiltered = !!searchTerm || filterType !== 'all';
+
+  // Load the next page when the end of the list scrolls into view
+  useEffect(() => {
+    const sentinel = loadMoreRef.current;
+    if (!sentinel || !hasMoreEvaluations || isFiltered || !onLoadMore) return;
+    const observer = new IntersectionObserver(entries => {
+      if (entries[0].isIntersecting) onLoadMore();
+    }, { rootMargin: '400px' });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [hasMoreEvaluations, isFiltered, onLoadMore, evaluations?.length]);
+
+  // Totals come from the stats row (or the list endpoint's count) unless a filter narrows the loaded pages
+  const totalEssays = isFiltered
+    ? filteredAndSortedEvaluations.length
+    : evaluationStats?.total_evaluations ?? evaluationsTotal ?? filteredAndSortedEvaluations.length;
+  const averagePercent = useMemo(() => {
+    if (!isFiltered && typeof evaluationStats?.average_percent === 'number') {
+      return Math.round(evaluationStats.average_percent);
+    }
+    const percents = filteredAndSortedEvaluations
+      .map(evaluation => Number(evaluation.percentage))
+      .filter(percent => Number.isFinite(percent));
+    return percents.length > 0
+      ? Math.round(percents.reduce((sum, percent) => sum + percent, 0) / percents.length)
+      : 0;
+  }, [isFiltered, evaluationStats, filteredAndSortedEvaluations]);
+
   // If user doesn't have unlimited access, show locked page
   if (!hasUnlimitedAccess) {
     return <LockedAnalyticsPage onBack={onBack} page="history" />;
@@ -246,19 +286,11 @@ const HistoryPage = ({ onBack, evaluations, userPlan, userStats }) => {
             <div className="flex flex-wrap items-center justify-between gap-4">
               <div className="flex items-center gap-6">
                 <div className="text-center">
-                  <div className="text-2xl font-bold text-purple-600">{filteredAndSortedEvaluations.length}</div>
+                  <div className="text-2xl font-bold text-purple-600">{totalEssays}</div>
                   <div className="text-sm text-gray-600">Total Essays</div>
                 </div>
                 <div className="text-center">
-                  <div className="text-2xl font-bold text-green-600">
-                    {filteredAndSortedEvaluations.length > 0 
-                      ? Math.round(filteredAndSortedEvaluations.reduce((sum, evaluation) => {
-                          const grade = parseInt(evaluation.grade?.match(/\d+/)?.[0] || '0');
-                          return sum + grade;
-                        }, 0) / filteredAndSortedEvaluations.length)
-                      : 0
-                    }
-                  </div>
+                  <div className="text-2xl font-bold text-green-600">{averagePercent}%</div>
                   <div className="text-sm text-gray-600">Average Score</div>
                 </div>
                 <div className="text-center">
@@ -293,15 +325,31 @@ const HistoryPage = ({ onBack, evaluations, userPlan, userStats }) => {
             <p className="text-gray-600">Getting your evaluation history ready</p>
           </div>
         ) : hasEvaluations ? (
-          <EvaluationsGrid
-            evaluations={filteredAndSortedEvaluations}
-            viewMode={viewMode}
-            onSelectEvaluation={handleSelectEvaluation}
-            onSelectForCompare={handleSelectForCompare}
-            selectedForCompare={selectedForCompare}
-            parseFeedbackToBullets={parseFeedbackToBullets}
-            getSubmarks={getSubmarks}
-          />
+          <>
+            <EvaluationsGrid
+              evaluations={filteredAndSortedEvaluations}
+              viewMode={viewMode}
+              onSelectEvaluation={handleSelectEvaluation}
+              onSelectForCompare={handleSelectForCompare}
+              selectedForCompare={selectedForCompare}
+              parseFeedbackToBullets={parseFeedbackToBullets}
+              getSubmarks={getSubmarks}
+            />
+            {hasMoreEvaluations && (
+              <div ref={loadMoreRef} className="text-center py-8">
+                {loadingMoreEvaluations ? (
+                  <p className="text-gray-600">Loading more essays...</p>
+                ) : (
+                  <button
+                    onClick={onLoadMore}
+                    className="px-6 py-3 bg-white text-blue-600 border border-gray-200 rounded-lg hover:bg-gray-50 transition-colors"
+                  >
+                    Load more essays
+                  </button>
+                )}
+              </div>
+            )}
+          </>
         ) : (
           <div className="text-center py-12">
             <div className="text-6xl mb-4">📝</div>
@@ -1,5 +1,6 @@
 export * from './useUser';
 export * from './useEvaluations';
+export * from './useEvaluationDetail';
 export * from './useAnalytics';
 export * from './useValidation';
 export * from './useLocalStorage';
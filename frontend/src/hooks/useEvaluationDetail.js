@@ -0,0 +1,43 @@
+import { useState, useEffect } from 'react';
+import { getEvaluation } from '../services/evaluations';
+
+// History lists hold summary rows; only full rows carry the essay text
+const hasDetail = (evaluation) => typeof evaluation?.student_response === 'string';
+
+/**
+ * Custom hook that completes a summary evaluation row with its detail columns
+ * @param {Object} evaluation - The evaluation row (summary or full); needs short_id or id
+ * @param {boolean} enabled - Whether to fetch (e.g. only while a modal is open)
+ * @returns {Object} - The merged evaluation, whether the fetch is pending, and whether the detail was found
+ */
+export const useEvaluationDetail = (evaluation, enabled = true) => {
+  const [result, setResult] = useState({ key: null, detail: null });
+
+  const key = evaluation?.short_id || evaluation?.id;
+  const complete = hasDetail(evaluation);
+
+  useEffect(() => {
+    if (!enabled || !key || complete) return;
+
+    let cancelled = false;
+    getEvaluation(key)
+      .then(data => data?.evaluation || null)
+      .catch(err => {
+        console.error('❌ Error fetching evaluation detail:', err);
+        return null;
+      })
+      .then(detail => {
+        if (!cancelled) setResult({ key, detail });
+      });
+    return () => { cancelled = true; };
+  }, [key, enabled, complete]);
+
+  const settled = result.key === key;
+  const detail = settled ? result.detail : null;
+
+  return {
+    evaluation: detail ? { ...evaluation, ...detail } : evaluation,
+    loading: enabled && !!key && !complete && !settled,
+    found: complete || !!detail,
+  };
+};
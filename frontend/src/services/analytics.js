@@ -52,6 +52,22 @@ export const getUserAnalytics = async (userId, filters = {}) => {
   }
 };
 
+/**
+ * Get the user's aggregate stats row without recommendations
+ * @param {string} userId - The user ID
+ * @returns {Promise<Object>} - The stats summary (total_evaluations, average_percent, question_types, ...)
+ */
+export const getUserStats = async (userId) => {
+  try {
+    // The stats row changes with every submission and is one read, so it is not cached
+    const response = await apiHelpers.get(`${API_ENDPOINTS.ANALYTICS}/${userId}?recommendations=false`, {}, { cache: false });
+    return response.data?.analytics?.stats || null;
+  } catch (error) {
+    console.error('❌ [Analytics Service] Error fetching user stats:', error);
+    throw error;
+  }
+};
+
 /**
  * Get performance trends
  * @param {string} userId - The user ID
@@ -161,6 +177,7 @@ export const getImprovementMetrics = async (userId) => {
 
 export default {
   getUserAnalytics,
+  getUserStats,
   getPerformanceTrends,
   getGradeDistribution,
   getQuestionTypePerformance,
@@ -1,5 +1,6 @@
 import { apiHelpers } from './api';
 import { API_ENDPOINTS } from '../constants/apiEndpoints';
+import { getUserStats } from './analytics';
 
 /**
  * Submit an essay for evaluation
@@ -66,15 +67,42 @@ export const getEvaluations = async (userId, filters = {}) => {
   }
 };
 
+// Evaluations fetched per page; History and Analytics ask for more as the user scrolls or widens the range
+export const EVALUATION_PAGE_SIZE = 50;
+
+/**
+ * Get one page of a user's evaluations, newest first
+ * @param {string} userId - The user ID
+ * @param {Object} options - Optional paging options
+ * @param {string} options.cursor - The next_cursor of the previous page
+ * @param {number} options.limit - Page size
+ * @param {Object} config - Optional request config (signal, timeout)
+ * @returns {Promise<{evaluations: Array, total: number|null, nextCursor: string|null, hasMore: boolean}>} - The page; total is only counted for the first page
+ */
+export const getEvaluationPage = async (userId, { cursor = null, limit = EVALUATION_PAGE_SIZE } = {}, config = {}) => {
+  // List pages carry the summary columns; the essay and feedback are fetched when an evaluation is opened
+  const params = new URLSearchParams({ limit, view: 'summary' });
+  if (cursor) params.append('cursor', cursor);
+  // History changes with every submission, so pages are never served from the response cache
+  const response = await apiHelpers.get(`${API_ENDPOINTS.API}/evaluations/user/${userId}?${params.toString()}`, config, { cache: false });
+  const page = response.data || {};
+  return {
+    evaluations: page.evaluations || [],
+    total: typeof page.total === 'number' ? page.total : null,
+    nextCursor: page.has_more ? page.next_cursor : null,
+    hasMore: !!page.has_more,
+  };
+};
+
 /**
  * Get a specific evaluation by ID
- * @param {string} evaluationId - The evaluation ID
- * @returns {Promise} - API response
+ * @param {string} evaluationId - The evaluation ID or short_id
+ * @returns {Promise} - API response ({ evaluation } with the essay and feedback)
  */
 export const getEvaluation = async (evaluationId) => {
   try {
-    // Use the correct endpoint: /evaluate/{evaluationId}
-    const response = await apiHelpers.get(`${API_ENDPOINTS.API}/evaluate/${evaluationId}`);
+    // Use the correct endpoint: /evaluations/{evaluationId}
+    const response = await apiHelpers.get(`${API_ENDPOINTS.API}/evaluations/${evaluationId}`);
     return response.data;
   } catch (error) {
     console.error('Error fetching evaluation:', error);
@@ -118,44 +146,27 @@ export const updateEvaluation = async (evaluationId, updateData) => {
 /**
  * Get evaluation statistics for a user
  * @param {string} userId - The user ID
- * @returns {Promise} - API response
+ * @returns {Promise} - Totals from the user's stats row plus the latest page of evaluations
  */
 export const getEvaluationStats = async (userId) => {
   try {
-    // Use the existing /evaluations/user/{user_id} endpoint since there's no dedicated /stats endpoint
-    const response = await apiHelpers.get(`${API_ENDPOINTS.API}/evaluations/user/${userId}`);
+    // Aggregates come from the stats row kept by the backend; only the recent page is fetched
+    const [summary, page] = await Promise.all([
+      getUserStats(userId),
+      getEvaluationPage(userId, { limit: 5 }),
+    ]);
     
-    // Extract evaluations and construct stats
-    const evaluations = response.data.evaluations || [];
-    
-    // Calculate basic stats
-    const stats = {
-      totalEvaluations: evaluations.length,
-      averageScore: 0,
-      questionTypes: {},
-      recentEvaluations: evaluations.slice(0, 5),
-      evaluations: evaluations
-    };
-    
-    // Calculate average score if there are evaluations
-    if (evaluations.length > 0) {
-      const scores = evaluations.map(evaluation => {
-        const scoreMatch = (evaluation.grade || '').match(/(\d+)\s*\/\s*(\d+)/);
-        return scoreMatch ? Number(scoreMatch[1]) : 0;
-      }).filter(score => score > 0);
-      
-      if (scores.length > 0) {
-        stats.averageScore = scores.reduce((a, b) => a + b, 0) / scores.length;
-      }
-    }
-    
-    // Count question types
-    evaluations.forEach(evaluation => {
-      const type = evaluation.question_type || 'unknown';
-      stats.questionTypes[type] = (stats.questionTypes[type] || 0) + 1;
+    const questionTypes = {};
+    (summary?.question_types || []).forEach(entry => {
+      questionTypes[entry.question_type || 'unknown'] = entry.count;
     });
     
-    return stats;
+    return {
+      totalEvaluations: summary?.total_evaluations ?? page.total ?? 0,
+      averageScore: summary?.average_percent ?? 0,
+      questionTypes,
+      recentEvaluations: page.evaluations,
+    };
   } catch (error) {
     console.error('Error fetching evaluation stats:', error);
     throw error;
@@ -165,6 +176,7 @@ export const getEvaluationStats = async (userId) => {
 export default {
   submitEvaluation,
   getEvaluations,
+  getEvaluationPage,
   getEvaluation,
   deleteEvaluation,
   updateEvaluation,